@@ -1,6 +1,7 @@
+import json
 import os
 from http import HTTPStatus
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 
 import requests
 import streamlit as st
@@ -143,6 +144,77 @@ def get_match_score(
         return 0.0, None
 
 
+def iter_sse(response: requests.Response) -> Iterator[Tuple[str, dict]]:
+    """Yield (event, data) pairs of a server-sent-events response."""
+    event = "message"
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:") :].strip()
+        elif line.startswith("data:"):
+            yield event, json.loads(line[len("data:") :])
+            event = "message"
+
+
+def stream_match_score(
+    vacancy_text: str,
+    resume_text: str,
+    hr_comment: str,
+    predictor_type: str,
+    model: Optional[str] = None,
+) -> Tuple[float, Optional[str]]:
+    """
+    Get match score from the streaming API, rendering the analysis while it is generated.
+
+    Args:
+        vacancy_text: The job vacancy description
+        resume_text: The candidate's description/CV
+        hr_comment: HR comments about candidate
+        predictor_type: The type of prediction algorithm to use
+        model: The specific model to use (optional)
+
+    Returns:
+        Tuple containing the match score and optional analysis description
+    """
+    request_data = {
+        "vacancy_description": vacancy_text,
+        "candidate_description": resume_text,
+        "hr_comment": hr_comment,
+        "predictor_type": predictor_type,
+    }
+    if model:
+        request_data["predictor_parameters"] = {"model": model}  # type: ignore
+
+    score_placeholder = st.empty()
+    thought_placeholder = st.empty()
+    thought = ""
+    try:
+        with requests.post(f"{API_URL}/match/stream", json=request_data, stream=True, timeout=180) as response:
+            if response.status_code != HTTPStatus.OK:
+                st.error(f"API Error: {response.status_code} - {response.text}")
+                return 0.0, None
+
+            for event, data in iter_sse(response):
+                if event == "thought":
+                    thought += data["text"]
+                    thought_placeholder.markdown(f"🔍 {thought}▌")
+                elif event == "score":
+                    score_placeholder.info(f"Match Score: {data['score']}")
+                elif event == "done":
+                    score_placeholder.empty()
+                    thought_placeholder.empty()
+                    return data["score"], data.get("description")
+                elif event == "error":
+                    st.error(f"API Error: {data['detail']}")
+                    return 0.0, None
+
+        st.error("API Error: the stream ended without a result")
+        return 0.0, None
+
+    except requests.exceptions.RequestException as e:
+        st.error(f"Connection Error: {str(e)}")
+        return 0.0, None
+
+
 def display_results(score: float, description: Optional[str]) -> None:
     """Display the matching results with appropriate styling."""
     st.subheader("📊 Results")
@@ -268,9 +340,8 @@ def input_form() -> None:
             st.warning("⚠️ Please fill in both the vacancy and candidate descriptions!")
             return
 
-        with st.spinner("Calculating match..."):
-            score, description = get_match_score(vacancy_text, resume_text, hr_comment, predictor_type, selected_model)
-            display_results(score, description)
+        score, description = stream_match_score(vacancy_text, resume_text, hr_comment, predictor_type, selected_model)
+        display_results(score, description)
 
 
 def main():
@@ -0,0 +1,84 @@
+"""
+Comparison of candidate encoders for the Ridge predictor: speed, memory and accuracy.
+
+Each encoder embeds every job description and CV of the dataset in a fresh process (see
+:mod:`src.benchmark.onnx_encoder`), then a Ridge model is trained on its features with the
+split of ``train.py`` and scored with :func:`evaluate_predictions` on the held-out pairs.
+Encoders are Hugging Face identifiers or local paths; features are CLS embeddings as in
+training.
+
+Usage:
+    python -m src.benchmark.encoders --encoders bert-base-uncased sentence-transformers/all-MiniLM-L6-v2
+"""
+
+import argparse
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import train_test_split
+
+from src.benchmark.onnx_encoder import embed_with_backend, load_pairs
+from src.training_pipeline.data_preprocessing import convert_rating
+from src.training_pipeline.onnx_encoder import BACKENDS, TORCH
+from src.training_pipeline.train import evaluate_predictions
+
+DEFAULT_ENCODERS = [
+    "bert-base-uncased",
+    "sentence-transformers/all-MiniLM-L6-v2",
+    "sentence-transformers/paraphrase-MiniLM-L3-v2",
+]
+
+
+def evaluate_encoder(embeddings: np.ndarray, pairs, y: np.ndarray) -> dict:
+    """Train a Ridge model on the features of one encoder and evaluate it as ``train.py`` does."""
+    vacancies, candidates = np.asarray(pairs).T
+    X = np.concatenate([embeddings[vacancies], embeddings[candidates]], axis=1)
+    mask = ~np.isnan(y)
+    X_train, X_test, y_train, y_test = train_test_split(X[mask], y[mask], test_size=0.2, random_state=42)
+    model = Ridge(alpha=1.0).fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+    return {"test_mse": mean_squared_error(y_test, y_pred), **evaluate_predictions(y_test, y_pred)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--encoders", nargs="+", default=DEFAULT_ENCODERS)
+    parser.add_argument("--backend", default=TORCH, choices=BACKENDS)
+    parser.add_argument("--data", default="data/synthetic_dataset.csv")
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    texts, pairs = load_pairs(args.data)
+    y = pd.read_csv(args.data)["project_rating"].apply(convert_rating).to_numpy(dtype=np.float64)
+
+    # Fresh processes: an encoder's memory is not hidden by what the previous one left behind
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    for encoder in args.encoders:
+        with context.Pool(1) as pool:
+            try:
+                result = pool.apply(embed_with_backend, (encoder, args.backend, texts, args.batch_size))
+            except Exception as e:
+                print(f"Skipping {encoder}: {e}")
+                continue
+        rows.append((encoder, result, evaluate_encoder(result["embeddings"], pairs, y)))
+
+    print(f"{len(texts)} texts, {len(pairs)} pairs, backend {args.backend}")
+    print(
+        f"{'encoder':>48} {'dim':>5} {'ms/text':>8} {'model MiB':>10} {'RSS MiB':>8} "
+        f"{'test MSE':>9} {'>1 pt %':>8} {'>0.5 pt %':>10}  requirements"
+    )
+    for encoder, result, metrics in rows:
+        print(
+            f"{encoder:>48} {result['embeddings'].shape[1]:5d} {result['ms_per_text']:8.2f} "
+            f"{result['model_rss_mb']:10.0f} {result['rss_mb']:8.0f} {metrics['test_mse']:9.4f} "
+            f"{metrics['pct_diff_more_than_1']:8.2f} {metrics['pct_diff_more_than_0.5']:10.2f}  "
+            f"{'met' if metrics['meets_all_requirements'] else 'not met'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Parity check and benchmark of the encoder backends: PyTorch, ONNX Runtime and ONNX Runtime int8.
+
+Each backend embeds the same job descriptions and CVs in a fresh process, so its load time,
+latency and resident memory are measured alone. The Ridge scores of the pairs are then
+computed from each backend's embeddings and compared to the PyTorch ones. A backend passes
+the parity check when no score moves by more than ``--tolerance`` points (on the 0-5 scale).
+The exit code is 1 if any backend fails.
+
+Usage:
+    python -m src.benchmark.onnx_encoder --pairs 200 --tolerance 0.1
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.platform.ridge_predictor import load_artifact
+from src.training_pipeline.onnx_encoder import BACKENDS, ONNX_INT8, TORCH, export_onnx
+
+
+def rss_mb() -> float:
+    """Return the resident memory of this process in MiB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Not Linux: the peak is the best available figure (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def embed_with_backend(model_name: str, backend: str, texts: Sequence[str], batch_size: int) -> Dict:
+    """Load one backend and embed the texts without any cache (run in a fresh process)."""
+    from src.training_pipeline.data_preprocessing import TextPreprocessor
+
+    before = rss_mb()
+    start = time.perf_counter()
+    preprocessor = TextPreprocessor(model_name, backend=backend)
+    load_s = time.perf_counter() - start
+    loaded = rss_mb()
+
+    preprocessor.get_bert_embeddings(texts[:batch_size], batch_size=batch_size)  # warm-up
+    start = time.perf_counter()
+    embeddings = preprocessor.get_bert_embeddings(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "ms_per_text": elapsed * 1000 / len(texts),
+        "model_rss_mb": loaded - before,
+        "rss_mb": rss_mb(),
+        "embeddings": embeddings,
+    }
+
+
+def ridge_scores(model, vacancy_embeddings: np.ndarray, candidate_embeddings: np.ndarray) -> np.ndarray:
+    """Scores between 0 and 5 of ``RidgePredictor`` for rows of embeddings."""
+    features = np.concatenate([vacancy_embeddings, candidate_embeddings], axis=1)
+    return np.clip(model.predict(features) * 5, 0, 5)
+
+
+def check_parity(
+    reference: np.ndarray,
+    candidate: np.ndarray,
+    model,
+    pairs: Sequence[Sequence[int]],
+    tolerance: float = 0.1,
+) -> Dict[str, float]:
+    """
+    Compare the embeddings of a backend with the reference ones and the Ridge scores they give.
+
+    Args:
+        reference: Embeddings of the reference backend (PyTorch), one row per text
+        candidate: Embeddings of the backend under test, same rows
+        model: Trained Ridge model
+        pairs: (vacancy row, candidate row) of each scored pair
+        tolerance: Largest allowed score difference
+
+    Returns:
+        Dict[str, float]: Embedding and score differences, and whether the backend passed
+    """
+    cosine = np.sum(reference * candidate, axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1) + 1e-12
+    )
+    vacancies, candidates = np.asarray(pairs).T
+    score_diff = np.abs(
+        ridge_scores(model, reference[vacancies], reference[candidates])
+        - ridge_scores(model, candidate[vacancies], candidate[candidates])
+    )
+    return {
+        "min_cosine": float(cosine.min()),
+        "max_embedding_diff": float(np.abs(reference - candidate).max()),
+        "mean_score_diff": float(score_diff.mean()),
+        "max_score_diff": float(score_diff.max()),
+        "passed": bool(score_diff.max() <= tolerance),
+    }
+
+
+def load_pairs(data_path: str, pairs: Optional[int] = None):
+    """Return the distinct texts of the first pairs (all if None) and the (vacancy, candidate) rows of each pair."""
+    # Missing texts are embedded as empty strings, as in training
+    df = pd.read_csv(data_path)[["job_description", "resume_text"]].fillna("").iloc[:pairs]
+    texts: List[str] = []
+    rows: Dict[str, int] = {}
+    for text in [*df["job_description"], *df["resume_text"]]:
+        if text not in rows:
+            rows[text] = len(texts)
+            texts.append(text)
+    return texts, [(rows[v], rows[c]) for v, c in zip(df["job_description"], df["resume_text"])]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-name", default="bert-base-uncased")
+    parser.add_argument("--ridge-model", default="models/vacancy_matcher.joblib")
+    parser.add_argument("--data", default="data/synthetic_dataset.csv")
+    parser.add_argument("--pairs", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Largest allowed Ridge score difference")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    args = parser.parse_args()
+
+    texts, pairs = load_pairs(args.data, args.pairs)
+    backends = [TORCH] + [backend for backend in args.backends if backend != TORCH]
+    # Fresh processes: a backend's memory is not hidden by what the previous one left behind
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for backend in backends[1:]:
+            # Exported beforehand, so the export does not count in the backend's load time and memory
+            pool.apply(export_onnx, (args.model_name, backend == ONNX_INT8))
+        results = [
+            pool.apply(embed_with_backend, (args.model_name, backend, texts, args.batch_size)) for backend in backends
+        ]
+
+    model, _ = load_artifact(args.ridge_model)
+    reference = results[0]
+    print(f"{len(texts)} texts, {len(pairs)} pairs, encoder {args.model_name}")
+    print(f"{'backend':>10} {'load s':>7} {'ms/text':>8} {'model MiB':>10} {'RSS MiB':>8}  parity")
+    failed = False
+    for result in results:
+        parity = check_parity(reference["embeddings"], result["embeddings"], model, pairs, args.tolerance)
+        failed |= not parity["passed"]
+        print(
+            f"{result['backend']:>10} {result['load_s']:7.1f} {result['ms_per_text']:8.2f} "
+            f"{result['model_rss_mb']:10.0f} {result['rss_mb']:8.0f}  "
+            f"{'ok' if parity['passed'] else 'FAILED'}: max score diff {parity['max_score_diff']:.4f}, "
+            f"min cosine {parity['min_cosine']:.5f}"
+        )
+        if result is not reference:
+            print(
+                f"{'':>10} speed-up {reference['ms_per_text'] / result['ms_per_text']:.2f}x, "
+                f"RSS saved {reference['rss_mb'] - result['rss_mb']:.0f} MiB against {TORCH}"
+            )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark of the prefill time saved by the prefix-cache-friendly prompt layout.
+
+Scores candidates against one vacancy with the old layout (CV first, so no two prompts share
+more than the system message) and with the current one (static prefix first), and reports
+the prefill time of each call. Prefill is taken from the server's own timings when it reports
+them (llama.cpp ``timings.prompt_ms``); otherwise it is the time to the first streamed token
+of a one-token completion.
+
+Usage:
+    python -m src.benchmark.prefix_cache --api-base-url http://localhost:5001/v1 --candidates 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+import requests
+
+from src.platform.lm_predictor import LMPredictor
+
+parent_folder = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+
+
+def candidate_first_prompt(candidate_description: str, vacancy_description: str) -> str:
+    """The user prompt as it was built before the static prefix was moved first."""
+    return (
+        f"""<|im_start|>user
+                Please evaluate this candidate:
+                <CV>
+                {candidate_description}
+                </CV>
+                """
+        + f"""<job_description>
+                {vacancy_description}
+                </job_description>
+                <|im_end|>"""
+    )
+
+
+def measure_prefill(predictor: LMPredictor, prompt: str) -> float:
+    """Return the prefill time of one prompt in milliseconds."""
+    payload = {**predictor._payload(prompt), "max_tokens": 1, "stream": True}
+    start = time.perf_counter()
+    first_token: Optional[float] = None
+    server_prefill: Optional[float] = None
+    with requests.post(
+        f"{predictor.api_base_url}/chat/completions",
+        headers=predictor._headers(),
+        json=payload,
+        stream=True,
+        timeout=180,
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if not line.startswith("data:") or line.endswith("[DONE]"):
+                continue
+            if first_token is None:
+                first_token = (time.perf_counter() - start) * 1000
+            timings = json.loads(line[len("data:") :]).get("timings") or {}
+            server_prefill = timings.get("prompt_ms", server_prefill)
+    return server_prefill if server_prefill is not None else first_token or 0.0
+
+
+def run_layout(predictor: LMPredictor, prompts: Sequence[str]) -> List[float]:
+    return [measure_prefill(predictor, prompt) for prompt in prompts]
+
+
+def load_pairs(data_path: str, candidates: int) -> Tuple[str, List[str]]:
+    df = pd.read_csv(data_path).dropna(subset=["cv", "job_description"])
+    return df["job_description"].iloc[0], df["cv"].iloc[:candidates].tolist()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api-base-url", default=os.getenv("LM_API_BASE_URL", "http://localhost:5001/v1"))
+    parser.add_argument("--model", default=os.getenv("LM_MODEL", "local-model"))
+    parser.add_argument("--data", default=os.path.join(parent_folder, "data.csv"))
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--cache-hints", action="store_true", help="Send backend cache hints with every call")
+    args = parser.parse_args()
+
+    predictor = LMPredictor(api_base_url=args.api_base_url, model=args.model, cache_hints=args.cache_hints)
+    vacancy, cvs = load_pairs(args.data, args.candidates)
+
+    layouts = {
+        "candidate_first": [candidate_first_prompt(cv, vacancy) for cv in cvs],
+        "prefix_first": [predictor.build_prompt(cv, vacancy) for cv in cvs],
+    }
+    results = {name: run_layout(predictor, prompts) for name, prompts in layouts.items()}
+
+    for name, prefill in results.items():
+        # The first call of each layout has nothing to reuse yet
+        warm = prefill[1:] or prefill
+        print(
+            f"{name:>16}: first {prefill[0]:8.1f} ms, median {statistics.median(warm):8.1f} ms, "
+            f"total {sum(prefill):9.1f} ms"
+        )
+    saved = sum(results["candidate_first"]) - sum(results["prefix_first"])
+    print(f"Prefill time saved: {saved:.1f} ms ({saved / max(sum(results['candidate_first']), 1e-9):.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,13 @@ import json
 
 import requests
 
+from src.platform.prompts.summary_prompt import (
+    CV_SUMMARY_PROMPT,
+    CV_SUMMARY_SYSTEM_MESSAGE,
+    JOB_SUMMARY_PROMPT,
+    JOB_SUMMARY_SYSTEM_MESSAGE,
+)
+
 
 def extract_message(response, key_path):
     try:
@@ -34,17 +41,9 @@ def summarize_cv(cv_content):
     messages = [
         {
             "role": "system",
-            "content": """You are an advanced AI model designed to summarize a CV into the following structure:
-1. Professional Summary
-2. Work Experience
-3. Education
-4. Skills
-5. Certifications and Licenses
-
-If any category is missing, please respond with "Not specified" for that category.
-""",
+            "content": CV_SUMMARY_SYSTEM_MESSAGE,
         },
-        {"role": "user", "content": f"<CV> {cv_content} </CV>"},
+        {"role": "user", "content": CV_SUMMARY_PROMPT.format(text=cv_content)},
     ]
     return send_request_to_ai(messages)
 
@@ -53,18 +52,9 @@ def summarize_job_description(job_description_content):
     messages = [
         {
             "role": "system",
-            "content": """You are an advanced AI model designed to summarize a job description into the following structure:
-1. Job Summary
-2. Responsibilities
-3. Qualifications (Required and preferred levels of education or fields of study, Minimum years and type of work experience)
-4. Required Skills
-5. Preferred Skills (Optional)
-6. Certifications (Optional)
-
-If any category is missing, please respond with "Not specified" for that category.
-""",
+            "content": JOB_SUMMARY_SYSTEM_MESSAGE,
         },
-        {"role": "user", "content": f"<job_description> {job_description_content} </job_description>"},
+        {"role": "user", "content": JOB_SUMMARY_PROMPT.format(text=job_description_content)},
     ]
     return send_request_to_ai(messages)
 
@@ -1,5 +1,17 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple
+from typing import Any, AsyncIterator, List, Optional, Sequence, Tuple, Union
+
+from src.platform.ranking import TopKSelector, iter_chunks
+
+# (candidate_description, vacancy_description, hr_comment)
+MatchPair = Tuple[str, str, str]
+# (candidate_description, hr_comment) of one applicant in a ranking request
+RankCandidate = Tuple[str, str]
+# Either a (score, description) prediction or the error raised for that item
+BatchResult = Union[Tuple[float, Optional[str]], Exception]
+# ("thought", text delta), ("score", value) or, last, ("result", (score, description))
+PredictionEvent = Tuple[str, Any]
 
 
 class BasePredictor(ABC):
@@ -27,7 +39,106 @@ class BasePredictor(ABC):
         """
         pass
 
+    async def predict_async(
+        self,
+        candidate_description: str,
+        vacancy_description: str,
+        hr_comment: str,
+    ) -> Tuple[float, Optional[str]]:
+        """
+        Asynchronous variant of :meth:`predict` for use inside the event loop.
+
+        The default implementation runs :meth:`predict` in a worker thread, so CPU-bound
+        predictors do not block other requests. I/O-bound predictors override it.
+        """
+        return await asyncio.to_thread(self.predict, candidate_description, vacancy_description, hr_comment)
+
+    async def predict_stream(
+        self,
+        candidate_description: str,
+        vacancy_description: str,
+        hr_comment: str,
+    ) -> AsyncIterator[PredictionEvent]:
+        """
+        Predict while streaming partial results as they become available.
+
+        The default implementation has nothing to stream: it yields the score and the result
+        of :meth:`predict_async`. Generating predictors override it.
+        """
+        score, description = await self.predict_async(candidate_description, vacancy_description, hr_comment)
+        yield "score", score
+        yield "result", (score, description)
+
+    def predict_batch(self, pairs: Sequence[MatchPair]) -> List[BatchResult]:
+        """
+        Predict match scores for many candidate-vacancy pairs.
+
+        Args:
+            pairs: Sequence of (candidate_description, vacancy_description, hr_comment) tuples
+
+        Returns:
+            List[BatchResult]: One entry per pair, in order. Each entry is either a
+            (score, description) tuple or the exception raised for that pair.
+        """
+        results: List[BatchResult] = []
+        for candidate_description, vacancy_description, hr_comment in pairs:
+            try:
+                results.append(self.predict(candidate_description, vacancy_description, hr_comment))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def predict_batch_async(self, pairs: Sequence[MatchPair]) -> List[BatchResult]:
+        """Asynchronous variant of :meth:`predict_batch` (runs it in a worker thread by default)."""
+        return await asyncio.to_thread(self.predict_batch, pairs)
+
+    def rank(
+        self,
+        vacancy_description: str,
+        candidates: Sequence[RankCandidate],
+        top_k: int = 10,
+        chunk_size: int = 256,
+    ) -> TopKSelector:
+        """
+        Rank candidates for one vacancy and keep the ``top_k`` best.
+
+        Candidates are scored in chunks of ``chunk_size``, so memory stays bounded for
+        large candidate lists.
+
+        Args:
+            vacancy_description: Description of the job vacancy requirements
+            candidates: Sequence of (candidate_description, hr_comment) tuples
+            top_k: Number of best candidates to keep
+            chunk_size: Number of candidates scored at once
+
+        Returns:
+            TopKSelector: Selection holding the ranking and per-candidate errors
+        """
+        selector = TopKSelector(top_k)
+        for start, chunk in iter_chunks(candidates, chunk_size):
+            pairs = [(candidate, vacancy_description, hr_comment) for candidate, hr_comment in chunk]
+            selector.extend(enumerate(self.predict_batch(pairs), start))
+        return selector
+
+    async def rank_async(
+        self,
+        vacancy_description: str,
+        candidates: Sequence[RankCandidate],
+        top_k: int = 10,
+        chunk_size: int = 256,
+    ) -> TopKSelector:
+        """Asynchronous variant of :meth:`rank` (runs it in a worker thread by default)."""
+        return await asyncio.to_thread(self.rank, vacancy_description, candidates, top_k, chunk_size)
+
     @abstractmethod
     def get_available_models(self) -> Tuple[str, ...]:
         """Return tuple of available models for this predictor."""
         pass
+
+    async def get_available_models_async(self) -> Tuple[str, ...]:
+        """Asynchronous variant of :meth:`get_available_models` (runs it in a worker thread by default)."""
+        return await asyncio.to_thread(self.get_available_models)
+
+    def close(self) -> None:
+        """Release resources held by the predictor (connections, models)."""
+        pass
@@ -0,0 +1,87 @@
+"""In-process caching helpers shared by predictors."""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+def text_hash(text: str) -> str:
+    """Stable content hash of a text, used as a cache key."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LRUCache(Generic[V]):
+    """
+    Thread-safe least-recently-used cache with hit/miss counters.
+
+    Entries are evicted when there are more than ``max_entries`` of them or, if ``sizeof``
+    is given, when their total size exceeds ``max_size``. With ``ttl`` set, entries older
+    than ``ttl`` seconds are treated as missing.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_size: Optional[int] = None,
+        sizeof: Optional[Callable[[V], int]] = None,
+        ttl: Optional[float] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.ttl = ttl
+        self._sizeof = sizeof or (lambda _: 1)
+        self._data: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._stored_at: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Return the cached value (marking it as recently used) or None."""
+        with self._lock:
+            if key in self._data and self.ttl is not None and time.monotonic() - self._stored_at[key] > self.ttl:
+                self._remove(key)
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key: Hashable, value: V) -> None:
+        """Store a value, evicting the least recently used entries if the cache is full."""
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = value
+            self._stored_at[key] = time.monotonic()
+            self.size += self._sizeof(value)
+            while self._data and self._over_capacity():
+                self._remove(next(iter(self._data)))
+
+    def _remove(self, key: Hashable) -> None:
+        self.size -= self._sizeof(self._data.pop(key))
+        del self._stored_at[key]
+
+    def _over_capacity(self) -> bool:
+        if self.max_entries is not None and len(self._data) > self.max_entries:
+            return True
+        return self.max_size is not None and self.size > self.max_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._stored_at.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """Return entry count, total size and hit/miss counters."""
+        return {"entries": len(self._data), "size": self.size, "hits": self.hits, "misses": self.misses}
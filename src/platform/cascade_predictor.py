@@ -0,0 +1,222 @@
+"""
+Two-stage cascade: a cheap prefilter scores every candidate and the LLM reranks the best only.
+
+LLM calls dominate the cost of ranking. The prefilter (Ridge embeddings or lexical overlap)
+takes milliseconds per candidate, so it scores everyone. Only the ``rerank_top_k`` best,
+and only those scoring at least ``rerank_threshold``, are sent to the LLM.
+"""
+
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.platform.base_predictor import BasePredictor, BatchResult, MatchPair, RankCandidate
+from src.platform.metrics import registry as metrics
+from src.platform.ranking import TopKSelector
+
+CASCADE_CANDIDATES = "matcher_cascade_candidates_total"
+CASCADE_CALLS_SAVED = "matcher_cascade_llm_calls_saved_total"
+
+metrics.describe(CASCADE_CANDIDATES, "counter", "Candidates scored by each stage of the cascade")
+metrics.describe(CASCADE_CALLS_SAVED, "counter", "Candidates the cascade did not send to the LLM")
+
+WORD = re.compile(r"\w{3,}")
+
+
+def _optional_float(value: str) -> Optional[float]:
+    return float(value) if value else None
+
+
+class LexicalPredictor(BasePredictor):
+    """Scores a candidate by the share of the vacancy's words found in the CV (no model needed)."""
+
+    @staticmethod
+    def terms(text: str) -> set:
+        return set(WORD.findall(text.lower()))
+
+    def predict(
+        self,
+        candidate_description: str,
+        vacancy_description: str,
+        hr_comment: str,
+    ) -> Tuple[float, str]:
+        """
+        Score the word overlap of a candidate with a vacancy.
+
+        Returns:
+            Tuple[float, str]: Score between 0 and 5 and the number of matched vacancy terms
+        """
+        vacancy_terms = self.terms(vacancy_description)
+        matched = len(vacancy_terms & self.terms(candidate_description))
+        score = round(5 * matched / len(vacancy_terms), 2) if vacancy_terms else 0.0
+        return score, f"Lexical match: {matched} of {len(vacancy_terms)} vacancy terms found in the CV."
+
+    def get_available_models(self) -> Tuple[str]:
+        return ("lexical-overlap-v1",)
+
+
+class CascadePredictor(BasePredictor):
+    """Prefilters candidates with a cheap predictor and reranks the best ones with an expensive one."""
+
+    def __init__(
+        self,
+        prefilter: BasePredictor,
+        reranker: BasePredictor,
+        rerank_top_k: Optional[int] = int(os.getenv("CASCADE_TOP_K", "20")),
+        rerank_threshold: Optional[float] = _optional_float(os.getenv("CASCADE_THRESHOLD", "")),
+    ):
+        """
+        Initialize the cascade.
+
+        The stages may be shared with other users, so closing the cascade does not close them.
+
+        Args:
+            prefilter: Cheap predictor scoring every candidate (e.g. Ridge or lexical)
+            reranker: Expensive predictor scoring the shortlisted candidates (e.g. the LLM)
+            rerank_top_k: Default number of best prefiltered candidates to rerank (None = all)
+            rerank_threshold: Default minimum prefilter score to be reranked (None = no minimum)
+        """
+        self.prefilter = prefilter
+        self.reranker = reranker
+        self.rerank_top_k = rerank_top_k
+        self.rerank_threshold = rerank_threshold
+
+    def _passes(self, score: float, threshold: Optional[float]) -> bool:
+        return threshold is None or score >= threshold
+
+    def predict(
+        self,
+        candidate_description: str,
+        vacancy_description: str,
+        hr_comment: str,
+    ) -> Tuple[float, Optional[str]]:
+        """Score one pair with the reranker if its prefilter score reaches the threshold."""
+        score, description = self.prefilter.predict(candidate_description, vacancy_description, hr_comment)
+        if not self._passes(score, self.rerank_threshold):
+            metrics.inc(CASCADE_CALLS_SAVED)
+            return score, description
+        return self.reranker.predict(candidate_description, vacancy_description, hr_comment)
+
+    async def predict_async(
+        self,
+        candidate_description: str,
+        vacancy_description: str,
+        hr_comment: str,
+    ) -> Tuple[float, Optional[str]]:
+        """Asynchronous variant of :meth:`predict`."""
+        score, description = await self.prefilter.predict_async(candidate_description, vacancy_description, hr_comment)
+        if not self._passes(score, self.rerank_threshold):
+            metrics.inc(CASCADE_CALLS_SAVED)
+            return score, description
+        return await self.reranker.predict_async(candidate_description, vacancy_description, hr_comment)
+
+    def _shortlist_batch(self, results: List[BatchResult]) -> List[int]:
+        return [
+            i
+            for i, result in enumerate(results)
+            if not isinstance(result, Exception) and self._passes(result[0], self.rerank_threshold)
+        ]
+
+    def predict_batch(self, pairs: Sequence[MatchPair]) -> List[BatchResult]:
+        """Prefilter all pairs in one batch and rerank those reaching the threshold."""
+        results = self.prefilter.predict_batch(pairs)
+        shortlist = self._shortlist_batch(results)
+        metrics.inc(CASCADE_CALLS_SAVED, len(pairs) - len(shortlist))
+        reranked = self.reranker.predict_batch([pairs[i] for i in shortlist])
+        for i, result in zip(shortlist, reranked):
+            results[i] = result
+        return results
+
+    async def predict_batch_async(self, pairs: Sequence[MatchPair]) -> List[BatchResult]:
+        """Asynchronous variant of :meth:`predict_batch`."""
+        results = await self.prefilter.predict_batch_async(pairs)
+        shortlist = self._shortlist_batch(results)
+        metrics.inc(CASCADE_CALLS_SAVED, len(pairs) - len(shortlist))
+        reranked = await self.reranker.predict_batch_async([pairs[i] for i in shortlist])
+        for i, result in zip(shortlist, reranked):
+            results[i] = result
+        return results
+
+    def _shortlist_ranking(
+        self, prefiltered: TopKSelector, rerank_top_k: Optional[int], rerank_threshold: Optional[float]
+    ) -> List[int]:
+        rerank_top_k = self.rerank_top_k if rerank_top_k is None else rerank_top_k
+        rerank_threshold = self.rerank_threshold if rerank_threshold is None else rerank_threshold
+        shortlist = [ranked.index for ranked in prefiltered.ranking() if self._passes(ranked.score, rerank_threshold)]
+        return shortlist if rerank_top_k is None else shortlist[:rerank_top_k]
+
+    def _merge_ranking(
+        self,
+        candidates: Sequence[RankCandidate],
+        top_k: int,
+        prefiltered: TopKSelector,
+        shortlist: List[int],
+        reranked: TopKSelector,
+    ) -> TopKSelector:
+        selector = TopKSelector(top_k)
+        selector.extend((shortlist[ranked.index], (ranked.score, ranked.description)) for ranked in reranked.ranking())
+        errors: Dict[int, str] = {**prefiltered.errors, **{shortlist[i]: e for i, e in reranked.errors.items()}}
+        selector.errors.update(errors)
+
+        saved = len(candidates) - len(shortlist)
+        selector.stats = {"prefiltered": prefiltered.scored, "reranked": len(shortlist), "llm_calls_saved": saved}
+        metrics.inc(CASCADE_CANDIDATES, prefiltered.scored, stage="prefilter")
+        metrics.inc(CASCADE_CANDIDATES, len(shortlist), stage="rerank")
+        metrics.inc(CASCADE_CALLS_SAVED, saved)
+        return selector
+
+    def rank(
+        self,
+        vacancy_description: str,
+        candidates: Sequence[RankCandidate],
+        top_k: int = 10,
+        chunk_size: int = 256,
+        rerank_top_k: Optional[int] = None,
+        rerank_threshold: Optional[float] = None,
+    ) -> TopKSelector:
+        """
+        Rank candidates by reranker score among the shortlist of the prefilter.
+
+        Candidates left out of the shortlist are not part of the ranking. The selection's
+        ``stats`` report how many candidates each stage scored and the LLM calls saved.
+
+        Args:
+            vacancy_description: Description of the job vacancy requirements
+            candidates: Sequence of (candidate_description, hr_comment) tuples
+            top_k: Number of best candidates to keep
+            chunk_size: Number of candidates scored at once
+            rerank_top_k: Number of best prefiltered candidates to rerank (the predictor's default if None)
+            rerank_threshold: Minimum prefilter score to be reranked (the predictor's default if None)
+        """
+        prefiltered = self.prefilter.rank(vacancy_description, candidates, top_k=len(candidates), chunk_size=chunk_size)
+        shortlist = self._shortlist_ranking(prefiltered, rerank_top_k, rerank_threshold)
+        reranked = self.reranker.rank(
+            vacancy_description, [candidates[i] for i in shortlist], top_k=top_k, chunk_size=chunk_size
+        )
+        return self._merge_ranking(candidates, top_k, prefiltered, shortlist, reranked)
+
+    async def rank_async(
+        self,
+        vacancy_description: str,
+        candidates: Sequence[RankCandidate],
+        top_k: int = 10,
+        chunk_size: int = 256,
+        rerank_top_k: Optional[int] = None,
+        rerank_threshold: Optional[float] = None,
+    ) -> TopKSelector:
+        """Asynchronous variant of :meth:`rank`."""
+        prefiltered = await self.prefilter.rank_async(
+            vacancy_description, candidates, top_k=len(candidates), chunk_size=chunk_size
+        )
+        shortlist = self._shortlist_ranking(prefiltered, rerank_top_k, rerank_threshold)
+        reranked = await self.reranker.rank_async(
+            vacancy_description, [candidates[i] for i in shortlist], top_k=top_k, chunk_size=chunk_size
+        )
+        return self._merge_ranking(candidates, top_k, prefiltered, shortlist, reranked)
+
+    def get_available_models(self) -> Tuple[str, ...]:
+        """Return the models of the reranker, which produces the reported scores."""
+        return self.reranker.get_available_models()
+
+    async def get_available_models_async(self) -> Tuple[str, ...]:
+        return await self.reranker.get_available_models_async()
@@ -0,0 +1,35 @@
+"""
+Request deadlines shared between the service and the predictors.
+
+The service sets the deadline of the request being served with :func:`deadline_scope`.
+Platform code reads the remaining time with :func:`remaining` and bounds its calls by it.
+Like the metrics labels, the deadline is a context variable, so it follows the request
+into tasks and worker threads.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+current_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("current_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[float]:
+    """Set the deadline of the current request to ``seconds`` from now (or keep an earlier one)."""
+    deadline = time.monotonic() + seconds
+    outer = current_deadline.get()
+    token = current_deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield current_deadline.get()  # type: ignore
+    finally:
+        current_deadline.reset(token)
+
+
+def remaining(default: Optional[float] = None) -> Optional[float]:
+    """Return the seconds left before the current deadline, or ``default`` without a deadline."""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return default
+    return max(0.0, deadline - time.monotonic())
@@ -0,0 +1,113 @@
+"""
+Dynamic micro-batching of embedding requests.
+
+Concurrent requests each need one or two texts embedded. Rather than running many
+batch-size-1 forward passes, a background thread collects texts for up to
+``max_wait_ms`` (or until ``max_batch_size`` texts are queued), runs one padded forward
+pass, and resolves every caller's future with its own row.
+"""
+
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EmbedFn = Callable[[List[str]], np.ndarray]
+Item = Tuple[str, Future, contextvars.Context]
+
+
+class DynamicBatcher:
+    """Collects texts from concurrent callers and embeds them in shared batches."""
+
+    def __init__(self, embed_fn: EmbedFn, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        """
+        Initialize the batcher (the worker thread starts on first use).
+
+        Args:
+            embed_fn: Function embedding a list of texts into a matrix with one row per text
+            max_batch_size: Maximum number of texts per forward pass
+            max_wait_ms: Maximum time the first queued text waits for others to join its batch
+        """
+        self.embed_fn = embed_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Optional[Item]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+
+    def submit(self, text: str) -> "Future[np.ndarray]":
+        """Queue a text and return a future resolved with its embedding."""
+        self._ensure_worker()
+        future: "Future[np.ndarray]" = Future()
+        self._queue.put((text, future, contextvars.copy_context()))
+        return future
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts through the shared batches and block until all are done."""
+        futures = [self.submit(text) for text in texts]
+        return np.stack([future.result() for future in futures])
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.texts / self.batches if self.batches else 0.0
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self, first: Item) -> Tuple[List[Item], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stop = self._collect(first)
+            # Callers that gave up (e.g. cancelled requests) do not need a forward pass
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if batch:
+                self._embed(batch)
+            if stop:
+                return
+
+    def _embed(self, batch: List[Item]) -> None:
+        try:
+            # Run in the first caller's context so that its stage metrics are attributed to it
+            embeddings = batch[0][2].run(self.embed_fn, [text for text, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.texts += len(batch)
+        for (_, future, _), embedding in zip(batch, embeddings):
+            future.set_result(embedding)
+
+    def close(self) -> None:
+        """Stop the worker thread after the queued texts are embedded."""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                self._queue.put(None)
+                self._worker.join()
+            self._worker = None
@@ -0,0 +1,157 @@
+"""
+Process-wide text embedding engine.
+
+Loading the tokenizer and encoder weights takes seconds and hundreds of megabytes, so
+serving code shares a single engine per encoder instead of building a new
+``TextPreprocessor`` for every prediction.
+"""
+
+import gc
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+
+from src.platform.embedding_batcher import DynamicBatcher
+from src.training_pipeline.data_preprocessing import TextPreprocessor, preprocess_text
+from src.training_pipeline.embedding_cache import EmbeddingCache, get_embedding_cache
+from src.training_pipeline.onnx_encoder import embedding_cache_name
+
+DEFAULT_MODEL_NAME = "bert-base-uncased"
+DEFAULT_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+
+
+class EmbeddingEngine:
+    """Owns the tokenizer and encoder of one embedding model for the whole process."""
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        cache: Optional[EmbeddingCache] = None,
+        backend: str = DEFAULT_BACKEND,
+        max_batch_size: int = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32")),
+        max_wait_ms: float = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5")),
+    ):
+        """
+        Initialize the engine without loading the model.
+
+        Args:
+            model_name: Hugging Face identifier of the encoder to load
+            cache: Embedding cache shared with training (the process-wide one if None)
+            backend: Runtime of the encoder: ``"torch"``, ``"onnx"`` or ``"onnx-int8"``
+            max_batch_size: Maximum number of texts per forward pass
+            max_wait_ms: How long a text waits for concurrent texts to share its forward
+                pass (0 disables dynamic batching)
+        """
+        self.model_name = model_name
+        self.backend = backend
+        self.cache = cache or get_embedding_cache(embedding_cache_name(model_name, backend))
+        self._preprocessor: Optional[TextPreprocessor] = None
+        self._lock = threading.RLock()
+        self.batcher = (
+            DynamicBatcher(self._embed_direct, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+            if max_wait_ms > 0
+            else None
+        )
+
+    def load(self) -> "EmbeddingEngine":
+        """Load the tokenizer and encoder if they are not loaded yet."""
+        with self._lock:
+            if self._preprocessor is None:
+                self._preprocessor = TextPreprocessor(
+                    model_name=self.model_name, cache=self.cache, backend=self.backend
+                )
+                if self._preprocessor.model is not None:
+                    self._preprocessor.model.eval()
+        return self
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._preprocessor is not None
+
+    @property
+    def preprocessor(self) -> TextPreprocessor:
+        """The loaded preprocessor (loads it on first access)."""
+        self.load()
+        return self._preprocessor  # type: ignore
+
+    def embed(self, text: str) -> np.ndarray:
+        """Return the CLS embedding of a single text."""
+        if self.batcher is not None:
+            return self.batcher.submit(text).result()
+        return self._embed_direct([text])[0]
+
+    def embed_batch(self, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Return the CLS embeddings of many texts, one row per text.
+
+        With dynamic batching enabled, the texts share forward passes with texts of
+        concurrent callers and ``batch_size`` is replaced by the batcher's maximum size.
+        """
+        if self.batcher is not None and texts:
+            return self.batcher.embed_many(texts)
+        return self._embed_direct(list(texts), batch_size=batch_size)
+
+    def _embed_direct(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        # Fast tokenizers are not safe to call concurrently, so calls are serialized;
+        # the forward pass already uses all intra-op threads on CPU.
+        with self._lock:
+            batch_size = batch_size or (self.batcher.max_batch_size if self.batcher else 32)
+            return self.preprocessor.get_bert_embeddings(texts, batch_size=batch_size)
+
+    def features(self, candidate_description: str, vacancy_description: str, hr_comment: str) -> np.ndarray:
+        """Build the ridge feature vector for a candidate-vacancy pair."""
+        with self._lock:
+            return preprocess_text(
+                candidate_description, vacancy_description, hr_comment, preprocessor=self.preprocessor
+            )
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Return the hit/miss counters of the embedding cache."""
+        return self.cache.stats()
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Return the memory held by the encoder weights and buffers in bytes."""
+        if self._preprocessor is None:
+            return {"parameters": 0, "buffers": 0, "total": 0}
+
+        if self._preprocessor.onnx is not None:
+            return self._preprocessor.onnx.memory_usage()
+        model = self._preprocessor.model
+        parameters = sum(p.numel() * p.element_size() for p in model.parameters())
+        buffers = sum(b.numel() * b.element_size() for b in model.buffers())
+        return {"parameters": parameters, "buffers": buffers, "total": parameters + buffers}
+
+    def close(self) -> None:
+        """Stop the batcher, drop the tokenizer and encoder and return their memory."""
+        if self.batcher is not None:
+            self.batcher.close()
+        with self._lock:
+            if self._preprocessor is None:
+                return
+            self._preprocessor = None
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+
+_engines: Dict[Tuple[str, str], EmbeddingEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_embedding_engine(model_name: str = DEFAULT_MODEL_NAME, backend: str = DEFAULT_BACKEND) -> EmbeddingEngine:
+    """Return the process-wide engine for the given encoder and backend, creating it on first use."""
+    with _engines_lock:
+        if (model_name, backend) not in _engines:
+            _engines[model_name, backend] = EmbeddingEngine(model_name, backend=backend)
+        return _engines[model_name, backend]
+
+
+def close_embedding_engines() -> None:
+    """Close every process-wide engine."""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.close()
+        _engines.clear()
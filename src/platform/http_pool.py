@@ -0,0 +1,156 @@
+"""
+Shared asynchronous HTTP connection pool for calls to LLM backends.
+
+All LM predictors in a process reuse the same keep-alive connections, so many
+in-flight generations can overlap inside one event loop without paying a new
+TCP/TLS handshake per request.
+"""
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+
+@dataclass(frozen=True)
+class HTTPPoolConfig:
+    """Connection pool settings (defaults are read from the environment)."""
+
+    max_connections: int = field(default_factory=lambda: int(os.getenv("LM_POOL_MAX_CONNECTIONS", "100")))
+    max_keepalive_connections: int = field(default_factory=lambda: int(os.getenv("LM_POOL_MAX_KEEPALIVE", "20")))
+    max_connections_per_host: int = field(default_factory=lambda: int(os.getenv("LM_POOL_MAX_PER_HOST", "32")))
+    keepalive_expiry: float = field(default_factory=lambda: float(os.getenv("LM_POOL_KEEPALIVE_EXPIRY", "30")))
+    http2: bool = field(default_factory=lambda: os.getenv("LM_HTTP2", "0") == "1")
+    timeout: float = 180.0
+
+
+class AsyncHTTPPool:
+    """Keep-alive ``httpx.AsyncClient`` with an additional per-host concurrency limit."""
+
+    def __init__(self, config: Optional[HTTPPoolConfig] = None, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Initialize the pool without opening any connection.
+
+        Args:
+            config: Pool settings (read from the environment if None)
+            transport: Custom httpx transport, e.g. ``httpx.MockTransport`` in tests
+        """
+        self.config = config or HTTPPoolConfig()
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Client bound to the running event loop (created on first use in that loop)."""
+        return self._bind()
+
+    def _bind(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # Connections cannot be shared across event loops, so a new loop gets a fresh pool.
+            self._client = httpx.AsyncClient(
+                http2=self.config.http2,
+                timeout=self.config.timeout,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections,
+                    keepalive_expiry=self.config.keepalive_expiry,
+                ),
+            )
+            self._loop = loop
+            self._host_slots = {}
+        return self._client
+
+    def host_slot(self, url: str) -> asyncio.Semaphore:
+        """Semaphore limiting the number of concurrent requests to the host of ``url``."""
+        self._bind()  # slots belong to the running loop, like the client
+        host = urlsplit(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.config.max_connections_per_host)
+        return self._host_slots[host]
+
+    async def post_json(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """POST a JSON payload and return the decoded JSON response."""
+        async with self.host_slot(url):
+            response = await self.client.post(
+                url, json=payload, headers=headers, timeout=self.config.timeout if timeout is None else timeout
+            )
+        response.raise_for_status()
+        return response.json()
+
+    async def get_json(
+        self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None
+    ) -> Any:
+        """GET ``url`` and return the decoded JSON response."""
+        async with self.host_slot(url):
+            response = await self.client.get(
+                url, headers=headers, timeout=self.config.timeout if timeout is None else timeout
+            )
+        response.raise_for_status()
+        return response.json()
+
+    async def stream_sse(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        POST a JSON payload and yield the decoded ``data:`` events of a server-sent-events response.
+
+        The stream ends at ``data: [DONE]``. Closing the generator early closes the connection,
+        which makes OpenAI-compatible servers stop generating.
+        """
+        async with self.host_slot(url):
+            async with self.client.stream(
+                "POST", url, json=payload, headers=headers, timeout=self.config.timeout if timeout is None else timeout
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:") :].strip()
+                    if data == "[DONE]":
+                        return
+                    yield json.loads(data)
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+        self._host_slots = {}
+
+
+_default_pool: Optional[AsyncHTTPPool] = None
+
+
+def get_http_pool() -> AsyncHTTPPool:
+    """Return the process-wide HTTP pool."""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = AsyncHTTPPool()
+    return _default_pool
+
+
+async def close_http_pool() -> None:
+    """Close the process-wide HTTP pool."""
+    if _default_pool is not None:
+        await _default_pool.aclose()
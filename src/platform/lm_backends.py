@@ -0,0 +1,334 @@
+"""
+Pool of OpenAI-compatible LLM backends.
+
+One LLM server caps throughput, so ``LMPredictor`` can spread calls over several. Each call
+goes to the healthy backend with the fewest outstanding requests. A circuit breaker ejects a
+backend after repeated failures and lets traffic back once a cooldown has passed. Periodic
+``/models`` health checks eject dead backends even when no traffic reaches them.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+import requests
+
+from src.platform.http_pool import AsyncHTTPPool, get_http_pool
+from src.platform.metrics import registry as metrics
+
+BACKEND_DURATION = "matcher_lm_backend_duration_seconds"
+BACKEND_ERRORS = "matcher_lm_backend_errors_total"
+HEDGES = "matcher_lm_hedges_total"
+
+metrics.describe(BACKEND_DURATION, "histogram", "Duration of calls to each LM backend")
+metrics.describe(BACKEND_ERRORS, "counter", "Failed calls to each LM backend")
+metrics.describe(HEDGES, "counter", "Hedged LM calls sent, and how many of them finished first")
+
+
+class NoBackendAvailable(Exception):
+    """Raised when every backend of a pool is ejected."""
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures and half-opens after ``cooldown`` seconds.
+
+    A half-open breaker lets a single trial call through; its outcome closes or reopens the
+    breaker. A trial that never reports back is replaced by another one after ``cooldown``.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def allows(self) -> bool:
+        state = self.state
+        if state == "half_open":
+            return self.trial_started is None or time.monotonic() - self.trial_started >= self.cooldown
+        return state == "closed"
+
+    def start_trial(self) -> None:
+        """Record that a call was sent to the backend, which is the trial call when half-open."""
+        if self.state == "half_open":
+            self.trial_started = time.monotonic()
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial_started = None
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class HedgeBudget:
+    """Token bucket capping hedged calls at ``max_ratio`` of primary calls (plus a small burst)."""
+
+    def __init__(self, max_ratio: float = 0.1, burst: float = 10.0):
+        self.max_ratio = max_ratio
+        self.burst = burst
+        self.tokens = burst if max_ratio > 0 else 0.0
+        self._lock = threading.Lock()
+
+    def on_call(self) -> None:
+        """Earn ``max_ratio`` of a hedge for every primary call."""
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + self.max_ratio)
+
+    def try_spend(self) -> bool:
+        """Take one hedge from the budget if there is one."""
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class Backend:
+    """One LLM server with its load, breaker and recent latencies."""
+
+    def __init__(self, url: str, breaker: CircuitBreaker, window: int = 256):
+        self.url = url.rstrip("/")
+        self.breaker = breaker
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.latencies: Deque[float] = deque(maxlen=window)
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        """Return the ``q``-quantile of the recent successful call latencies (None without samples)."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "url": self.url,
+            "state": self.breaker.state,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "p50": self.latency_quantile(0.5),
+            "p95": self.latency_quantile(0.95),
+        }
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """Whether an error says something about the backend's health (not about the request)."""
+    if isinstance(error, (httpx.TransportError, requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", 0) >= 500
+
+
+class BackendPool:
+    """Least-outstanding-requests load balancer over LLM backends with circuit breaking."""
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        pool: Optional[AsyncHTTPPool] = None,
+        failure_threshold: int = int(os.getenv("LM_BREAKER_FAILURES", "3")),
+        cooldown: float = float(os.getenv("LM_BREAKER_COOLDOWN_S", "30")),
+        health_interval: float = float(os.getenv("LM_HEALTH_INTERVAL_S", "10")),
+        health_timeout: float = float(os.getenv("LM_HEALTH_TIMEOUT_S", "2")),
+        hedge_max_ratio: float = float(os.getenv("LM_HEDGE_MAX_RATIO", "0.1")),
+        health_headers: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            urls: Base URLs of the backends (e.g. ``http://llm-1:5001/v1``)
+            pool: Async HTTP connection pool (the process-wide pool if None)
+            failure_threshold: Consecutive failures after which a backend is ejected
+            cooldown: Seconds an ejected backend gets no traffic before it is tried again
+            health_interval: Seconds between ``/models`` health checks (0 disables them)
+            health_timeout: Timeout of a health check
+            hedge_max_ratio: Maximum number of hedged calls per primary call
+            health_headers: Headers of the health checks (e.g. the API key)
+        """
+        if not urls:
+            raise ValueError("At least one LM backend is required")
+        self.backends = [Backend(url, CircuitBreaker(failure_threshold, cooldown)) for url in urls]
+        self.pool = pool or get_http_pool()
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.hedge_budget = HedgeBudget(hedge_max_ratio)
+        self.health_headers = health_headers
+        self._lock = threading.Lock()
+        self._next = 0
+        self._health_task: Optional["asyncio.Task[None]"] = None
+
+    def choose(self, exclude: Sequence[Backend] = ()) -> Backend:
+        """
+        Return the healthy backend with the fewest outstanding requests.
+
+        Ties are broken round-robin so that an idle pool still spreads its calls. A backend
+        whose breaker is half-open gets a single trial call until the trial reports back.
+
+        Raises:
+            NoBackendAvailable: If every backend (outside ``exclude``) is ejected
+        """
+        with self._lock:
+            count = len(self.backends)
+            order = [self.backends[(self._next + i) % count] for i in range(count)]
+            self._next = (self._next + 1) % count
+            candidates = [b for b in order if b not in exclude and b.breaker.allows()]
+            if not candidates:
+                raise NoBackendAvailable(f"No healthy LM backend among {[b.url for b in self.backends]}")
+            chosen = min(candidates, key=lambda backend: backend.outstanding)
+            chosen.breaker.start_trial()
+            return chosen
+
+    def latency_quantile(self, q: float, min_samples: int = 20) -> Optional[float]:
+        """Return the ``q``-quantile of recent successful calls over all backends (None with too few samples)."""
+        with self._lock:
+            latencies = sorted(latency for backend in self.backends for latency in backend.latencies)
+        if len(latencies) < min_samples:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    @contextmanager
+    def track(self, backend: Backend) -> Iterator[None]:
+        """Count a call to ``backend`` as outstanding and record its latency and outcome."""
+        with self._lock:
+            backend.outstanding += 1
+            backend.requests += 1
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            if is_backend_failure(e):
+                with self._lock:
+                    backend.errors += 1
+                    backend.breaker.record_failure()
+                metrics.inc(BACKEND_ERRORS, backend=backend.url)
+            raise
+        else:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                backend.latencies.append(elapsed)
+                backend.breaker.record_success()
+            metrics.observe(BACKEND_DURATION, elapsed, backend=backend.url)
+        finally:
+            with self._lock:
+                backend.outstanding -= 1
+
+    async def check_health(self) -> None:
+        """Probe ``/models`` of every backend concurrently and update the breakers."""
+
+        async def probe(backend: Backend) -> None:
+            try:
+                await self.pool.get_json(
+                    f"{backend.url}/models", headers=self.health_headers, timeout=self.health_timeout
+                )
+            except Exception as e:
+                # As for calls, a rejected request (e.g. 401) says nothing about the backend's health
+                if is_backend_failure(e):
+                    with self._lock:
+                        backend.breaker.record_failure()
+            else:
+                with self._lock:
+                    # A live /models does not undo an ejection before its cooldown is over
+                    if backend.breaker.state != "open":
+                        backend.breaker.record_success()
+
+        await asyncio.gather(*[probe(backend) for backend in self.backends])
+
+    def ensure_health_checks(self) -> None:
+        """Start the periodic health checks in the running event loop if they are not running."""
+        if self.health_interval <= 0:
+            return
+        task = self._health_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._health_task = asyncio.create_task(self._check_periodically())
+
+    async def _check_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.check_health()
+
+    async def aclose(self) -> None:
+        """Stop the health checks."""
+        task, self._health_task = self._health_task, None
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def stats(self) -> List[Dict[str, object]]:
+        """Return the state, load, request and error counts and recent latency of each backend."""
+        with self._lock:
+            return [backend.stats() for backend in self.backends]
+
+
+_pools: Dict[Tuple[str, ...], BackendPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_backend_pool(
+    urls: Sequence[str], pool: Optional[AsyncHTTPPool] = None, headers: Optional[Dict[str, str]] = None
+) -> BackendPool:
+    """
+    Return the process-wide backend pool for a set of URLs.
+
+    Predictors pointing at the same backends share outstanding-request counts and breakers.
+    A custom HTTP ``pool`` (e.g. in tests) gets a private backend pool instead. ``headers``
+    authenticate the health checks; a shared pool keeps those of its first predictor.
+    """
+    if pool is not None:
+        return BackendPool(urls, pool=pool, health_headers=headers)
+    key = tuple(url.rstrip("/") for url in urls)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = BackendPool(key, health_headers=headers)
+        return _pools[key]
+
+
+async def close_backend_pools() -> None:
+    """Stop the health checks of every process-wide backend pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for backend_pool in pools:
+        await backend_pool.aclose()
+
+
+def backend_samples():
+    """Per-backend gauges of the process-wide pools for ``/metrics``."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for backend_pool in pools:
+        for stats in backend_pool.stats():
+            yield stats
+
+
+metrics.register_collector(
+    "matcher_lm_backend_up",
+    "gauge",
+    "Whether an LM backend receives traffic (1) or is ejected by its circuit breaker (0)",
+    lambda: [("", {"backend": s["url"]}, 0 if s["state"] == "open" else 1) for s in backend_samples()],
+)
+metrics.register_collector(
+    "matcher_lm_backend_outstanding",
+    "gauge",
+    "Requests in flight to an LM backend",
+    lambda: [("", {"backend": s["url"]}, s["outstanding"]) for s in backend_samples()],
+)
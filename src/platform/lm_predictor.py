@@ -1,11 +1,78 @@
+import asyncio
+import json
 import os
 import re
-from typing import Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
+import httpx
 import requests
 
-from src.platform.base_predictor import BasePredictor
+from src.platform.base_predictor import BasePredictor, BatchResult, MatchPair, PredictionEvent, RankCandidate
+from src.platform.cache import text_hash
+from src.platform.deadline import remaining
+from src.platform.http_pool import AsyncHTTPPool, get_http_pool
+from src.platform.lm_backends import HEDGES, Backend, NoBackendAvailable, get_backend_pool
+from src.platform.metrics import record_lm_usage, record_prompt_tokens, stage
+from src.platform.metrics import registry as metrics
+from src.platform.prompt_budget import PromptBudget, get_token_counter
+from src.platform.prompts.packed_prompt import (
+    PACKED_CANDIDATE_BLOCK,
+    PACKED_FOOTER,
+    PACKED_HEADER,
+    PACKED_SYSTEM_MESSAGE,
+)
+from src.platform.prompts.score_prompt import (
+    SCORE_CANDIDATE_BLOCK,
+    SCORE_RESPONSE_FORMAT,
+    SCORE_SYSTEM_MESSAGE,
+    SCORE_VACANCY_BLOCK,
+)
 from src.platform.prompts.simple_prompt import PROMPT
+from src.platform.ranking import TopKSelector, iter_chunks
+from src.platform.stream_parser import StreamingTagParser, parse_score
+from src.platform.summarizer import CV, VACANCY, DocumentSummarizer, get_summary_store
+
+# Descriptions of failed predictions start with this prefix (the score is then 0.0)
+PREDICTION_ERROR_PREFIX = "Error in prediction"
+
+PACKED_CANDIDATES = "matcher_lm_packed_candidates_total"
+metrics.describe(PACKED_CANDIDATES, "counter", "Candidates scored in packed prompts, parsed or sent again one by one")
+
+# One <candidate id=...> answer; a block cut short by the token limit ends at the next one
+PACKED_ANSWER = re.compile(
+    r"<candidate\s+id\s*=\s*[\"']?([\w-]+)[\"']?\s*>(.*?)(?=</candidate>|<candidate\b|\Z)",
+    re.DOTALL | re.IGNORECASE,
+)
+PACKED_THOUGHT = re.compile(r"<thoughts?>(.*?)</thoughts?>", re.DOTALL)
+PACKED_SCORE = re.compile(r"<score>(.*?)</score>", re.DOTALL)
+
+SYSTEM_MESSAGE = """<|im_start|>system
+You are an advanced AI model designed to analyze the compatibility between a CV and a job description. You will receive a CV and a job description. Your task is to output a structured message in XML format that includes the following:
+            
+            1. though: Provide a short comment explaining your score.
+            2. score: Provide a numerical compatibility score (1-5) based on qualifications, skills, and experience.
+
+            Your output must be in XML format as follows:
+            <thought> Your comment here. </thought>
+            <score> Your score from 1 to 5 here </score>
+<|im_end|>"""
+
+# Static parts first: the system message and the vacancy form a prefix that is byte-identical
+# for every candidate of a vacancy, so servers with prefix (KV) caching prefill it only once
+VACANCY_BLOCK = """<|im_start|>user
+<job_description>
+{vacancy_description}
+</job_description>
+"""
+
+CANDIDATE_BLOCK = """Please evaluate this candidate:
+<CV>
+{candidate_description}
+</CV>
+<|im_end|>"""
+
+# Start of the candidate section in the prompts of both modes
+CANDIDATE_MARKER = "<CV>\n"
 
 
 class LMPredictor(BasePredictor):
@@ -21,6 +88,21 @@ class LMPredictor(BasePredictor):
         temperature: float = 0.7,
         max_tokens: int = 256,
         prompt_template: Optional[str] = None,
+        pool: Optional[AsyncHTTPPool] = None,
+        batch_concurrency: int = int(os.getenv("LM_BATCH_CONCURRENCY", "8")),
+        models_timeout: float = float(os.getenv("LM_MODELS_TIMEOUT_S", "5")),
+        api_base_urls: Optional[Sequence[str]] = None,
+        hedge_percentile: float = float(os.getenv("LM_HEDGE_PERCENTILE", "0")),
+        fast: bool = os.getenv("LM_FAST_MODE", "0") == "1",
+        fast_max_tokens: int = int(os.getenv("LM_FAST_MAX_TOKENS", "8")),
+        candidate_token_budget: int = int(os.getenv("LM_CANDIDATE_TOKEN_BUDGET", "2048")),
+        vacancy_token_budget: int = int(os.getenv("LM_VACANCY_TOKEN_BUDGET", "1024")),
+        tokenizer: str = os.getenv("LM_TOKENIZER", ""),
+        cache_hints: bool = os.getenv("LM_CACHE_HINTS", "0") == "1",
+        pack_candidates: int = int(os.getenv("LM_PACK_CANDIDATES", "1")),
+        pack_token_budget: int = int(os.getenv("LM_PACK_TOKEN_BUDGET", "4096")),
+        summarize: bool = os.getenv("LM_SUMMARIZE", "0") == "1",
+        summary_cache_path: str = os.getenv("SUMMARY_CACHE_PATH", "data/summaries.sqlite3"),
     ):
         """
         Initialize the LM predictor.
@@ -32,14 +114,98 @@ class LMPredictor(BasePredictor):
             temperature: Sampling temperature (0.0 to 1.0)
             max_tokens: Maximum tokens in the response
             prompt_template: Custom prompt template (uses default if None)
+            pool: Async HTTP connection pool (the process-wide pool if None)
+            batch_concurrency: Maximum number of in-flight API calls per batch
+            models_timeout: Timeout in seconds for listing the models of the backend
+            api_base_urls: Several equivalent backends to balance calls over
+                (replaces ``api_base_url``)
+            hedge_percentile: Send a duplicate call when the first one is slower than this
+                percentile of recent latencies, e.g. 0.95 (0 disables hedging)
+            fast: Ask for the score only, as JSON, with a compact prompt (no description
+                is returned); for bulk screening where generation time matters most
+            fast_max_tokens: Maximum tokens in the response in fast mode
+            candidate_token_budget: Maximum tokens of the candidate section of the prompt (0 = unlimited)
+            vacancy_token_budget: Maximum tokens of the vacancy section of the prompt (0 = unlimited)
+            tokenizer: Local Hugging Face tokenizer used to count prompt tokens
+                (an approximate count if empty, see :mod:`src.platform.prompt_budget`)
+            cache_hints: Add prompt caching hints to API calls: ``cache_prompt`` (llama.cpp)
+                and a ``prompt_cache_key`` naming the static prefix (OpenAI-style routing)
+            pack_candidates: Maximum number of candidates scored in one prompt by
+                :meth:`rank_async` (1 disables packing; not used in fast mode)
+            pack_token_budget: Maximum candidate tokens in one packed prompt
+            summarize: Score structured summaries of the CV and the vacancy instead of the raw
+                texts; each document is summarized once (see :mod:`src.platform.summarizer`)
+            summary_cache_path: SQLite database keeping the summaries across restarts
         """
         super().__init__()
-        self.api_base_url = api_base_url
+        self.api_base_url = api_base_urls[0] if api_base_urls else api_base_url
         self.api_key = api_key
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.prompt_template = prompt_template or PROMPT
+        self.pool = pool or get_http_pool()
+        self.batch_concurrency = batch_concurrency
+        self.models_timeout = models_timeout
+        self.backends = get_backend_pool(list(api_base_urls or [api_base_url]), pool=pool, headers=self._headers())
+        self.hedge_percentile = hedge_percentile
+        self.fast = fast
+        self.fast_max_tokens = fast_max_tokens
+        self.prompt_budget = PromptBudget(
+            get_token_counter(tokenizer),
+            budgets={"candidate": candidate_token_budget, "vacancy": vacancy_token_budget},
+            static={"system": SCORE_SYSTEM_MESSAGE if fast else SYSTEM_MESSAGE},
+        )
+        self.cache_hints = cache_hints
+        self.pack_candidates = pack_candidates
+        self.pack_token_budget = pack_token_budget
+        self.summarizer = (
+            DocumentSummarizer(
+                self._complete_async, model, get_summary_store(summary_cache_path), self.prompt_budget.count
+            )
+            if summarize
+            else None
+        )
+
+    def _headers(self) -> dict:
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+        }
+
+    def _payload(self, prompt: str, system_message: Optional[str] = None, max_tokens: Optional[int] = None) -> dict:
+        payload = self._completion_payload(prompt)
+        if system_message is not None:
+            payload["messages"][0]["content"] = system_message
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+        if self.cache_hints:
+            system_message = payload["messages"][0]["content"]
+            payload["cache_prompt"] = True
+            payload["prompt_cache_key"] = text_hash(system_message + self.static_prefix(prompt))[:32]
+        return payload
+
+    def _completion_payload(self, prompt: str) -> dict:
+        if self.fast:
+            return {
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": SCORE_SYSTEM_MESSAGE},
+                    {"role": "user", "content": prompt},
+                ],
+                "temperature": self.temperature,
+                "max_tokens": self.fast_max_tokens,
+                "response_format": SCORE_RESPONSE_FORMAT,
+            }
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_MESSAGE},
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
 
     def _call_api(self, prompt: str) -> str:
         """
@@ -52,34 +218,15 @@ class LMPredictor(BasePredictor):
             The model's response text
 
         Raises:
+            TimeoutError: If the deadline of the request has already passed
             Exception: If the API call fails
         """
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-        }
-
-        payload = {
-            "model": self.model,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": """<|im_start|>system
-You are an advanced AI model designed to analyze the compatibility between a CV and a job description. You will receive a CV and a job description. Your task is to output a structured message in XML format that includes the following:
-            
-            1. though: Provide a short comment explaining your score.
-            2. score: Provide a numerical compatibility score (1-5) based on qualifications, skills, and experience.
-
-            Your output must be in XML format as follows:
-            <thought> Your comment here. </thought>
-            <score> Your score from 1 to 5 here </score>
-<|im_end|>""",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": self.temperature,
-            "max_tokens": self.max_tokens,
-        }
+        timeout = remaining(180)
+        if timeout <= 0:
+            raise TimeoutError("Deadline exceeded before the API call")
+        headers = self._headers()
+        payload = self._payload(prompt)
+        backend = self.backends.choose()
 
         # Add detailed logging
         # print(f"Making API call to: {self.api_base_url}/chat/completions")
@@ -87,12 +234,13 @@ You are an advanced AI model designed to analyze the compatibility between a CV
         # print(f"Request Payload: {payload}")
 
         try:
-            response = requests.post(
-                f"{self.api_base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=180,
-            )
+            with stage("lm_http"), self.backends.track(backend):
+                response = requests.post(
+                    f"{backend.url}/chat/completions",
+                    headers=headers,
+                    json=payload,
+                    timeout=timeout,
+                )
 
             # Add response logging
             # print(f"Response Status Code: {response.status_code}")
@@ -100,15 +248,102 @@ You are an advanced AI model designed to analyze the compatibility between a CV
             # print(f"Response Content: {response.text}")
 
             response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
+            data = response.json()
+            record_lm_usage(self.model, data.get("usage"))
+            return data["choices"][0]["message"]["content"]
         except requests.exceptions.RequestException as e:
             # print(f"Request Exception: {str(e)}")
             if hasattr(e.response, "text"):
                 print(f"Error Response Content: {e.response.text}")
             raise Exception(f"API call failed: {str(e)}")
         except Exception as e:
-            # print(f"Unexpected error: {str(e, e.response.text)}")
-            raise Exception(f"API call failed: {str(e, e.response.text)}")
+            # print(f"Unexpected error: {str(e)}")
+            raise Exception(f"API call failed: {str(e)}")
+
+    async def _call_api_async(self, prompt: str) -> str:
+        """
+        Make a non-blocking API call to the least loaded healthy backend.
+
+        Args:
+            prompt: The formatted prompt to send
+
+        Returns:
+            The model's response text
+
+        Raises:
+            Exception: If the API call fails
+        """
+        content, _ = await self._complete_async(self._payload(prompt))
+        return content
+
+    async def _complete_async(self, payload: dict) -> Tuple[str, Optional[str]]:
+        """
+        Send a completion request, hedging it when enabled (see :meth:`_call_api_async`).
+
+        Returns:
+            Tuple[str, Optional[str]]: Content of the answer and its finish reason (``length`` when cut off)
+        """
+        self.backends.ensure_health_checks()
+        primary = self.backends.choose()
+        self.backends.hedge_budget.on_call()
+        delay = self.backends.latency_quantile(self.hedge_percentile) if self.hedge_percentile > 0 else None
+        if delay is None:
+            return await self._call_backend_async(primary, payload)
+        return await self._call_hedged(primary, payload, delay)
+
+    async def _call_hedged(self, primary: Backend, payload: dict, delay: float) -> Tuple[str, Optional[str]]:
+        """
+        Call ``primary`` and, if it has not answered after ``delay`` seconds, a second backend too.
+
+        The first successful answer wins and the other call is cancelled, which closes its
+        connection so the server stops generating. Hedges are limited by the pool's budget.
+        """
+        first = asyncio.create_task(self._call_backend_async(primary, payload))
+        calls = [first]
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if done or not self.backends.hedge_budget.try_spend():
+                return await first
+
+            try:
+                backup = self.backends.choose(exclude=[primary])
+            except NoBackendAvailable:
+                backup = primary  # a single backend: the duplicate may still land on a faster slot
+            calls.append(asyncio.create_task(self._call_backend_async(backup, payload)))
+            metrics.inc(HEDGES, result="sent")
+
+            pending = set(calls)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for call in done:
+                    if call.exception() is None:
+                        if call is not first:
+                            metrics.inc(HEDGES, result="won")
+                        return call.result()
+            return first.result()  # both failed: report the primary's error
+        finally:
+            for call in calls:
+                if not call.done():
+                    call.cancel()
+
+    async def _call_backend_async(self, backend: Backend, payload: dict) -> Tuple[str, Optional[str]]:
+        """Call one backend over the shared connection pool (see :meth:`_complete_async`)."""
+        try:
+            with stage("lm_http"), self.backends.track(backend):
+                data = await self.pool.post_json(
+                    f"{backend.url}/chat/completions",
+                    payload,
+                    headers=self._headers(),
+                    timeout=remaining(),
+                )
+            record_lm_usage(self.model, data.get("usage"))
+            choice = data["choices"][0]
+            return choice["message"]["content"], choice.get("finish_reason")
+        except httpx.HTTPStatusError as e:
+            print(f"Error Response Content: {e.response.text}")
+            raise Exception(f"API call failed: {str(e)}")
+        except (httpx.HTTPError, KeyError, IndexError, AttributeError) as e:
+            raise Exception(f"API call failed: {str(e)}")
 
     def parse_response(self, response: str):
         """Parse model response to extract thought and score"""
@@ -140,6 +375,138 @@ You are an advanced AI model designed to analyze the compatibility between a CV
             thought = re.sub(r"\d+\.?\d*/5", "", response).strip()
         return {"thought": thought, "score": score}
 
+    def parse_score_response(self, response: str):
+        """Parse the JSON answer of the fast mode (no free-text fallbacks)"""
+        return {"thought": None, "score": float(json.loads(response)["score"])}
+
+    def parse(self, response: str):
+        """Parse a response with the parser of the current mode"""
+        return self.parse_score_response(response) if self.fast else self.parse_response(response)
+
+    def parse_packed_response(self, response: str, ids: Sequence[str]) -> Dict[str, Tuple[float, str]]:
+        """
+        Parse the per-candidate answers of a packed prompt.
+
+        Only well-formed answers are returned: blocks with an unknown or repeated id, or
+        without a score from 1 to 5, are left out so that their candidates can be scored again.
+
+        Returns:
+            Dict[str, Tuple[float, str]]: (score, thought) per candidate id
+        """
+        results: Dict[str, Tuple[float, str]] = {}
+        for match in PACKED_ANSWER.finditer(response):
+            candidate_id, answer = match.group(1), match.group(2)
+            score_match = PACKED_SCORE.search(answer)
+            score = parse_score(score_match.group(1)) if score_match else None
+            if candidate_id not in ids or candidate_id in results or score is None or not 1 <= score <= 5:
+                continue
+            thought_match = PACKED_THOUGHT.search(answer)
+            results[candidate_id] = score, thought_match.group(1).strip() if thought_match else ""
+        return results
+
+    @staticmethod
+    def static_prefix(prompt: str) -> str:
+        """Return the part of a user prompt shared by all candidates of its vacancy."""
+        return prompt.split(CANDIDATE_MARKER, 1)[0]
+
+    def build_prompt(
+        self,
+        candidate_description: str,
+        vacancy_description: str,
+        vacancy_block: Optional[str] = None,
+    ) -> str:
+        """
+        Build the user prompt for a candidate-vacancy pair.
+
+        The vacancy comes first and the candidate last, so that the prompts of one vacancy
+        share a prefix (see :meth:`static_prefix`).
+
+        Args:
+            candidate_description: Description of the candidate's experience and skills
+            vacancy_description: Description of the job vacancy requirements
+            vacancy_block: Pre-built vacancy section from :meth:`build_vacancy_block`, reused
+                when one vacancy is scored against many candidates
+
+        Sections over their token budget are shortened, and the prompt's token counts are
+        recorded (see :func:`src.platform.metrics.record_prompt_tokens`).
+        """
+        if vacancy_block is None:
+            vacancy_block = self.build_vacancy_block(vacancy_description)
+        candidate_description, candidate_tokens = self.prompt_budget.fit("candidate", candidate_description)
+        record_prompt_tokens(
+            self.model,
+            {
+                **self.prompt_budget.static_tokens,
+                "candidate": candidate_tokens,
+                "vacancy": self.prompt_budget.count(vacancy_block),
+            },
+        )
+        template = SCORE_CANDIDATE_BLOCK if self.fast else CANDIDATE_BLOCK
+        return vacancy_block + template.format(candidate_description=candidate_description)
+
+    def build_packed_prompt(self, candidate_descriptions: Sequence[str], vacancy_block: str) -> str:
+        """
+        Build one user prompt scoring several candidates against a vacancy.
+
+        Candidates get the ids ``1``, ``2``, ... in order, and the vacancy comes first like
+        in :meth:`build_prompt`.
+        """
+        blocks = []
+        candidate_tokens = 0
+        for position, candidate_description in enumerate(candidate_descriptions, 1):
+            candidate_description, tokens = self.prompt_budget.fit("candidate", candidate_description)
+            candidate_tokens += tokens
+            blocks.append(PACKED_CANDIDATE_BLOCK.format(id=position, candidate_description=candidate_description))
+        record_prompt_tokens(
+            self.model,
+            {
+                "system": self.prompt_budget.count(PACKED_SYSTEM_MESSAGE),
+                "candidate": candidate_tokens,
+                "vacancy": self.prompt_budget.count(vacancy_block),
+            },
+        )
+        return vacancy_block + PACKED_HEADER + "".join(blocks) + PACKED_FOOTER
+
+    def pack(self, candidates: Sequence[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
+        """
+        Group (index, candidate_description) pairs into packed prompts.
+
+        A group holds at most ``pack_candidates`` candidates and ``pack_token_budget``
+        candidate tokens; a candidate over the budget on its own is scored alone.
+        """
+        groups: List[List[Tuple[int, str]]] = []
+        group_tokens = 0
+        for index, candidate_description in candidates:
+            _, tokens = self.prompt_budget.fit("candidate", candidate_description)
+            if groups and len(groups[-1]) < self.pack_candidates and group_tokens + tokens <= self.pack_token_budget:
+                groups[-1].append((index, candidate_description))
+                group_tokens += tokens
+            else:
+                groups.append([(index, candidate_description)])
+                group_tokens = tokens
+        return groups
+
+    async def _predict_packed_async(
+        self, candidate_descriptions: Sequence[str], vacancy_block: str
+    ) -> Dict[int, Tuple[float, str]]:
+        """Score candidates in one call, returning (score, thought) by position for the well-formed answers."""
+        prompt = self.build_packed_prompt(candidate_descriptions, vacancy_block)
+        payload = self._payload(
+            prompt,
+            system_message=PACKED_SYSTEM_MESSAGE,
+            max_tokens=self.max_tokens * len(candidate_descriptions),
+        )
+        response, _ = await self._complete_async(payload)
+        with stage("parse_response"):
+            results = self.parse_packed_response(response, [str(i) for i in range(1, len(candidate_descriptions) + 1)])
+        return {int(candidate_id) - 1: result for candidate_id, result in results.items()}
+
+    def build_vacancy_block(self, vacancy_description: str) -> str:
+        """Build the vacancy section of the user prompt, shortened to its token budget."""
+        vacancy_description, _ = self.prompt_budget.fit("vacancy", vacancy_description)
+        template = SCORE_VACANCY_BLOCK if self.fast else VACANCY_BLOCK
+        return template.format(vacancy_description=vacancy_description)
+
     def predict(
         self,
         candidate_description: str,
@@ -159,35 +526,236 @@ You are an advanced AI model designed to analyze the compatibility between a CV
                 - float: Match score between 0 and 1
                 - str: Detailed description of the match analysis
         """
-        # Use the predefined prompt template
-        prompt = f"""<|im_start|>user
-                Please evaluate this candidate:
-                <CV> 
-                {candidate_description} 
-                </CV>
-                <job_description> 
-                {vacancy_description} 
-                </job_description>
-                <|im_end|>""".format(
-            vacancy_description=vacancy_description,
-            candidate_description=candidate_description,
-        )
+        if self.summarizer is not None:
+            # No LM call for summaries here: the stored ones are used, the full texts otherwise
+            candidate_description = self.summarizer.stored(candidate_description, CV)
+            vacancy_description = self.summarizer.stored(vacancy_description, VACANCY)
+        prompt = self.build_prompt(candidate_description, vacancy_description)
 
         try:
             response = self._call_api(prompt)
-            result = self.parse_response(response)
+            with stage("parse_response"):
+                result = self.parse(response)
             return result["score"], result["thought"]
 
         except Exception as e:
             print("Error during prediction:", str(e))  # Log the error
-            return 0.0, f"Error in prediction: {str(e)}"
+            return 0.0, f"{PREDICTION_ERROR_PREFIX}: {str(e)}"
+
+    async def predict_async(
+        self,
+        candidate_description: str,
+        vacancy_description: str,
+        hr_comment: str,
+    ) -> Tuple[float, Optional[str]]:
+        """Predict without blocking the event loop (see :meth:`predict`)."""
+        try:
+            candidate_description, vacancy_description = await self._summarize_pair(
+                candidate_description, vacancy_description
+            )
+            return await self._predict_async(candidate_description, vacancy_description)
+
+        except Exception as e:
+            print("Error during prediction:", str(e))  # Log the error
+            return 0.0, f"{PREDICTION_ERROR_PREFIX}: {str(e)}"
+
+    async def _summarize_pair(self, candidate_description: str, vacancy_description: str) -> Tuple[str, str]:
+        """Return the summaries of a CV and a vacancy (the texts themselves when not summarizing)."""
+        if self.summarizer is None:
+            return candidate_description, vacancy_description
+        candidate_summary, vacancy_summary = await asyncio.gather(
+            self.summarizer.summarize(candidate_description, CV),
+            self.summarizer.summarize(vacancy_description, VACANCY),
+        )
+        return candidate_summary, vacancy_summary
+
+    async def _predict_async(
+        self,
+        candidate_description: str,
+        vacancy_description: str,
+        vacancy_block: Optional[str] = None,
+    ) -> Tuple[float, Optional[str]]:
+        prompt = self.build_prompt(candidate_description, vacancy_description, vacancy_block)
+        response = await self._call_api_async(prompt)
+        with stage("parse_response"):
+            result = self.parse(response)
+        return result["score"], result["thought"]
+
+    async def predict_stream(
+        self,
+        candidate_description: str,
+        vacancy_description: str,
+        hr_comment: str,
+    ) -> AsyncIterator[PredictionEvent]:
+        """
+        Stream the thought as the model generates it and stop as soon as the score is complete.
+
+        The completion is requested with ``stream: true``. Once ``</score>`` arrives the
+        connection is closed, so the server does not generate the rest of the answer.
+        Without a well-formed ``<score>`` the full text goes through :meth:`parse_response`.
+        The fast mode has no thought to stream, so it only yields the score and the result.
+        """
+        if self.fast:
+            async for event in super().predict_stream(candidate_description, vacancy_description, hr_comment):
+                yield event
+            return
+
+        parser = StreamingTagParser()
+        try:
+            candidate_description, vacancy_description = await self._summarize_pair(
+                candidate_description, vacancy_description
+            )
+            async for event in self._stream_api(self.build_prompt(candidate_description, vacancy_description), parser):
+                yield event
+            if parser.score is not None:
+                yield "result", (parser.score, parser.thought.strip())
+                return
+            with stage("parse_response"):
+                result = self.parse_response(parser.text)
+        except Exception as e:
+            print("Error during prediction:", str(e))  # Log the error
+            yield "result", (0.0, f"{PREDICTION_ERROR_PREFIX}: {str(e)}")
+            return
+        if result["score"] is not None:
+            yield "score", result["score"]
+        yield "result", (result["score"], result["thought"])
+
+    async def _stream_api(self, prompt: str, parser: StreamingTagParser) -> AsyncIterator[PredictionEvent]:
+        """Stream a completion from the least loaded backend, yielding parser events until the score."""
+        self.backends.ensure_health_checks()
+        backend = self.backends.choose()
+        try:
+            with stage("lm_http"), self.backends.track(backend):
+                chunks = self.pool.stream_sse(
+                    f"{backend.url}/chat/completions",
+                    {**self._payload(prompt), "stream": True},
+                    headers=self._headers(),
+                    timeout=remaining(),
+                )
+                try:
+                    async for data in chunks:
+                        choices = data.get("choices") or [{}]
+                        content = (choices[0].get("delta") or {}).get("content")
+                        for event in parser.feed(content or ""):
+                            yield event
+                        if parser.score is not None:
+                            break
+                finally:
+                    # Closes the connection: the server stops generating after the score
+                    await chunks.aclose()
+        except httpx.HTTPStatusError as e:
+            print(f"Error Response Content: {e.response.text}")
+            raise Exception(f"API call failed: {str(e)}")
+        except (httpx.HTTPError, ValueError, AttributeError) as e:
+            raise Exception(f"API call failed: {str(e)}")
+
+    async def predict_batch_async(self, pairs: Sequence[MatchPair]) -> List[BatchResult]:
+        """
+        Score many pairs concurrently with at most ``batch_concurrency`` calls in flight.
+
+        Args:
+            pairs: Sequence of (candidate_description, vacancy_description, hr_comment) tuples
+
+        Returns:
+            List[BatchResult]: (score, description) per pair, or the error raised for that pair
+        """
+        slots = asyncio.Semaphore(self.batch_concurrency)
+
+        async def score(pair: MatchPair) -> Tuple[float, Optional[str]]:
+            candidate_description, vacancy_description, _ = pair
+            async with slots:
+                candidate_description, vacancy_description = await self._summarize_pair(
+                    candidate_description, vacancy_description
+                )
+                return await self._predict_async(candidate_description, vacancy_description)
+
+        return list(await asyncio.gather(*[score(pair) for pair in pairs], return_exceptions=True))
+
+    async def rank_async(
+        self,
+        vacancy_description: str,
+        candidates: Sequence[RankCandidate],
+        top_k: int = 10,
+        chunk_size: int = 256,
+    ) -> TopKSelector:
+        """
+        Rank candidates for one vacancy (see :meth:`BasePredictor.rank`).
+
+        The vacancy section of the prompt is built once and shared by all candidates, and
+        at most ``batch_concurrency`` calls are in flight at any time. With packing enabled,
+        several candidates are scored per call (see :meth:`pack`); candidates whose answer
+        is missing or malformed are scored again one by one. When summarizing, the vacancy
+        is summarized once before any candidate is scored.
+        """
+        if self.summarizer is not None:
+            vacancy_description = await self.summarizer.summarize(vacancy_description, VACANCY)
+        vacancy_block = self.build_vacancy_block(vacancy_description)
+        slots = asyncio.Semaphore(self.batch_concurrency)
+
+        async def score(candidate_description: str) -> Tuple[float, Optional[str]]:
+            async with slots:
+                return await self._predict_async(candidate_description, vacancy_description, vacancy_block)
+
+        async def score_group(group: List[Tuple[int, str]]) -> List[Tuple[int, BatchResult]]:
+            packed: Dict[int, Tuple[float, str]] = {}
+            if len(group) > 1:
+                async with slots:
+                    try:
+                        packed = await self._predict_packed_async([c for _, c in group], vacancy_block)
+                    except Exception as e:
+                        print("Error during packed prediction:", str(e))
+            missing = [position for position in range(len(group)) if position not in packed]
+            if len(group) > 1:
+                metrics.inc(PACKED_CANDIDATES, len(packed), result="parsed")
+                metrics.inc(PACKED_CANDIDATES, len(missing), result="fallback")
+            fallback = await asyncio.gather(*[score(group[p][1]) for p in missing], return_exceptions=True)
+            results = {**packed, **dict(zip(missing, fallback))}
+            return [(index, results[position]) for position, (index, _) in enumerate(group)]
+
+        packing = self.pack_candidates > 1 and not self.fast
+        selector = TopKSelector(top_k)
+        for start, chunk in iter_chunks(candidates, chunk_size):
+            descriptions = [candidate for candidate, _ in chunk]
+            if self.summarizer is not None:
+                # Before packing: groups are formed by the token counts of the summaries
+                descriptions = await self.summarizer.summarize_many(descriptions, CV, self.batch_concurrency)
+            if packing:
+                groups = self.pack(list(enumerate(descriptions, start)))
+                for results in await asyncio.gather(*[score_group(group) for group in groups]):
+                    selector.extend(results)
+            else:
+                results = await asyncio.gather(
+                    *[score(candidate) for candidate in descriptions], return_exceptions=True
+                )
+                selector.extend(enumerate(results, start))
+        return selector
 
     def get_available_models(self) -> Tuple[str, ...]:
         try:
             response = requests.get(
                 f"{self.api_base_url}/models",
+                headers=self._headers(),
+                timeout=self.models_timeout,
             )
             response.raise_for_status()
             return [model["id"] for model in response.json()["data"]]
         except Exception as e:
             raise Exception(f"API call failed: {str(e)}")
+
+    async def get_available_models_async(self) -> Tuple[str, ...]:
+        """Return the models served by any backend, querying all backends concurrently."""
+
+        async def list_models(backend: Backend) -> List[str]:
+            data = await self.pool.get_json(
+                f"{backend.url}/models", headers=self._headers(), timeout=self.models_timeout
+            )
+            return [model["id"] for model in data["data"]]
+
+        results = await asyncio.gather(
+            *[list_models(backend) for backend in self.backends.backends], return_exceptions=True
+        )
+        models = [model for result in results if not isinstance(result, BaseException) for model in result]
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors and len(errors) == len(results):
+            raise Exception(f"API call failed: {str(errors[0])}")
+        return tuple(dict.fromkeys(models))
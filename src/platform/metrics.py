@@ -0,0 +1,242 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Latencies go into streaming quantile sketches: logarithmically bucketed histograms with a
+bounded relative error (as in DDSketch). Memory stays constant however many samples arrive,
+and the same buckets give both the Prometheus ``le`` histogram and percentiles such as the
+P95 latency target of the design doc.
+
+Stage timings are labelled with the predictor type of the request being served. The service
+sets it with :func:`track_request`, and platform code records stages with :func:`stage`.
+"""
+
+import contextvars
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 20.0, 30.0, 60.0, 120.0)
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+REQUEST_DURATION = "matcher_request_duration_seconds"
+STAGE_DURATION = "matcher_stage_duration_seconds"
+INFLIGHT_REQUESTS = "matcher_inflight_requests"
+LM_TOKENS = "matcher_lm_tokens_total"
+PROMPT_TOKENS = "matcher_lm_prompt_tokens_total"
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Dict[str, str], float]
+Collector = Callable[[], Iterable[Sample]]
+
+current_predictor: contextvars.ContextVar[str] = contextvars.ContextVar("current_predictor", default="none")
+request_started: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_started", default=None)
+prompt_tokens: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("prompt_tokens", default=None)
+
+
+class QuantileSketch:
+    """Streaming histogram with logarithmic buckets and bounded relative error."""
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-6):
+        """
+        Initialize an empty sketch.
+
+        Args:
+            relative_accuracy: Maximum relative error of the reported quantiles
+            min_value: Values at or below it are counted in a single zero bucket
+        """
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.buckets: Dict[int, int] = defaultdict(int)
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        if value <= self.min_value:
+            self.zero_count += 1
+        else:
+            # Bucket k holds values in (gamma^(k-1), gamma^k]
+            self.buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Return the approximate ``q``-quantile (0 if the sketch is empty)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma**key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def count_below(self, bound: float) -> int:
+        """Return the number of values whose bucket lies at or below ``bound``."""
+        limit = math.log(bound) / self._log_gamma if bound > 0 else -math.inf
+        return self.zero_count + sum(count for key, count in self.buckets.items() if key <= limit + 1e-9)
+
+
+class MetricsRegistry:
+    """Thread-safe store of latency sketches, counters and gauges."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._sketches: Dict[str, Dict[Labels, QuantileSketch]] = defaultdict(dict)
+        self._values: Dict[str, Dict[Labels, float]] = defaultdict(lambda: defaultdict(float))
+        self._collectors: List[Tuple[str, str, str, Collector]] = []
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        """Register the type (``histogram``, ``counter`` or ``gauge``) and help text of a metric."""
+        self._help[name] = (kind, help_text)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            sketch = self._sketches[name].get(key)
+            if sketch is None:
+                sketch = self._sketches[name][key] = QuantileSketch()
+            sketch.add(value)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """Add ``value`` to a counter or gauge (negative values decrement gauges)."""
+        with self._lock:
+            self._values[name][tuple(sorted(labels.items()))] += value
+
+    def sketch(self, name: str, **labels: str) -> Optional[QuantileSketch]:
+        return self._sketches.get(name, {}).get(tuple(sorted(labels.items())))
+
+    def value(self, name: str, **labels: str) -> float:
+        return self._values.get(name, {}).get(tuple(sorted(labels.items())), 0.0)
+
+    def register_collector(self, name: str, kind: str, help_text: str, collector: Collector) -> None:
+        """Register a callback producing ``(suffix, labels, value)`` samples of a metric at scrape time."""
+        self._collectors.append((name, kind, help_text, collector))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in self._sketches.items():
+                _, help_text = self._help.get(name, ("histogram", name))
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for labels, sketch in sorted(series.items()):
+                    for bound in LATENCY_BUCKETS:
+                        lines.append(
+                            _sample(f"{name}_bucket", labels + (("le", _number(bound)),), sketch.count_below(bound))
+                        )
+                    lines.append(_sample(f"{name}_bucket", labels + (("le", "+Inf"),), sketch.count))
+                    lines.append(_sample(f"{name}_sum", labels, sketch.sum))
+                    lines.append(_sample(f"{name}_count", labels, sketch.count))
+
+                quantile_name = name.replace("_seconds", "_quantile_seconds")
+                lines += [f"# HELP {quantile_name} Streaming estimate of {help_text[0].lower()}{help_text[1:]}"]
+                lines += [f"# TYPE {quantile_name} gauge"]
+                for labels, sketch in sorted(series.items()):
+                    for q in QUANTILES:
+                        lines.append(_sample(quantile_name, labels + (("quantile", str(q)),), sketch.quantile(q)))
+
+            for name, series in self._values.items():
+                kind, help_text = self._help.get(name, ("gauge", name))
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                lines += [_sample(name, labels, value) for labels, value in sorted(series.items())]
+
+        for name, kind, help_text, collector in self._collectors:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for suffix, labels, value in collector():
+                lines.append(_sample(name + suffix, tuple(sorted(labels.items())), value))
+        return "\n".join(lines) + "\n"
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+def _sample(name: str, labels: Labels, value: float) -> str:
+    rendered = ",".join(f'{key}="{_escape(val)}"' for key, val in labels)
+    return f"{name}{{{rendered}}} {_number(value)}" if rendered else f"{name} {_number(value)}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+registry.describe(REQUEST_DURATION, "histogram", "Time spent serving a request, per predictor type")
+registry.describe(STAGE_DURATION, "histogram", "Time spent in each processing stage, per predictor type")
+registry.describe(INFLIGHT_REQUESTS, "gauge", "Number of requests being served, per predictor type")
+registry.describe(LM_TOKENS, "counter", "Tokens processed by the LM backend, per model and kind")
+registry.describe(PROMPT_TOKENS, "counter", "Prompt tokens sent to the LM backend, per model and prompt section")
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Record the duration of a processing stage for the predictor of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(STAGE_DURATION, time.perf_counter() - start, predictor=current_predictor.get(), stage=name)
+
+
+@contextmanager
+def track_request(predictor_type: str) -> Iterator[None]:
+    """
+    Record a request served by the given predictor type.
+
+    Counts it as in flight, records its total duration and the time spent parsing and
+    validating it (from :data:`request_started`, set when the request arrives), and labels
+    the stages recorded while it runs with the predictor type.
+    """
+    now = time.perf_counter()
+    started = request_started.get()
+    if started is not None:
+        registry.observe(STAGE_DURATION, now - started, predictor=predictor_type, stage="validation")
+
+    token = current_predictor.set(predictor_type)
+    registry.inc(INFLIGHT_REQUESTS, predictor=predictor_type)
+    try:
+        yield
+    finally:
+        registry.inc(INFLIGHT_REQUESTS, -1, predictor=predictor_type)
+        registry.observe(REQUEST_DURATION, time.perf_counter() - (started or now), predictor=predictor_type)
+        current_predictor.reset(token)
+
+
+def record_lm_usage(model: str, usage: Optional[Dict[str, int]]) -> None:
+    """Count the prompt and completion tokens reported in an OpenAI-compatible ``usage`` block."""
+    if not usage:
+        return
+    for kind in ("prompt", "completion"):
+        tokens = usage.get(f"{kind}_tokens")
+        if tokens:
+            registry.inc(LM_TOKENS, tokens, model=model, kind=kind)
+
+
+@contextmanager
+def count_prompt_tokens() -> Iterator[Dict[str, int]]:
+    """Collect, per prompt section, the prompt tokens of the LM calls made inside the block."""
+    counts: Dict[str, int] = {}
+    token = prompt_tokens.set(counts)
+    try:
+        yield counts
+    finally:
+        prompt_tokens.reset(token)
+
+
+def record_prompt_tokens(model: str, sections: Dict[str, int]) -> None:
+    """Count the tokens of each section of a prompt, globally and for the current request."""
+    counts = prompt_tokens.get()
+    for section, tokens in sections.items():
+        registry.inc(PROMPT_TOKENS, tokens, model=model, section=section)
+        if counts is not None:
+            counts[section] = counts.get(section, 0) + tokens
@@ -0,0 +1,164 @@
+"""
+Token budgets for LM prompts.
+
+CVs extracted from PDFs can be tens of thousands of tokens long. Sent as they are, they slow
+down prefill and overflow the model's context. Each variable section of the prompt gets a
+token budget. A section over its budget is first compressed (whitespace and repeated lines,
+such as PDF page headers, are dropped) and then truncated at a token boundary.
+
+Token counts come from a local tokenizer: a Hugging Face tokenizer named by ``LM_TOKENIZER``
+(a local path or a model already in the cache), or an approximation of about four characters
+per token. Counts are cached by document hash, and static blocks are counted once.
+"""
+
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.platform.cache import LRUCache, text_hash
+from src.platform.metrics import registry as metrics
+
+PROMPT_TRUNCATIONS = "matcher_lm_prompt_truncations_total"
+metrics.describe(PROMPT_TRUNCATIONS, "counter", "Prompt sections shortened to fit their token budget, per action")
+
+TRUNCATION_MARKER = "\n[...]"
+
+# Spans of at most four word characters, or single punctuation marks
+APPROXIMATE_TOKEN = re.compile(r"\w{1,4}|[^\w\s]")
+
+
+class TokenCounter:
+    """Approximate tokenizer: about one token per four characters of a word or per punctuation mark."""
+
+    name = "approximate"
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """Return the (start, end) character offsets of the tokens of ``text``."""
+        return [match.span() for match in APPROXIMATE_TOKEN.finditer(text)]
+
+    def count(self, text: str) -> int:
+        return len(self.spans(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Return the longest prefix of ``text`` with at most ``max_tokens`` tokens."""
+        spans = self.spans(text)
+        if len(spans) <= max_tokens:
+            return text
+        return text[: spans[max_tokens - 1][1]] if max_tokens > 0 else ""
+
+
+class HFTokenCounter(TokenCounter):
+    """Token counter backed by a (fast) Hugging Face tokenizer."""
+
+    def __init__(self, name: str):
+        from transformers import AutoTokenizer
+
+        self.name = name
+        self.tokenizer = AutoTokenizer.from_pretrained(name)
+        # Fast tokenizers are not safe to call concurrently
+        self._lock = threading.Lock()
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        with self._lock:
+            encoding = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        return [tuple(span) for span in encoding["offset_mapping"]]
+
+    def count(self, text: str) -> int:
+        with self._lock:
+            return len(self.tokenizer(text, add_special_tokens=False)["input_ids"])
+
+
+_counters: Dict[str, TokenCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def get_token_counter(name: str = os.getenv("LM_TOKENIZER", "")) -> TokenCounter:
+    """
+    Return the process-wide token counter for a tokenizer name.
+
+    An empty name, or a tokenizer that cannot be loaded, gives the approximate counter.
+    """
+    with _counters_lock:
+        if name not in _counters:
+            counter = TokenCounter()
+            if name:
+                try:
+                    counter = HFTokenCounter(name)
+                except Exception as e:
+                    print(f"Cannot load tokenizer {name}, counting tokens approximately: {e}")
+            _counters[name] = counter
+        return _counters[name]
+
+
+def compress(text: str) -> str:
+    """Collapse runs of whitespace and drop blank and repeated lines."""
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if line and line not in seen:
+            seen.add(line)
+            lines.append(line)
+    return "\n".join(lines)
+
+
+class PromptBudget:
+    """Fits prompt sections into per-section token budgets, caching counts by document hash."""
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        budgets: Dict[str, int],
+        static: Optional[Dict[str, str]] = None,
+        max_entries: int = 4096,
+    ):
+        """
+        Initialize the budget and count the static blocks.
+
+        Args:
+            counter: Tokenizer used for counting and truncation
+            budgets: Maximum number of tokens of each section (0 means unlimited)
+            static: Blocks sent unchanged with every prompt, counted once here
+            max_entries: Number of documents whose counts are cached
+        """
+        self.counter = counter
+        self.budgets = budgets
+        self.static_tokens = {name: counter.count(text) for name, text in (static or {}).items()}
+        self._counts: LRUCache[int] = LRUCache(max_entries=max_entries)
+        self._fitted: LRUCache[Tuple[str, int]] = LRUCache(max_entries=max_entries)
+
+    def count(self, text: str) -> int:
+        """Return the number of tokens of ``text``."""
+        key = text_hash(text)
+        tokens = self._counts.get(key)
+        if tokens is None:
+            tokens = self.counter.count(text)
+            self._counts.put(key, tokens)
+        return tokens
+
+    def fit(self, section: str, text: str) -> Tuple[str, int]:
+        """
+        Shorten ``text`` to the budget of ``section`` if it is over it.
+
+        Returns:
+            Tuple[str, int]: The text to send and its number of tokens
+        """
+        budget = self.budgets.get(section, 0)
+        tokens = self.count(text)
+        if budget <= 0 or tokens <= budget:
+            return text, tokens
+
+        key = (text_hash(text), budget)
+        fitted = self._fitted.get(key)
+        if fitted is None:
+            compressed = compress(text)
+            fitted = compressed, self.count(compressed)
+            if fitted[1] <= budget:
+                metrics.inc(PROMPT_TRUNCATIONS, section=section, action="compressed")
+            else:
+                truncated = self.counter.truncate(compressed, budget - self.count(TRUNCATION_MARKER))
+                fitted = truncated + TRUNCATION_MARKER, self.count(truncated + TRUNCATION_MARKER)
+                metrics.inc(PROMPT_TRUNCATIONS, section=section, action="truncated")
+            self._fitted.put(key, fitted)
+        return fitted
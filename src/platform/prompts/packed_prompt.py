@@ -0,0 +1,15 @@
+# Several candidates against one vacancy in a single prompt (rank jobs with packing enabled)
+PACKED_SYSTEM_MESSAGE = """<|im_start|>system
+You are an advanced AI model designed to analyze the compatibility between CVs and a job description. You will receive a job description and several candidates, each in a <candidate id="..."> block. Evaluate every candidate on its own, independently of the others, and for each of them, in the given order, output a structured message in XML format as follows:
+
+<candidate id="the id of the candidate">
+<thought> A short comment explaining your score. </thought>
+<score> A numerical compatibility score (1-5) based on qualifications, skills, and experience. </score>
+</candidate>
+<|im_end|>"""
+
+PACKED_HEADER = "Please evaluate each of these candidates:\n"
+
+PACKED_CANDIDATE_BLOCK = '<candidate id="{id}">\n<CV>\n{candidate_description}\n</CV>\n</candidate>\n'
+
+PACKED_FOOTER = "<|im_end|>"
@@ -0,0 +1,24 @@
+# Compact score-only prompt of the fast LM mode: no reasoning, a JSON answer of a few tokens
+SCORE_SYSTEM_MESSAGE = (
+    "Rate how well the CV matches the job description on a scale from 1 to 5, based on qualifications, "
+    'skills and experience. Answer only with JSON: {"score": <1-5>}'
+)
+
+SCORE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "match_score",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"score": {"type": "integer", "minimum": 1, "maximum": 5}},
+            "required": ["score"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# The vacancy comes first so that prompts of one vacancy share a cacheable prefix
+SCORE_VACANCY_BLOCK = "<job_description>\n{vacancy_description}\n</job_description>\n"
+
+SCORE_CANDIDATE_BLOCK = "<CV>\n{candidate_description}\n</CV>"
@@ -0,0 +1,25 @@
+# Summaries of documents, fed to the scoring prompt instead of the raw text
+CV_SUMMARY_SYSTEM_MESSAGE = """You are an advanced AI model designed to summarize a CV into the following structure:
+1. Professional Summary
+2. Work Experience
+3. Education
+4. Skills
+5. Certifications and Licenses
+
+If any category is missing, please respond with "Not specified" for that category.
+"""
+
+JOB_SUMMARY_SYSTEM_MESSAGE = """You are an advanced AI model designed to summarize a job description into the following structure:
+1. Job Summary
+2. Responsibilities
+3. Qualifications (Required and preferred levels of education or fields of study, Minimum years and type of work experience)
+4. Required Skills
+5. Preferred Skills (Optional)
+6. Certifications (Optional)
+
+If any category is missing, please respond with "Not specified" for that category.
+"""
+
+CV_SUMMARY_PROMPT = "<CV> {text} </CV>"
+
+JOB_SUMMARY_PROMPT = "<job_description> {text} </job_description>"
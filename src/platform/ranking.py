@@ -0,0 +1,66 @@
+"""Top-k selection of candidates for one vacancy."""
+
+import heapq
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, TypeVar, Union
+
+T = TypeVar("T")
+
+
+class RankedCandidate(NamedTuple):
+    """A scored candidate, identified by its position in the ranking request."""
+
+    index: int
+    score: float
+    description: Optional[str]
+
+
+class TopKSelector:
+    """
+    Streaming partial sort keeping only the ``top_k`` best scored candidates.
+
+    Results can be fed chunk by chunk, so memory stays bounded by ``top_k`` no matter
+    how many candidates are ranked. Ties keep the earlier candidate first.
+    """
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        self._heap: List[Tuple[float, int, Optional[str]]] = []
+        self.errors: Dict[int, str] = {}
+        self.scored = 0
+        # Predictor-specific counters reported with the ranking (e.g. by the cascade)
+        self.stats: Dict[str, int] = {}
+
+    def add(self, index: int, result: Union[Tuple[float, Optional[str]], Exception]) -> None:
+        """Offer one candidate's prediction (or error) to the selection."""
+        if isinstance(result, Exception):
+            self.errors[index] = str(result)
+            return
+
+        score, description = result
+        if score is None:
+            # E.g. an LM answer without a number: an error of this candidate, not of the ranking
+            self.errors[index] = f"No score in prediction: {description}"
+            return
+        self.scored += 1
+        # Min-heap on (score, -index): the root is the worst candidate kept so far
+        item = (float(score), -index, description)
+        if len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def extend(self, results: Iterable[Tuple[int, Union[Tuple[float, Optional[str]], Exception]]]) -> "TopKSelector":
+        for index, result in results:
+            self.add(index, result)
+        return self
+
+    def ranking(self) -> List[RankedCandidate]:
+        """Selected candidates sorted by descending score."""
+        ordered = sorted(self._heap, key=lambda item: item[:2], reverse=True)
+        return [RankedCandidate(-neg_index, score, description) for score, neg_index, description in ordered]
+
+
+def iter_chunks(items: Sequence[T], chunk_size: int) -> Iterator[Tuple[int, Sequence[T]]]:
+    """Yield (start offset, chunk) pairs covering ``items`` in order."""
+    for start in range(0, len(items), chunk_size):
+        yield start, items[start : start + chunk_size]
@@ -1,18 +1,115 @@
-from typing import Tuple
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import joblib
 import numpy as np
 
-from src.platform.base_predictor import BasePredictor
-from src.training_pipeline.data_preprocessing import preprocess_text
+from src.platform.base_predictor import BasePredictor, BatchResult, MatchPair, RankCandidate
+from src.platform.cache import LRUCache, text_hash
+from src.platform.embedding_engine import DEFAULT_MODEL_NAME, EmbeddingEngine, get_embedding_engine
+from src.platform.metrics import stage
+from src.platform.ranking import TopKSelector, iter_chunks
+
+VACANCY = "vacancy"
+CANDIDATE = "candidate"
+
+
+def load_artifact(model_path: str) -> Tuple[Any, str]:
+    """
+    Load a trained Ridge artifact.
+
+    Returns:
+        Tuple[Any, str]: The model and the encoder its features were computed with
+            (``bert-base-uncased`` for artifacts saved before the encoder was recorded)
+    """
+    artifact = joblib.load(model_path)
+    if isinstance(artifact, dict):
+        return artifact["model"], artifact["encoder"]
+    return artifact, DEFAULT_MODEL_NAME
 
 
 class RidgePredictor(BasePredictor):
     """A predictor that uses the trained Ridge model for candidate-vacancy matching."""
 
-    def __init__(self):
-        """Initialize the predictor by loading the trained model."""
-        self.model = joblib.load("models/vacancy_matcher.joblib")
+    def __init__(
+        self,
+        engine: Optional[EmbeddingEngine] = None,
+        model_path: str = "models/vacancy_matcher.joblib",
+        batch_size: int = 32,
+        partial_cache_size: int = int(os.getenv("RIDGE_PARTIAL_CACHE_SIZE", "100000")),
+    ):
+        """
+        Initialize the predictor by loading the trained model.
+
+        Args:
+            engine: Embedding engine used to encode texts (the process-wide engine of the
+                artifact's encoder if None)
+            model_path: Path to the trained Ridge model
+            batch_size: Number of texts per padded tokenizer batch in :meth:`predict_batch`
+            partial_cache_size: Maximum number of cached per-document partial scores
+        """
+        self.model, self.encoder = load_artifact(model_path)
+        self.engine = engine or get_embedding_engine(self.encoder)
+        if getattr(self.engine, "model_name", self.encoder) != self.encoder:
+            raise ValueError(f"{model_path} was trained on {self.encoder} embeddings, not {self.engine.model_name}")
+        self.batch_size = batch_size
+
+        # The features are [vacancy_emb, candidate_emb] fed into a linear model, so the raw
+        # score splits into w_v·v + w_c·c + b and each document's term can be cached alone.
+        coef = np.ravel(self.model.coef_)
+        dim = coef.shape[0] // 2
+        self._weights = {VACANCY: coef[:dim], CANDIDATE: coef[dim:]}
+        self._intercept = float(np.ravel(self.model.intercept_)[0])
+        self.partial_cache: LRUCache[float] = LRUCache(partial_cache_size)
+
+    def partial_scores(self, texts: Sequence[str], role: str) -> np.ndarray:
+        """
+        Return each document's additive contribution to the raw Ridge score.
+
+        Contributions are cached by text hash, so each document is embedded once no
+        matter how many pairs it appears in. Missing documents are embedded in one batch.
+
+        Args:
+            texts: Documents to score
+            role: ``"vacancy"`` or ``"candidate"``, selecting the half of the coefficients
+
+        Returns:
+            np.ndarray: One partial score per text
+        """
+        weights = self._weights[role]
+        partials = np.empty(len(texts), dtype=np.float64)
+        missing: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            cached = self.partial_cache.get((role, text_hash(text)))
+            if cached is None:
+                missing.setdefault(text, []).append(i)
+            else:
+                partials[i] = cached
+
+        if missing:
+            embeddings = self.engine.embed_batch(list(missing), batch_size=self.batch_size)
+            with stage("ridge_predict"):
+                values = embeddings @ weights
+            for (text, positions), value in zip(missing.items(), values):
+                self.partial_cache.put((role, text_hash(text)), float(value))
+                partials[positions] = value
+        return partials
+
+    def score_matrix(self, vacancies: Sequence[str], candidates: Sequence[str]) -> np.ndarray:
+        """
+        Score every vacancy against every candidate.
+
+        Costs M + N embeddings (fewer on cache hits) and an M x N outer sum.
+
+        Returns:
+            np.ndarray: Matrix of scores between 0 and 5, one row per vacancy
+        """
+        raw = (
+            self.partial_scores(vacancies, VACANCY)[:, None]
+            + self.partial_scores(candidates, CANDIDATE)[None, :]
+            + self._intercept
+        )
+        return np.round(np.clip(raw * 5, 0, 5), 2)
 
     def predict(
         self,
@@ -31,17 +128,81 @@ class RidgePredictor(BasePredictor):
         Returns:
             Tuple[float, str]: Score between 0 and 5 and a description of the match
         """
-        # Preprocess the input texts
-        features = preprocess_text(candidate_description, vacancy_description, hr_comment)
-        features = features.reshape(1, -1)  # Reshape for single prediction
+        # Note: HR comment is not used in the current model version
+        raw_score = (
+            self.partial_scores([vacancy_description], VACANCY)[0]
+            + self.partial_scores([candidate_description], CANDIDATE)[0]
+            + self._intercept
+        )
+
+        score = self._scale(raw_score)
+        return score, self._describe(score)
+
+    def predict_batch(self, pairs: Sequence[MatchPair]) -> List[BatchResult]:
+        """
+        Predict match scores for many pairs with batched embedding passes.
+
+        Every distinct text is embedded once in padded batches, and pair scores are sums of
+        cached per-document partial scores.
+
+        Args:
+            pairs: Sequence of (candidate_description, vacancy_description, hr_comment) tuples
+
+        Returns:
+            List[BatchResult]: (score, description) per pair, or the error if the batch failed
+        """
+        if not pairs:
+            return []
+
+        try:
+            scores = (
+                self.partial_scores([vacancy for _, vacancy, _ in pairs], VACANCY)
+                + self.partial_scores([candidate for candidate, _, _ in pairs], CANDIDATE)
+                + self._intercept
+            )
+        except Exception as e:
+            return [e] * len(pairs)
+
+        return self._results(scores)
+
+    def rank(
+        self,
+        vacancy_description: str,
+        candidates: Sequence[RankCandidate],
+        top_k: int = 10,
+        chunk_size: int = 256,
+    ) -> TopKSelector:
+        """Rank candidates for one vacancy, scoring the vacancy only once (see :meth:`BasePredictor.rank`)."""
+        selector = TopKSelector(top_k)
+        try:
+            vacancy_score = self.partial_scores([vacancy_description], VACANCY)[0] + self._intercept
+        except Exception as e:
+            return selector.extend((index, e) for index in range(len(candidates)))
+
+        for start, chunk in iter_chunks(candidates, chunk_size):
+            try:
+                scores = vacancy_score + self.partial_scores([candidate for candidate, _ in chunk], CANDIDATE)
+                results = self._results(scores)
+            except Exception as e:
+                results = [e] * len(chunk)
+            selector.extend(enumerate(results, start))
+        return selector
 
-        # Make prediction
-        score = self.model.predict(features)[0]
+    def _results(self, scores: np.ndarray) -> List[BatchResult]:
+        results: List[BatchResult] = []
+        for raw_score in scores:
+            score = self._scale(raw_score)
+            results.append((score, self._describe(score)))
+        return results
 
+    @staticmethod
+    def _scale(score: float) -> float:
         # Ensure score is between 0 and 5
         score = np.clip(score * 5, 0, 5)  # Scale up prediction to 0-5 range
-        score = round(score, 2)
+        return round(score, 2)
 
+    @staticmethod
+    def _describe(score: float) -> str:
         # Generate description based on score
         if score >= 4:
             description = "Excellent match! The candidate's profile strongly aligns with the position requirements."
@@ -52,7 +213,7 @@ class RidgePredictor(BasePredictor):
         else:
             description = "Limited match. The candidate's profile shows minimal alignment with the requirements."
 
-        return score, description
+        return description
 
     def get_available_models(self) -> Tuple[str]:
         """Return the available model version."""
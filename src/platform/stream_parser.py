@@ -0,0 +1,94 @@
+"""
+Incremental parser of streamed ``<thought>``/``<score>`` LM completions.
+
+Tokens arrive in arbitrary pieces, so a tag may be split across chunks. The parser only
+emits text it knows lies inside a tag. A trailing ``<`` that may start a closing tag is held
+back until the next chunk.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+OPEN_TAG = re.compile(r"<(thoughts?|score)>")
+CLOSE_TAGS = {"thought": re.compile(r"</thoughts?>"), "score": re.compile(r"</score>")}
+PARTIAL_TAGS = {
+    None: ("<thought>", "<thoughts>", "<score>"),
+    "thought": ("</thought>", "</thoughts>"),
+    "score": ("</score>",),
+}
+
+# ("thought", text delta) or ("score", value)
+StreamEvent = Tuple[str, object]
+
+
+def partial_tag_start(buffer: str, tags: Tuple[str, ...]) -> int:
+    """Return where a tag possibly cut by the end of ``buffer`` starts, or -1."""
+    start = buffer.rfind("<")
+    if start != -1 and any(tag.startswith(buffer[start:]) for tag in tags):
+        return start
+    return -1
+
+
+def parse_score(text: str) -> Optional[float]:
+    """Parse a score written as ``4`` or ``4/5`` (None if it is not a number)."""
+    try:
+        return float(text.split("/")[0].strip())
+    except ValueError:
+        return None
+
+
+class StreamingTagParser:
+    """Turns completion chunks into thought deltas and the score."""
+
+    def __init__(self):
+        self.text = ""
+        self.thought = ""
+        self.score: Optional[float] = None
+        self._buffer = ""
+        self._section: Optional[str] = None
+        self._score_text = ""
+
+    def feed(self, chunk: str) -> List[StreamEvent]:
+        """Consume a chunk and return the events it completes."""
+        self.text += chunk
+        self._buffer += chunk
+        events: List[StreamEvent] = []
+        while True:
+            if self._section is None:
+                match = OPEN_TAG.search(self._buffer)
+                if match is None:
+                    # Keep a possible partial opening tag for the next chunk
+                    start = partial_tag_start(self._buffer, PARTIAL_TAGS[None])
+                    self._buffer = self._buffer[start:] if start != -1 else ""
+                    return events
+                self._section = "score" if match.group(1) == "score" else "thought"
+                self._buffer = self._buffer[match.end() :]
+                continue
+
+            match = CLOSE_TAGS[self._section].search(self._buffer)
+            end = match.start() if match else partial_tag_start(self._buffer, PARTIAL_TAGS[self._section])
+            content = self._buffer if end == -1 else self._buffer[:end]
+            self._buffer = self._buffer[len(content) :]
+            self._emit(content, events)
+
+            if match is None:
+                return events
+            self._buffer = self._buffer[match.end() - match.start() :]
+            if self._section == "score":
+                self.score = parse_score(self._score_text)
+                if self.score is not None:
+                    events.append(("score", self.score))
+            self._section = None
+
+    def _emit(self, content: str, events: List[StreamEvent]) -> None:
+        if not content:
+            return
+        if self._section == "thought":
+            # Leading whitespace of the thought is not worth a render
+            if not self.thought:
+                content = content.lstrip()
+            if content:
+                self.thought += content
+                events.append(("thought", content))
+        else:
+            self._score_text += content
@@ -0,0 +1,203 @@
+"""
+Summaries of CVs and vacancies, made once per document and fed to the scoring prompt.
+
+Raw CVs are long and mostly noise for scoring. Each document is summarized by the LM once
+into a fixed structure (see :mod:`src.platform.prompts.summary_prompt`). The summary is
+stored in a local SQLite database by the hash of the document, so a vacancy summarized for
+its first applicant is reused for all the others, across requests and restarts. Documents
+already shorter than ``SUMMARY_MIN_TOKENS`` are used as they are.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.platform.cache import text_hash
+from src.platform.metrics import registry as metrics
+from src.platform.prompts.summary_prompt import (
+    CV_SUMMARY_PROMPT,
+    CV_SUMMARY_SYSTEM_MESSAGE,
+    JOB_SUMMARY_PROMPT,
+    JOB_SUMMARY_SYSTEM_MESSAGE,
+)
+
+SUMMARIES = "matcher_summaries_total"
+metrics.describe(SUMMARIES, "counter", "Documents passed through the summarizer, per kind and result")
+
+CV = "cv"
+VACANCY = "vacancy"
+
+PROMPTS = {
+    CV: (CV_SUMMARY_SYSTEM_MESSAGE, CV_SUMMARY_PROMPT),
+    VACANCY: (JOB_SUMMARY_SYSTEM_MESSAGE, JOB_SUMMARY_PROMPT),
+}
+
+
+class SummaryStore:
+    """Summaries kept in a local SQLite database, keyed by document hash."""
+
+    def __init__(self, path: str = "data/summaries.sqlite3"):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, kind TEXT NOT NULL, summary TEXT NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, kind: str, summary: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO summaries (key, kind, summary) VALUES (?, ?, ?)", (key, kind, summary)
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_stores: Dict[str, SummaryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_summary_store(path: str = os.getenv("SUMMARY_CACHE_PATH", "data/summaries.sqlite3")) -> SummaryStore:
+    """Return the process-wide summary store of a database path."""
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = SummaryStore(path)
+        return _stores[path]
+
+
+def close_summary_stores() -> None:
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
+
+
+class DocumentSummarizer:
+    """Summarizes documents with the LM, at most once per document."""
+
+    def __init__(
+        self,
+        complete: Callable[[dict], Awaitable[Tuple[str, Optional[str]]]],
+        model: str,
+        store: SummaryStore,
+        count_tokens: Callable[[str], int],
+        min_tokens: int = int(os.getenv("SUMMARY_MIN_TOKENS", "256")),
+        max_tokens: int = int(os.getenv("SUMMARY_MAX_TOKENS", "512")),
+    ):
+        """
+        Initialize the summarizer.
+
+        Args:
+            complete: Sends a chat completion payload and returns the content and finish reason of the answer
+            model: Model identifier to use (part of the cache key)
+            store: Persistent store of the summaries
+            count_tokens: Token counter deciding which documents are worth summarizing
+            min_tokens: Documents with fewer tokens are used as they are
+            max_tokens: Maximum tokens of a summary
+        """
+        self.complete = complete
+        self.model = model
+        self.store = store
+        self.count_tokens = count_tokens
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self._inflight: Dict[str, "asyncio.Future[str]"] = {}
+
+    def key(self, text: str, kind: str) -> str:
+        # Whitespace does not change a summary; the model does
+        return text_hash(f"{self.model}\0{kind}\0{' '.join(text.split())}")
+
+    def _payload(self, text: str, kind: str) -> dict:
+        system_message, prompt = PROMPTS[kind]
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": prompt.format(text=text)},
+            ],
+            # Deterministic: the summary is cached and reused for every later match
+            "temperature": 0.0,
+            "max_tokens": self.max_tokens,
+        }
+
+    def stored(self, text: str, kind: str) -> str:
+        """Return the stored summary of a document, or the document itself, without calling the LM."""
+        if self.count_tokens(text) < self.min_tokens:
+            return text
+        summary = self.store.get(self.key(text, kind))
+        return text if summary is None else summary
+
+    async def summarize(self, text: str, kind: str) -> str:
+        """
+        Return the summary of a document, or the document itself if it is short or summarizing fails.
+
+        Concurrent calls for the same document share one LM call.
+        """
+        if self.count_tokens(text) < self.min_tokens:
+            metrics.inc(SUMMARIES, kind=kind, result="skipped")
+            return text
+
+        key = self.key(text, kind)
+        summary = await asyncio.to_thread(self.store.get, key)
+        if summary is not None:
+            metrics.inc(SUMMARIES, kind=kind, result="hit")
+            return summary
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            metrics.inc(SUMMARIES, kind=kind, result="shared")
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            summary, finish_reason = await self.complete(self._payload(text, kind))
+            summary = summary.strip()
+            if finish_reason == "length":
+                # Cut off at max_tokens: never stored, the full text is scored instead
+                print(f"The summary of the {kind} exceeds {self.max_tokens} tokens, scoring the full text")
+                summary = text
+                metrics.inc(SUMMARIES, kind=kind, result="truncated")
+            elif summary:
+                await asyncio.to_thread(self.store.put, key, kind, summary)
+                metrics.inc(SUMMARIES, kind=kind, result="miss")
+            else:
+                summary = text
+                metrics.inc(SUMMARIES, kind=kind, result="error")
+        except asyncio.CancelledError:
+            # Calls sharing this one were not cancelled: they score the full text
+            future.set_result(text)
+            raise
+        except Exception as e:
+            print(f"Cannot summarize the {kind}, scoring the full text: {e}")
+            metrics.inc(SUMMARIES, kind=kind, result="error")
+            summary = text
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(summary)
+        return summary
+
+    async def summarize_many(self, texts: Sequence[str], kind: str, concurrency: int = 8) -> List[str]:
+        """Summarize documents with at most ``concurrency`` LM calls in flight."""
+        slots = asyncio.Semaphore(concurrency)
+
+        async def summarize(text: str) -> str:
+            async with slots:
+                return await self.summarize(text, kind)
+
+        return list(await asyncio.gather(*[summarize(text) for text in texts]))
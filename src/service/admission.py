@@ -0,0 +1,186 @@
+"""
+Admission control with per-predictor concurrency limits and bounded wait queues.
+
+Without a limit every request goes straight to the backend, and under load all of them
+slow down together. Each predictor type admits at most ``max_concurrency`` requests at once.
+Up to ``max_queue`` more wait in FIFO order, and anything beyond that is rejected right away
+with a ``Retry-After`` estimated from the observed service rate. Latency then stays bounded
+by the queue length instead of growing with the offered load.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+from src.platform.metrics import registry as metrics
+
+ADMISSION_WAIT = "matcher_admission_wait_seconds"
+ADMISSION_REJECTED = "matcher_admission_rejected_total"
+
+metrics.describe(ADMISSION_WAIT, "histogram", "Time requests waited in the admission queue, per predictor type")
+metrics.describe(ADMISSION_REJECTED, "counter", "Requests rejected because the admission queue was full")
+
+
+class AdmissionRejected(Exception):
+    """Raised when the wait queue of a predictor is full."""
+
+    def __init__(self, predictor_type: str, retry_after: int):
+        super().__init__(f"Too many pending requests for predictor '{predictor_type}', retry in {retry_after} s")
+        self.predictor_type = predictor_type
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded FIFO wait queue for one predictor type."""
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, smoothing: float = 0.2):
+        """
+        Initialize the controller.
+
+        Args:
+            name: Predictor type, used in errors and metrics
+            max_concurrency: Maximum number of requests served at once
+            max_queue: Maximum number of requests waiting for a slot
+            smoothing: Weight of the newest sample in the moving average of service time
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.smoothing = smoothing
+        self.active = 0
+        self.rejected = 0
+        self.service_time: Optional[float] = None
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def full(self) -> bool:
+        """Whether a request arriving now would be rejected."""
+        return (self.active >= self.max_concurrency or bool(self._waiters)) and self.queued >= self.max_queue
+
+    def retry_after(self) -> int:
+        """Estimate in whole seconds how long until a queued request would get a slot."""
+        if self.service_time is None or self.max_concurrency <= 0:
+            return 1
+        return max(1, math.ceil((self.queued + 1) * self.service_time / self.max_concurrency))
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot.
+
+        Returns:
+            float: Seconds spent waiting in the queue
+
+        Raises:
+            AdmissionRejected: If the queue is full
+        """
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            return 0.0
+        if self.full:
+            self.rejected += 1
+            metrics.inc(ADMISSION_REJECTED, predictor=self.name)
+            raise AdmissionRejected(self.name, self.retry_after())
+
+        start = time.monotonic()
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                # release() may already have popped it while skipping done waiters
+                if future in self._waiters:
+                    self._waiters.remove(future)
+            else:
+                # The slot was handed over just before the cancellation: pass it on
+                self.release()
+            raise
+        return time.monotonic() - start
+
+    def release(self) -> None:
+        """Free a slot, handing it directly to the oldest waiting request if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def record_service_time(self, seconds: float) -> None:
+        if self.service_time is None:
+            self.service_time = seconds
+        else:
+            self.service_time += self.smoothing * (seconds - self.service_time)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """Hold a slot for the duration of the block, yielding the time spent waiting for it."""
+        waited = await self.acquire()
+        metrics.observe(ADMISSION_WAIT, waited, predictor=self.name)
+        start = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.record_service_time(time.monotonic() - start)
+            self.release()
+
+    def stats(self) -> Dict[str, float]:
+        """Return the number of active and queued requests, rejections and the mean service time."""
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "service_time": self.service_time or 0.0,
+        }
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """Parse per-predictor limits written as ``"lm=4:16,ridge=8:128"`` (concurrency:queue)."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, values = item.partition("=")
+        concurrency, _, queue = values.partition(":")
+        limits[name.strip()] = (int(concurrency), int(queue))
+    return limits
+
+
+class AdmissionControl:
+    """Admission controllers of all predictor types."""
+
+    def __init__(
+        self,
+        max_concurrency: int = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "16")),
+        max_queue: int = int(os.getenv("ADMISSION_MAX_QUEUE", "64")),
+        limits: Optional[Dict[str, Tuple[int, int]]] = None,
+    ):
+        """
+        Initialize the controllers.
+
+        Args:
+            max_concurrency: Default concurrency limit of a predictor type
+            max_queue: Default wait queue length of a predictor type
+            limits: Per-type (concurrency, queue) overrides
+                (default from ``ADMISSION_LIMITS``, see :func:`parse_limits`)
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.limits = parse_limits(os.getenv("ADMISSION_LIMITS", "")) if limits is None else limits
+        self.controllers: Dict[str, AdmissionController] = {}
+
+    def controller(self, predictor_type: str) -> AdmissionController:
+        if predictor_type not in self.controllers:
+            max_concurrency, max_queue = self.limits.get(predictor_type, (self.max_concurrency, self.max_queue))
+            self.controllers[predictor_type] = AdmissionController(predictor_type, max_concurrency, max_queue)
+        return self.controllers[predictor_type]
+
+    def slot(self, predictor_type: str):
+        """Hold a slot of the given predictor type (see :meth:`AdmissionController.slot`)."""
+        return self.controller(predictor_type).slot()
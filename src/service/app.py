@@ -1,76 +1,565 @@
+import asyncio
+import json
 import os
-from typing import Optional
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
+from src.platform.base_predictor import BasePredictor
+from src.platform.cascade_predictor import CascadePredictor, LexicalPredictor
+from src.platform.deadline import deadline_scope
 from src.platform.dummy_predictor import DummyPredictor
-from src.platform.lm_predictor import LMPredictor
+from src.platform.embedding_engine import close_embedding_engines
+from src.platform.http_pool import close_http_pool
+from src.platform.lm_backends import close_backend_pools
+from src.platform.lm_predictor import PREDICTION_ERROR_PREFIX, LMPredictor
+from src.platform.metrics import count_prompt_tokens, request_started, track_request
+from src.platform.metrics import registry as metrics
 from src.platform.ridge_predictor import RidgePredictor
+from src.platform.summarizer import close_summary_stores
+from src.service.admission import AdmissionControl, AdmissionRejected
+from src.service.deadlines import ABANDONED, request_timeout, run_with_deadline
+from src.service.jobs import JobRecord, JobRunner, create_job_store
+from src.service.model_catalog import ModelCatalog
 from src.service.models import (
     AvailableModelsPerPredictorResponse,
     AvailableModelsResponse,
+    JobResponse,
+    MatchBatchRequest,
+    MatchBatchResponse,
+    MatchBatchResult,
     MatchRequest,
     MatchResponse,
     PredictorParameters,
     PredictorType,
+    RankedCandidateResult,
+    RankError,
+    RankRequest,
+    RankResponse,
+    ReadinessResponse,
 )
+from src.service.registry import PredictorRegistry
+from src.service.result_cache import MatchResultCache
+from src.training_pipeline.embedding_cache import embedding_cache_stats
 
-app = FastAPI(
-    title="Candidate Scoring API",
-    description="API for predicting candidate match scores for positions",
-    version="1.0.0",
+RANK_CHUNK_SIZE = int(os.getenv("RANK_CHUNK_SIZE", "256"))
+JOB_MAX_WAIT_S = float(os.getenv("JOB_MAX_WAIT_S", "60"))
+
+result_cache = MatchResultCache(
+    max_entries=int(os.getenv("MATCH_CACHE_MAX_ENTRIES", "10000")),
+    ttl=float(os.getenv("MATCH_CACHE_TTL_S", "3600")),
 )
 
+admission = AdmissionControl()
+
 PREDICTOR_CLASSES = {
     "lm": LMPredictor,
     "dummy": DummyPredictor,
     "ridge": RidgePredictor,
+    "cascade": CascadePredictor,
 }
 
 
-def get_predictor(predictor_type: str, parameters: Optional[PredictorParameters] = None):
+def create_predictor(predictor_type: str, parameters: Optional[PredictorParameters] = None):
     """Create a predictor instance with given parameters or default configuration."""
     if predictor_type == "dummy":
         return DummyPredictor()
     elif predictor_type == "lm":
+        # Fields the request leaves unset keep the environment's configuration
+        parameters = parameters or PredictorParameters()
         return LMPredictor(
-            api_base_url=parameters.api_base_url  # type: ignore
-            if parameters
-            else os.getenv("LM_API_BASE_URL", "http://localhost:5001/v1"),  # base host for LMStudio
-            api_key=parameters.api_key  # type: ignore
-            if parameters
-            else os.getenv("LM_API_KEY", "not-needed"),
-            model=parameters.model  # type: ignore
-            if parameters
-            else os.getenv("LM_MODEL", "QuantFactory/Meta-Llama-3-8B-GGUF"),
+            api_base_url=parameters.api_base_url
+            or os.getenv("LM_API_BASE_URL", "http://localhost:5001/v1"),  # base host for LMStudio
+            api_key=parameters.api_key or os.getenv("LM_API_KEY", "not-needed"),
+            model=parameters.model or os.getenv("LM_MODEL", "QuantFactory/Meta-Llama-3-8B-GGUF"),
+            # A request naming its own backend is sent there only
+            api_base_urls=None
+            if parameters.api_base_url
+            else [url for url in os.getenv("LM_API_BASE_URLS", "").split(",") if url],
+            fast=parameters.fast if parameters.fast is not None else os.getenv("LM_FAST_MODE", "0") == "1",
         )
     elif predictor_type == "ridge":
         return RidgePredictor()
+    elif predictor_type == "cascade":
+        # A cheap prefilter (CASCADE_PREFILTER: ridge or lexical) in front of the LM, both shared with the registry
+        prefilter = (
+            LexicalPredictor() if os.getenv("CASCADE_PREFILTER", "ridge") == "lexical" else registry.get("ridge")
+        )
+        return CascadePredictor(prefilter=prefilter, reranker=registry.get("lm", parameters))
 
     return None
 
 
+registry = PredictorRegistry(
+    factory=create_predictor,
+    preload=[name for name in os.getenv("PRELOAD_PREDICTORS", "dummy,ridge").split(",") if name],
+)
+
+
+def get_predictor(predictor_type: str, parameters: Optional[PredictorParameters] = None):
+    """Return the shared predictor instance for the given type and parameters."""
+    return registry.get(predictor_type, parameters)
+
+
+async def load_predictor(predictor_type: str, parameters: Optional[PredictorParameters] = None) -> BasePredictor:
+    """Return the shared predictor (400 for unknown types), building it in a worker thread, off the event loop."""
+    predictor = registry.get(predictor_type, parameters, build=False)
+    if predictor is None:
+        predictor = await asyncio.to_thread(registry.get, predictor_type, parameters)
+    if predictor is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported predictor type: {predictor_type}",
+        )
+    return predictor
+
+
+async def list_models(predictor_type: str) -> Tuple[str, ...]:
+    """List the models of a predictor type, building the predictor off the event loop if needed."""
+    # The cascade reports the models of its reranker, the LM: listing them builds no cascade
+    predictor = await load_predictor("lm" if predictor_type == "cascade" else predictor_type)
+    return await predictor.get_available_models_async()
+
+
+model_catalog = ModelCatalog(
+    sources={predictor_type: partial(list_models, predictor_type) for predictor_type in PREDICTOR_CLASSES},
+    ttl=float(os.getenv("MODEL_CATALOG_TTL_S", "60")),
+    timeout=float(os.getenv("MODEL_CATALOG_TIMEOUT_S", "2")),
+)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Start the background work (predictor warm-up, model catalog refresh, job workers) and release it on shutdown."""
+    warm_up = asyncio.create_task(asyncio.to_thread(registry.warm_up))
+    model_catalog.start()
+    job_runner.start()
+    yield
+    await job_runner.stop()
+    job_runner.store.close()
+    await model_catalog.stop()
+    await warm_up
+    registry.close()
+    close_embedding_engines()
+    close_summary_stores()
+    await close_backend_pools()
+    await close_http_pool()
+
+
+app = FastAPI(
+    title="Candidate Scoring API",
+    description="API for predicting candidate match scores for positions",
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+
+def cache_samples():
+    """Hit and miss counters of the result and embedding caches for ``/metrics``."""
+    yield {"cache": "match_result"}, result_cache.stats()
+    for encoder, stats in embedding_cache_stats().items():
+        yield (
+            {"cache": "embedding", "encoder": encoder},
+            {
+                "hits": stats["memory_hits"] + stats["disk_hits"],
+                "misses": stats["misses"],
+            },
+        )
+
+
+metrics.register_collector(
+    "matcher_cache_requests_total",
+    "counter",
+    "Cache lookups, per cache and result",
+    lambda: [
+        ("", {**labels, "result": result}, stats[counter])
+        for labels, stats in cache_samples()
+        for result, counter in (("hit", "hits"), ("miss", "misses"))
+    ],
+)
+metrics.register_collector(
+    "matcher_cache_hit_ratio",
+    "gauge",
+    "Share of cache lookups that were hits",
+    lambda: [
+        ("", labels, stats["hits"] / (stats["hits"] + stats["misses"]) if stats["hits"] + stats["misses"] else 0.0)
+        for labels, stats in cache_samples()
+    ],
+)
+
+
+metrics.register_collector(
+    "matcher_admission_queue_depth",
+    "gauge",
+    "Requests waiting for an admission slot, per predictor type",
+    lambda: [("", {"predictor": name}, c.queued) for name, c in admission.controllers.items()],
+)
+metrics.register_collector(
+    "matcher_admission_active",
+    "gauge",
+    "Requests holding an admission slot, per predictor type",
+    lambda: [("", {"predictor": name}, c.active) for name, c in admission.controllers.items()],
+)
+
+
+@app.exception_handler(AdmissionRejected)
+async def reject_overload(_: Request, exc: AdmissionRejected) -> JSONResponse:
+    """Answer 429 with a Retry-After hint when a predictor's wait queue is full."""
+    return JSONResponse(status_code=429, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)})
+
+
+@app.middleware("http")
+async def record_request_start(request: Request, call_next):
+    """
+    Remember when a request arrived so that its validation time can be measured.
+
+    Responses of requests that called the LM report the prompt tokens sent in ``X-Prompt-Tokens``.
+    """
+    request_started.set(time.perf_counter())
+    with count_prompt_tokens() as prompt_tokens:
+        response = await call_next(request)
+    if prompt_tokens:
+        response.headers["X-Prompt-Tokens"] = str(sum(prompt_tokens.values()))
+    return response
+
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics",
+    description="Latency histograms per predictor type and stage, in-flight requests, cache hit ratios and LM token counts",
+)
+async def get_metrics() -> PlainTextResponse:
+    """Expose the service metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get(
+    "/readyz",
+    response_model=ReadinessResponse,
+    summary="Readiness probe",
+    description="Reports ready once every preloaded predictor has been loaded and warmed up",
+    responses={503: {"model": ReadinessResponse}},
+)
+async def readyz():
+    """Report whether the service finished warming up its predictors."""
+    readiness = ReadinessResponse(ready=registry.is_ready, predictors=dict(registry.status))
+    return JSONResponse(status_code=200 if readiness.ready else 503, content=readiness.model_dump())
+
+
+def match_cache_key(request: MatchRequest, predictor: BasePredictor) -> str:
+    parameters = request.predictor_parameters
+    return result_cache.key(
+        request.predictor_type.value,
+        getattr(predictor, "model", None) if isinstance(predictor, LMPredictor) else None,
+        getattr(predictor, "temperature", None),
+        (request.candidate_description, request.vacancy_description, request.hr_comment),
+        extra=parameters.model_dump() if parameters else None,
+    )
+
+
+async def run_match(request: MatchRequest, bypass_cache: bool = False) -> Tuple[MatchResponse, str]:
+    """
+    Score a match request through the result cache and admission control.
+
+    Returns:
+        Tuple[MatchResponse, str]: The result and its cache status (see :meth:`MatchResultCache.get_or_compute`)
+    """
+    with track_request(request.predictor_type.value):
+        predictor = await load_predictor(request.predictor_type.value, request.predictor_parameters)
+        key = match_cache_key(request, predictor)
+
+        async def predict():
+            async with admission.slot(request.predictor_type.value):
+                return await predictor.predict_async(
+                    request.candidate_description, request.vacancy_description, request.hr_comment
+                )
+
+        (score, description), cache_status = await result_cache.get_or_compute(
+            key,
+            predict,
+            bypass=bypass_cache,
+            cacheable=lambda result: not (result[1] or "").startswith(PREDICTION_ERROR_PREFIX),
+        )
+        return MatchResponse(score=score, description=description), cache_status
+
+
 @app.post(
     "/match",
     response_model=MatchResponse,
     summary="Calculate match score",
     description="Calculate a match score between a candidate and a position based on provided features",
 )
-async def calculate_match(request: MatchRequest) -> MatchResponse:
-    """Calculate match score between vacancy and candidate."""
-    predictor = get_predictor(request.predictor_type.value, request.predictor_parameters)
-    if not predictor:
+async def calculate_match(
+    request: MatchRequest,
+    response: Response,
+    raw_request: Request,
+    cache_control: Optional[str] = Header(default=None),
+    x_deadline_ms: Optional[int] = Header(default=None),
+) -> MatchResponse:
+    """
+    Calculate match score between vacancy and candidate.
+
+    Results are cached; send ``Cache-Control: no-cache`` to force a fresh prediction.
+    Cache misses wait for an admission slot of the predictor and get 429 when its queue is full.
+    The ``X-Cache`` response header tells whether the result was a hit, a miss, a
+    bypass or coalesced with an identical request in flight.
+
+    The prediction is cancelled when the client disconnects or when the ``X-Deadline-Ms``
+    deadline (capped by the server default) passes, answering 504 in the latter case.
+    """
+    result, cache_status = await run_with_deadline(
+        lambda: run_match(request, bypass_cache="no-cache" in (cache_control or "")),
+        request_timeout(x_deadline_ms),
+        raw_request,
+    )
+    response.headers["X-Cache"] = cache_status
+    return result
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post(
+    "/match/stream",
+    response_class=StreamingResponse,
+    summary="Stream a match score",
+    description=(
+        "Calculate a match score as server-sent events: `thought` events carry the analysis as it is "
+        "generated, `score` arrives as soon as it is known, and `done` carries the final result "
+        "(or `error` if the match could not be completed)"
+    ),
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_match(
+    request: MatchRequest,
+    cache_control: Optional[str] = Header(default=None),
+    x_deadline_ms: Optional[int] = Header(default=None),
+) -> StreamingResponse:
+    """
+    Stream the match of a vacancy and a candidate.
+
+    Cached results are replayed at once and complete results are cached like with ``/match``.
+    Admission control applies to the generation, and its deadline is ``X-Deadline-Ms``
+    capped by the server default. Upstream generation stops once the score is known or
+    the client goes away.
+    """
+    predictor = await load_predictor(request.predictor_type.value, request.predictor_parameters)
+    key = match_cache_key(request, predictor)
+    cached = None if "no-cache" in (cache_control or "") else result_cache.results.get(key)
+    controller = admission.controller(request.predictor_type.value)
+    if cached is None and controller.full:
+        # Reject before the response starts, so that clients get a proper 429
+        raise AdmissionRejected(controller.name, controller.retry_after())
+    headers = {"X-Cache": "miss" if cached is None else "hit", "Cache-Control": "no-cache"}
+    return StreamingResponse(
+        stream_match_events(request, predictor, key, cached, request_timeout(x_deadline_ms)),
+        media_type="text/event-stream",
+        headers=headers,
+    )
+
+
+async def stream_match_events(
+    request: MatchRequest,
+    predictor: BasePredictor,
+    key: str,
+    cached: Optional[Tuple[float, Optional[str]]],
+    timeout: float,
+) -> AsyncIterator[str]:
+    with track_request(request.predictor_type.value):
+        if cached is not None:
+            yield sse_event("score", {"score": cached[0]})
+            yield sse_event("done", MatchResponse(score=cached[0], description=cached[1]).model_dump())
+            return
+
+        deadline = asyncio.get_running_loop().time() + timeout
+        score, description = None, None
+        try:
+            with deadline_scope(timeout):
+                async with admission.slot(request.predictor_type.value):
+                    events = predictor.predict_stream(
+                        request.candidate_description, request.vacancy_description, request.hr_comment
+                    )
+                    try:
+                        while True:
+                            # The deadline only covers waiting for the predictor, never a pending send
+                            async with asyncio.timeout_at(deadline):
+                                try:
+                                    event, value = await anext(events)
+                                except StopAsyncIteration:
+                                    break
+                            if event == "thought":
+                                yield sse_event("thought", {"text": value})
+                            elif event == "score":
+                                yield sse_event("score", {"score": value})
+                            else:
+                                score, description = value
+                    finally:
+                        await events.aclose()
+        except TimeoutError:
+            metrics.inc(ABANDONED, reason="deadline")
+            yield sse_event("error", {"detail": f"Deadline of {timeout:g} s exceeded"})
+            return
+        except AdmissionRejected as e:
+            yield sse_event("error", {"detail": str(e), "retry_after": e.retry_after})
+            return
+
+        if score is None:
+            yield sse_event("error", {"detail": description or "No score in the prediction"})
+            return
+        if not (description or "").startswith(PREDICTION_ERROR_PREFIX):
+            result_cache.results.put(key, (score, description))
+        yield sse_event("done", MatchResponse(score=score, description=description).model_dump())
+
+
+async def run_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a match job submitted through ``POST /jobs``."""
+    result, _ = await run_with_deadline(lambda: run_match(MatchRequest.model_validate(payload)))
+    return result.model_dump()
+
+
+job_runner = JobRunner(create_job_store(), run_job)
+
+
+@app.post(
+    "/jobs",
+    response_model=JobResponse,
+    status_code=202,
+    summary="Submit a match job",
+    description="Queue a match and return a job id immediately; poll `GET /jobs/{job_id}` for the result",
+)
+async def submit_job(request: MatchRequest) -> JobResponse:
+    """Queue a match request for the background workers."""
+    if request.predictor_type.value not in PREDICTOR_CLASSES:
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported predictor type: {request.predictor_type}",
         )
+    if not job_runner.running:
+        raise HTTPException(status_code=503, detail="Job workers are not running")
+    return job_response(await job_runner.submit(request.model_dump(mode="json")))
+
 
-    score, description = predictor.predict(
-        request.candidate_description, request.vacancy_description, request.hr_comment
+@app.get(
+    "/jobs/{job_id}",
+    response_model=JobResponse,
+    summary="Get a match job",
+    description="Return the status of a job, waiting up to `wait` seconds for it to finish",
+    responses={404: {"description": "Unknown or expired job"}},
+)
+async def get_job(job_id: str, wait: float = Query(default=0.0, ge=0.0, le=JOB_MAX_WAIT_S)) -> JobResponse:
+    """Return a job's status and result, optionally long-polling until it finishes."""
+    record = await job_runner.wait(job_id, wait)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job_response(record)
+
+
+def job_response(record: JobRecord) -> JobResponse:
+    return JobResponse(
+        job_id=record.id,
+        status=record.status,
+        result=MatchResponse(**record.result) if record.result is not None else None,
+        error=record.error,
+        created_at=record.created_at,
+        finished_at=record.finished_at,
     )
 
-    return MatchResponse(score=score, description=description)
+
+@app.post(
+    "/match/batch",
+    response_model=MatchBatchResponse,
+    summary="Calculate match scores for many pairs",
+    description="Calculate match scores for a batch of candidate-position pairs, keeping per-item errors",
+)
+async def calculate_match_batch(
+    request: MatchBatchRequest,
+    raw_request: Request,
+    x_deadline_ms: Optional[int] = Header(default=None),
+) -> MatchBatchResponse:
+    """Calculate match scores for a batch of vacancy-candidate pairs."""
+    with track_request(request.predictor_type.value):
+        predictor = await load_predictor(request.predictor_type.value, request.predictor_parameters)
+        pairs = [(item.candidate_description, item.vacancy_description, item.hr_comment) for item in request.items]
+
+        async def predict_batch():
+            # Waiting for the admission slot counts against the deadline too
+            async with admission.slot(request.predictor_type.value):
+                return await predictor.predict_batch_async(pairs)
+
+        batch_results = await run_with_deadline(predict_batch, request_timeout(x_deadline_ms), raw_request)
+
+        results = []
+        for result in batch_results:
+            if isinstance(result, Exception):
+                results.append(MatchBatchResult(error=str(result)))
+            else:
+                score, description = result
+                if score is None:
+                    # E.g. an LM answer without a number, reported like in /rank
+                    results.append(MatchBatchResult(error=f"No score in prediction: {description}"))
+                else:
+                    results.append(MatchBatchResult(score=score, description=description))
+
+        return MatchBatchResponse(results=results)
+
+
+@app.post(
+    "/rank",
+    response_model=RankResponse,
+    summary="Rank candidates for a vacancy",
+    description="Score many candidates against one vacancy and return the top-k sorted by score",
+)
+async def rank_candidates(
+    request: RankRequest,
+    raw_request: Request,
+    x_deadline_ms: Optional[int] = Header(default=None),
+) -> RankResponse:
+    """Rank candidates for a vacancy and return the best ones."""
+    with track_request(request.predictor_type.value):
+        predictor = await load_predictor(request.predictor_type.value, request.predictor_parameters)
+        candidates = [(candidate.candidate_description, candidate.hr_comment) for candidate in request.candidates]
+        cutoffs = {}
+        if isinstance(predictor, CascadePredictor):
+            cutoffs = {"rerank_top_k": request.rerank_top_k, "rerank_threshold": request.rerank_threshold}
+
+        async def rank():
+            # Waiting for the admission slot counts against the deadline too
+            async with admission.slot(request.predictor_type.value):
+                return await predictor.rank_async(
+                    request.vacancy_description,
+                    candidates,
+                    top_k=request.top_k,
+                    chunk_size=RANK_CHUNK_SIZE,
+                    **cutoffs,
+                )
+
+        selection = await run_with_deadline(rank, request_timeout(x_deadline_ms), raw_request)
+
+        return RankResponse(
+            results=[
+                RankedCandidateResult(
+                    index=ranked.index,
+                    id=request.candidates[ranked.index].id,
+                    score=ranked.score,
+                    description=ranked.description,
+                )
+                for ranked in selection.ranking()
+            ],
+            errors=[
+                RankError(index=index, id=request.candidates[index].id, error=error)
+                for index, error in sorted(selection.errors.items())
+            ],
+            total=len(request.candidates),
+            stats=selection.stats,
+        )
 
 
 @app.get(
@@ -89,15 +578,19 @@ async def get_available_models() -> AvailableModelsResponse:
     "/available-models-per-predictor",
     response_model=AvailableModelsPerPredictorResponse,
     summary="Get available models for each predictor type",
-    description="Returns a dictionary mapping predictor types to their available models",
+    description=(
+        "Returns a dictionary mapping predictor types to their available models. "
+        "The catalog is cached; types whose backend is slow or unreachable keep their last known "
+        "models and are marked in `stale`."
+    ),
 )
 async def get_available_models_per_predictor() -> AvailableModelsPerPredictorResponse:
     """Get available models for each predictor type."""
-    models_dict = {
-        PredictorType(predictor_type): predictor_class().get_available_models()  # type: ignore
-        for predictor_type, predictor_class in PREDICTOR_CLASSES.items()
-    }
-    return AvailableModelsPerPredictorResponse(models=models_dict)
+    catalog = await model_catalog.get()
+    return AvailableModelsPerPredictorResponse(
+        models={PredictorType(name): models for name, (models, _) in catalog.items()},
+        stale={PredictorType(name): stale for name, (_, stale) in catalog.items()},
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,78 @@
+"""
+Deadlines and cancellation of abandoned requests.
+
+Clients may send ``X-Deadline-Ms`` with the number of milliseconds they are willing to wait.
+The server caps it with ``REQUEST_DEADLINE_S``. The work of a request is cancelled once its
+deadline passes or its client disconnects. Cancellation reaches the in-flight LM call and
+closes its connection, so the LLM server stops generating tokens nobody will read.
+"""
+
+import asyncio
+import os
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from fastapi import HTTPException, Request
+
+from src.platform.deadline import deadline_scope
+from src.platform.metrics import registry as metrics
+
+T = TypeVar("T")
+
+DEADLINE_HEADER = "X-Deadline-Ms"
+DEFAULT_DEADLINE_S = float(os.getenv("REQUEST_DEADLINE_S", "180"))
+DISCONNECT_POLL_S = float(os.getenv("DISCONNECT_POLL_S", "0.5"))
+
+# Not an official HTTP status: nginx's code for requests abandoned by the client
+CLIENT_CLOSED_REQUEST = 499
+
+ABANDONED = "matcher_requests_abandoned_total"
+metrics.describe(ABANDONED, "counter", "Requests whose work was cancelled, per reason")
+
+
+def request_timeout(deadline_ms: Optional[int]) -> float:
+    """Return the time budget of a request: the client's deadline capped by the server default."""
+    if deadline_ms is None or deadline_ms <= 0:
+        return DEFAULT_DEADLINE_S
+    return min(deadline_ms / 1000, DEFAULT_DEADLINE_S)
+
+
+async def _cancel_on_disconnect(request: Request, work: "asyncio.Task[T]", disconnected: asyncio.Event) -> None:
+    while not work.done():
+        if await request.is_disconnected():
+            disconnected.set()
+            work.cancel()
+            return
+        await asyncio.sleep(DISCONNECT_POLL_S)
+
+
+async def run_with_deadline(
+    compute: Callable[[], Awaitable[T]],
+    timeout: float = DEFAULT_DEADLINE_S,
+    request: Optional[Request] = None,
+) -> T:
+    """
+    Run ``compute`` under a deadline, cancelling it if the client of ``request`` goes away.
+
+    The deadline is visible to platform code through :func:`src.platform.deadline.remaining`.
+
+    Raises:
+        HTTPException: 504 when the deadline passes, 499 when the client disconnected
+    """
+    with deadline_scope(timeout):
+        work = asyncio.ensure_future(compute())
+        disconnected = asyncio.Event()
+        watcher = asyncio.create_task(_cancel_on_disconnect(request, work, disconnected)) if request else None
+        try:
+            async with asyncio.timeout(timeout):
+                return await work
+        except TimeoutError:
+            metrics.inc(ABANDONED, reason="deadline")
+            raise HTTPException(status_code=504, detail=f"Deadline of {timeout:g} s exceeded")
+        except asyncio.CancelledError:
+            if not disconnected.is_set():
+                raise
+            metrics.inc(ABANDONED, reason="disconnect")
+            raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed the request")
+        finally:
+            if watcher is not None:
+                watcher.cancel()
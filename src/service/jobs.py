@@ -0,0 +1,319 @@
+"""
+Asynchronous jobs for long-running matches.
+
+An LM match can take minutes, and holding an HTTP connection open that long ties up proxies
+and clients. ``POST /jobs`` stores the request and returns a job id right away. A pool of
+in-process workers runs the match, and clients poll ``GET /jobs/{id}`` (optionally waiting
+for the result). Jobs live in a pluggable store: in memory by default, or in a local SQLite
+file that survives restarts.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.service.admission import AdmissionRejected
+from src.service.models import JobStatus
+
+FINISHED = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+@dataclass
+class JobRecord:
+    id: str
+    status: JobStatus
+    payload: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    finished_at: Optional[float] = None
+
+
+class JobStore(ABC):
+    """Storage of jobs and their results."""
+
+    @abstractmethod
+    def create(self, payload: Dict[str, Any]) -> JobRecord:
+        """Store a new pending job."""
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        """Return a job or None if it does not exist (or expired)."""
+        pass
+
+    @abstractmethod
+    def update(
+        self,
+        job_id: str,
+        status: JobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Change the status of a job, storing its result or error once it finished."""
+        pass
+
+    @abstractmethod
+    def unfinished(self) -> List[str]:
+        """Return the ids of jobs that are pending or running, oldest first."""
+        pass
+
+    def close(self) -> None:
+        pass
+
+    @staticmethod
+    def new_record(payload: Dict[str, Any]) -> JobRecord:
+        return JobRecord(id=uuid.uuid4().hex, status=JobStatus.PENDING, payload=payload, created_at=time.time())
+
+
+class InMemoryJobStore(JobStore):
+    """Jobs kept in a dictionary; finished jobs expire after ``ttl`` seconds."""
+
+    def __init__(self, ttl: float = 86400.0):
+        self.ttl = ttl
+        self._jobs: Dict[str, JobRecord] = {}
+        self._lock = threading.Lock()
+
+    def create(self, payload: Dict[str, Any]) -> JobRecord:
+        record = self.new_record(payload)
+        with self._lock:
+            self._prune()
+            self._jobs[record.id] = record
+        return replace(record)
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        with self._lock:
+            record = self._jobs.get(job_id)
+            # A copy, so that callers see a snapshot like with any other store
+            return replace(record) if record is not None else None
+
+    def update(
+        self,
+        job_id: str,
+        status: JobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            record = self._jobs.get(job_id)
+            if record is None:
+                return
+            record.status, record.result, record.error = status, result, error
+            if status in FINISHED:
+                record.finished_at = time.time()
+
+    def unfinished(self) -> List[str]:
+        with self._lock:
+            return [job_id for job_id, record in self._jobs.items() if record.status not in FINISHED]
+
+    def _prune(self) -> None:
+        expired = time.time() - self.ttl
+        for job_id in [job_id for job_id, r in self._jobs.items() if r.finished_at and r.finished_at < expired]:
+            del self._jobs[job_id]
+
+
+class SqliteJobStore(JobStore):
+    """Jobs kept in a local SQLite database; finished jobs expire after ``ttl`` seconds."""
+
+    def __init__(self, path: str = "data/jobs.sqlite3", ttl: float = 86400.0):
+        self.ttl = ttl
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, result TEXT, error TEXT, "
+                "created_at REAL NOT NULL, finished_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at)")
+
+    def create(self, payload: Dict[str, Any]) -> JobRecord:
+        record = self.new_record(payload)
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM jobs WHERE finished_at < ?", (time.time() - self.ttl,))
+            self._db.execute(
+                "INSERT INTO jobs (id, status, payload, created_at) VALUES (?, ?, ?, ?)",
+                (record.id, record.status.value, json.dumps(payload), record.created_at),
+            )
+        return record
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, status, payload, result, error, created_at, finished_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return JobRecord(
+            id=row[0],
+            status=JobStatus(row[1]),
+            payload=json.loads(row[2]),
+            result=json.loads(row[3]) if row[3] is not None else None,
+            error=row[4],
+            created_at=row[5],
+            finished_at=row[6],
+        )
+
+    def update(
+        self,
+        job_id: str,
+        status: JobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        finished_at = time.time() if status in FINISHED else None
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status.value, json.dumps(result) if result is not None else None, error, finished_at, job_id),
+            )
+
+    def unfinished(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JobStatus.PENDING.value, JobStatus.RUNNING.value),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def create_job_store(kind: str = os.getenv("JOB_STORE", "memory")) -> JobStore:
+    """
+    Create the job store selected by ``JOB_STORE`` (``memory`` or ``sqlite``).
+
+    ``JOB_STORE_PATH`` (default ``data/jobs.sqlite3``) sets the SQLite file and ``JOB_TTL_S``
+    (default 86400) how long finished jobs are kept.
+    """
+    ttl = float(os.getenv("JOB_TTL_S", "86400"))
+    if kind == "memory":
+        return InMemoryJobStore(ttl=ttl)
+    if kind == "sqlite":
+        return SqliteJobStore(os.getenv("JOB_STORE_PATH", "data/jobs.sqlite3"), ttl=ttl)
+    raise ValueError(f"Unknown job store: {kind}")
+
+
+class JobRunner:
+    """
+    Pool of asyncio workers executing stored jobs.
+
+    Store calls run in worker threads, off the event loop. A job rejected by admission control
+    stays pending and is queued again once the suggested retry delay has passed.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        workers: int = int(os.getenv("JOB_WORKERS", "4")),
+    ):
+        """
+        Initialize the runner (workers start with :meth:`start`).
+
+        Args:
+            store: Where jobs and results are kept
+            handler: Coroutine computing the result of a job from its payload
+            workers: Number of jobs run at the same time
+        """
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self._queue: Optional["asyncio.Queue[str]"] = None
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._done: Dict[str, asyncio.Event] = {}
+        self._retries: Dict[str, asyncio.TimerHandle] = {}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Start the workers and resume jobs left unfinished by a previous process."""
+        self._queue = asyncio.Queue()
+        for job_id in self.store.unfinished():
+            self._enqueue(job_id)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs still pending stay in the store."""
+        for task in self._tasks:
+            task.cancel()
+        for retry in self._retries.values():
+            retry.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._retries = {}
+
+    async def submit(self, payload: Dict[str, Any]) -> JobRecord:
+        """Store a job and queue it for the workers."""
+        if self._queue is None:
+            raise RuntimeError("The job runner is not started")
+        record = await asyncio.to_thread(self.store.create, payload)
+        self._enqueue(record.id)
+        return record
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[JobRecord]:
+        """Return a job once it finished or after ``timeout`` seconds, whichever comes first."""
+        done = self._done.get(job_id)
+        if done is not None and timeout > 0:
+            try:
+                await asyncio.wait_for(done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    def _enqueue(self, job_id: str) -> None:
+        self._done[job_id] = asyncio.Event()
+        self._queue.put_nowait(job_id)  # type: ignore
+
+    def _requeue(self, job_id: str) -> None:
+        del self._retries[job_id]
+        self._queue.put_nowait(job_id)  # type: ignore
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()  # type: ignore
+            retry_after = None
+            try:
+                retry_after = await self._run(job_id)
+            finally:
+                if retry_after is not None:
+                    self._retries[job_id] = asyncio.get_running_loop().call_later(retry_after, self._requeue, job_id)
+                else:
+                    done = self._done.pop(job_id, None)
+                    if done is not None:
+                        done.set()
+
+    async def _run(self, job_id: str) -> Optional[float]:
+        """Run a job and return the seconds after which to retry it, or None once it finished."""
+        record = await asyncio.to_thread(self.store.get, job_id)
+        if record is None:
+            return None
+        await asyncio.to_thread(self.store.update, job_id, JobStatus.RUNNING)
+        try:
+            result = await self.handler(record.payload)
+        except asyncio.CancelledError:
+            # Shutting down: leave the job to be resumed on the next start
+            await asyncio.to_thread(self.store.update, job_id, JobStatus.PENDING)
+            raise
+        except AdmissionRejected as e:
+            # The predictor is saturated: jobs can wait, so try again later instead of failing
+            await asyncio.to_thread(self.store.update, job_id, JobStatus.PENDING)
+            return e.retry_after
+        except Exception as e:
+            await asyncio.to_thread(self.store.update, job_id, JobStatus.FAILED, error=str(e))
+        else:
+            await asyncio.to_thread(self.store.update, job_id, JobStatus.SUCCEEDED, result=result)
+        return None
@@ -0,0 +1,104 @@
+"""
+Cached catalog of the models available for each predictor type.
+
+Listing models may need a network round trip to an LLM backend, so the catalog is
+cached with a TTL and refreshed in the background. Lookups for different predictors run
+concurrently with a timeout, and a slow or failing backend leaves its last known models
+in place, marked as stale.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+ModelSource = Callable[[], Awaitable[Sequence[str]]]
+
+
+@dataclass
+class CatalogEntry:
+    models: List[str] = field(default_factory=list)
+    fetched_at: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ModelCatalog:
+    """TTL cache of available models per predictor type with background refresh."""
+
+    def __init__(self, sources: Dict[str, ModelSource], ttl: float = 60.0, timeout: float = 2.0):
+        """
+        Initialize the catalog.
+
+        Args:
+            sources: Coroutine factory listing the models of each predictor type
+            ttl: Number of seconds a successful lookup stays fresh
+            timeout: Maximum number of seconds to wait for a single lookup
+        """
+        self.sources = sources
+        self.ttl = ttl
+        self.timeout = timeout
+        self.entries: Dict[str, CatalogEntry] = {}
+        self._refresh_task: Optional["asyncio.Task[None]"] = None
+        self._runner: Optional["asyncio.Task[None]"] = None
+
+    def is_stale(self, name: str) -> bool:
+        entry = self.entries.get(name)
+        if entry is None or entry.fetched_at is None or entry.error is not None:
+            return True
+        return time.monotonic() - entry.fetched_at > self.ttl
+
+    async def _fetch(self, name: str) -> None:
+        entry = self.entries.setdefault(name, CatalogEntry())
+        try:
+            models = await asyncio.wait_for(self.sources[name](), timeout=self.timeout)
+        except Exception as e:
+            # Keep serving the last known models
+            entry.error = str(e) or type(e).__name__
+            return
+        entry.models = list(models)
+        entry.fetched_at = time.monotonic()
+        entry.error = None
+
+    async def refresh(self, names: Optional[Sequence[str]] = None) -> None:
+        """Look up the given predictor types (all by default) concurrently."""
+        await asyncio.gather(*[self._fetch(name) for name in (names or list(self.sources))])
+
+    async def get(self) -> Dict[str, Tuple[List[str], bool]]:
+        """
+        Return the models of every predictor type and whether they are stale.
+
+        Types never looked up before are fetched now (bounded by ``timeout``). Stale types
+        are returned as they are and refreshed in the background.
+        """
+        missing = [name for name in self.sources if name not in self.entries]
+        if missing:
+            await self.refresh(missing)
+
+        stale = [name for name in self.sources if self.is_stale(name)]
+        if stale and (self._refresh_task is None or self._refresh_task.done()):
+            # At most one refresh in flight, so a slow backend is not hit once per request
+            self._refresh_task = asyncio.create_task(self.refresh(stale))
+
+        return {name: (self.entries[name].models, self.is_stale(name)) for name in self.sources}
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.ttl)
+
+    def start(self) -> None:
+        """Start refreshing the catalog periodically in the background."""
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background refresh."""
+        for task in (self._runner, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._runner = None
+        self._refresh_task = None
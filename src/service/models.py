@@ -5,7 +5,6 @@ This module defines the Pydantic models used for request and response validation
 in the candidate-position matching service.
 """
 
-import os
 from enum import Enum
 from typing import Dict, List, Optional
 
@@ -18,17 +17,33 @@ class PredictorType(str, Enum):
     DUMMY = "dummy"
     LM = "lm"
     RIDGE = "ridge"
+    CASCADE = "cascade"
     TEST = "test"  # Test predictor type that isn't implemented
     # Add more predictor types here as they are implemented
 
 
+class JobStatus(str, Enum):
+    """Lifecycle states of an asynchronous job."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
 class PredictorParameters(BaseModel):
+    """Overrides of the predictor configuration; fields left unset keep the server's configuration."""
+
     api_base_url: Optional[str] = Field(
-        default=os.getenv("LM_API_BASE_URL", "http://localhost:5001/v1"),
-        description="Base URL for the language model API",
+        default=None,
+        description="Base URL for the language model API (replaces the configured backends)",
     )
     api_key: Optional[str] = Field(default=None, description="API key for the language model service")
     model: Optional[str] = Field(default=None, description="Model identifier to use for prediction")
+    fast: Optional[bool] = Field(
+        default=None,
+        description="Return the language model's score only, without an explanation, for faster bulk screening",
+    )
 
 
 class MatchRequest(BaseModel):
@@ -69,6 +84,138 @@ class MatchResponse(BaseModel):
     )
 
 
+class MatchBatchItem(BaseModel):
+    vacancy_description: str = Field(
+        ...,
+        description="The job description or requirements for the position",
+        min_length=10,
+    )
+    candidate_description: str = Field(
+        ...,
+        description="The candidate's profile, experience, or resume text",
+        min_length=10,
+    )
+    hr_comment: str = Field(
+        default="",
+        description="Any types of comments",
+        min_length=0,
+    )
+
+
+class MatchBatchRequest(BaseModel):
+    items: List[MatchBatchItem] = Field(
+        ...,
+        description="Candidate-vacancy pairs to score",
+        min_length=1,
+        max_length=1000,
+    )
+    predictor_type: PredictorType = Field(
+        default=PredictorType.DUMMY,
+        description="The type of predictor to use for matching",
+    )
+    predictor_parameters: Optional[PredictorParameters] = Field(
+        default=None, description="Optional parameters for the predictor configuration"
+    )
+
+
+class MatchBatchResult(BaseModel):
+    score: Optional[float] = Field(
+        default=None,
+        description="Matching score, missing if the item failed",
+        ge=0.0,
+        le=100.0,
+    )
+    description: Optional[str] = Field(
+        default=None,
+        description="Optional explanation of the matching result",
+    )
+    error: Optional[str] = Field(
+        default=None,
+        description="Error message if scoring this item failed",
+    )
+
+
+class MatchBatchResponse(BaseModel):
+    results: List[MatchBatchResult] = Field(description="One result per request item, in the same order")
+
+
+class RankCandidate(BaseModel):
+    candidate_description: str = Field(
+        ...,
+        description="The candidate's profile, experience, or resume text",
+        min_length=10,
+    )
+    hr_comment: str = Field(
+        default="",
+        description="Any types of comments",
+        min_length=0,
+    )
+    id: Optional[str] = Field(default=None, description="Optional client-side identifier of the candidate")
+
+
+class RankRequest(BaseModel):
+    vacancy_description: str = Field(
+        ...,
+        description="The job description or requirements for the position",
+        min_length=10,
+    )
+    candidates: List[RankCandidate] = Field(
+        ...,
+        description="Candidates to rank for the vacancy",
+        min_length=1,
+        max_length=10000,
+    )
+    top_k: int = Field(default=10, description="Number of best candidates to return", ge=1)
+    predictor_type: PredictorType = Field(
+        default=PredictorType.DUMMY,
+        description="The type of predictor to use for matching",
+    )
+    predictor_parameters: Optional[PredictorParameters] = Field(
+        default=None, description="Optional parameters for the predictor configuration"
+    )
+    rerank_top_k: Optional[int] = Field(
+        default=None,
+        description="Cascade predictor only: number of best prefiltered candidates sent to the LLM",
+        ge=0,
+    )
+    rerank_threshold: Optional[float] = Field(
+        default=None,
+        description="Cascade predictor only: minimum prefilter score for a candidate to be sent to the LLM",
+    )
+
+
+class RankedCandidateResult(BaseModel):
+    index: int = Field(description="Position of the candidate in the request")
+    id: Optional[str] = Field(default=None, description="Client-side identifier of the candidate")
+    score: float = Field(description="Matching score", ge=0.0, le=100.0)
+    description: Optional[str] = Field(default=None, description="Optional explanation of the matching result")
+
+
+class RankError(BaseModel):
+    index: int = Field(description="Position of the candidate in the request")
+    id: Optional[str] = Field(default=None, description="Client-side identifier of the candidate")
+    error: str = Field(description="Error message for this candidate")
+
+
+class RankResponse(BaseModel):
+    results: List[RankedCandidateResult] = Field(description="Top-k candidates sorted by descending score")
+    errors: List[RankError] = Field(default_factory=list, description="Candidates that could not be scored")
+    total: int = Field(description="Number of candidates in the request")
+    stats: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Predictor-specific counters, e.g. the LLM calls saved by the cascade predictor",
+    )
+
+
+class JobResponse(BaseModel):
+    job_id: str = Field(description="Identifier to poll the job with")
+    status: JobStatus = Field(description="Current state of the job")
+    result: Optional[MatchResponse] = Field(default=None, description="Match result once the job succeeded")
+    error: Optional[str] = Field(default=None, description="Error message if the job failed")
+    created_at: float = Field(description="Submission time (Unix timestamp)")
+    finished_at: Optional[float] = Field(default=None, description="Completion time (Unix timestamp)")
+
+
 class AvailableModelsResponse(BaseModel):
     predictor_types: List[PredictorType] = Field(
         description="List of available predictor types that can be used for matching"
@@ -79,3 +226,12 @@ class AvailableModelsPerPredictorResponse(BaseModel):
     models: Dict[PredictorType, List[str]] = Field(
         description="Dictionary mapping predictor types to their available models"
     )
+    stale: Dict[PredictorType, bool] = Field(
+        default_factory=dict,
+        description="Whether the models of a predictor type come from an outdated or failed lookup",
+    )
+
+
+class ReadinessResponse(BaseModel):
+    ready: bool = Field(description="Whether all preloaded predictors are loaded and warmed up")
+    predictors: Dict[str, str] = Field(description="Warm-up status of each preloaded predictor")
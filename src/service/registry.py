@@ -0,0 +1,128 @@
+"""
+Process-wide predictor registry.
+
+Predictors are expensive to build (the ridge predictor loads a joblib artifact and
+the BERT encoder), so the service keeps one long-lived instance per configuration
+instead of constructing a new one for every request.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Iterable, Optional
+
+from src.platform.base_predictor import BasePredictor
+from src.service.models import PredictorParameters
+
+WARMUP_CANDIDATE = "Python developer with 5 years of experience in machine learning"
+WARMUP_VACANCY = "Looking for a senior ML engineer with strong Python skills"
+
+PredictorFactory = Callable[[str, Optional[PredictorParameters]], Optional[BasePredictor]]
+
+
+class PredictorRegistry:
+    """Thread-safe cache of predictor instances keyed by type and parameters."""
+
+    def __init__(
+        self,
+        factory: PredictorFactory,
+        preload: Iterable[str] = (),
+        max_instances: int = 32,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            factory: Callable building a predictor for a type and optional parameters
+            preload: Predictor types to load and warm up on startup
+            max_instances: Maximum number of cached instances (least recently used are evicted)
+        """
+        self._factory = factory
+        self.preload = tuple(preload)
+        self.max_instances = max_instances
+        self._instances: "OrderedDict[Hashable, BasePredictor]" = OrderedDict()
+        self._building: "Dict[Hashable, Future[Optional[BasePredictor]]]" = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self.status: Dict[str, str] = {predictor_type: "pending" for predictor_type in self.preload}
+
+    @staticmethod
+    def _key(predictor_type: str, parameters: Optional[PredictorParameters]) -> Hashable:
+        return predictor_type, parameters.model_dump_json() if parameters else None
+
+    def get(
+        self, predictor_type: str, parameters: Optional[PredictorParameters] = None, build: bool = True
+    ) -> Optional[BasePredictor]:
+        """
+        Return a cached predictor, building it on first use.
+
+        Building happens outside the registry lock, so lookups of other predictors do not
+        wait for it; concurrent callers asking for the same predictor share one build. With
+        ``build=False`` only an already built predictor is returned (None otherwise).
+        """
+        key = self._key(predictor_type, parameters)
+        while True:
+            with self._lock:
+                predictor = self._instances.get(key)
+                if predictor is not None:
+                    self._instances.move_to_end(key)
+                    return predictor
+                if not build:
+                    return None
+                building = self._building.get(key)
+                owner = building is None
+                if owner:
+                    building = self._building[key] = Future()
+            if owner:
+                break
+            if building.result() is None:
+                return None
+            # Built by another caller: take it under the lock (or build again if it was evicted meanwhile)
+
+        try:
+            predictor = self._factory(predictor_type, parameters)
+        except BaseException as e:
+            with self._lock:
+                del self._building[key]
+            building.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._building[key]
+            if predictor is not None:
+                self._instances[key] = predictor
+                while len(self._instances) > self.max_instances:
+                    # Not closed: requests may still use it, and it is collected once they are done
+                    self._instances.popitem(last=False)
+        building.set_result(predictor)
+        return predictor
+
+    def warm_up(self) -> None:
+        """Load every preloaded predictor and run one inference through it."""
+        for predictor_type in self.preload:
+            self.status[predictor_type] = "loading"
+            try:
+                predictor = self.get(predictor_type)
+                if predictor is None:
+                    raise ValueError(f"Unsupported predictor type: {predictor_type}")
+                predictor.predict(WARMUP_CANDIDATE, WARMUP_VACANCY, "")
+                self.status[predictor_type] = "ready"
+            except Exception as e:
+                self.status[predictor_type] = f"failed: {str(e)}"
+
+        if all(status == "ready" for status in self.status.values()):
+            self._ready.set()
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether every preloaded predictor finished its warm-up successfully."""
+        return self._ready.is_set()
+
+    def close(self) -> None:
+        """Release all cached predictors."""
+        with self._lock:
+            predictors = list(self._instances.values())
+            self._instances.clear()
+            self._ready.clear()
+        for predictor in predictors:
+            predictor.close()
@@ -0,0 +1,105 @@
+"""
+Cache of match results with request coalescing.
+
+Recruiters often re-submit the exact same CV/vacancy pair, and every LM repeat costs a
+full generation. Results are cached with LRU + TTL eviction, and identical requests that
+arrive while the first one is still running wait for it instead of calling the backend again.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from src.platform.cache import LRUCache
+
+T = TypeVar("T")
+
+
+class MatchResultCache:
+    """LRU + TTL result cache with single-flight execution of identical requests."""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results
+            ttl: Number of seconds a result stays valid
+        """
+        self.results: LRUCache[Any] = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.coalesced = 0
+
+    @staticmethod
+    def key(
+        predictor_type: str,
+        model: Optional[str],
+        temperature: Optional[float],
+        texts: Tuple[str, ...],
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Hash everything that determines a match result into a cache key."""
+        payload = json.dumps([predictor_type, model, temperature, texts, extra or {}], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        bypass: bool = False,
+        cacheable: Callable[[T], bool] = lambda _: True,
+    ) -> Tuple[T, str]:
+        """
+        Return the cached result for ``key`` or compute it once.
+
+        Args:
+            key: Cache key from :meth:`key`
+            compute: Coroutine factory producing the result on a miss
+            bypass: Skip the lookup and recompute (the fresh result is still stored)
+            cacheable: Predicate deciding whether a computed result may be stored
+
+        Returns:
+            Tuple[T, str]: The result and how it was obtained:
+                ``"hit"``, ``"miss"``, ``"coalesced"`` or ``"bypass"``
+        """
+        if not bypass:
+            cached = self.results.get(key)
+            if cached is not None:
+                return cached, "hit"
+
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                self.coalesced += 1
+                try:
+                    # Shield so that a follower giving up does not cancel the leader's call
+                    return await asyncio.shield(inflight), "coalesced"
+                except asyncio.CancelledError:
+                    if not inflight.cancelled():
+                        raise
+                    # The leader was cancelled (e.g. its client went away): compute it here instead
+
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        if not bypass:
+            self._inflight[key] = future
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        else:
+            future.set_result(result)
+            if cacheable(result):
+                self.results.put(key, result)
+            return result, "bypass" if bypass else "miss"
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters, the number of coalesced requests and requests in flight."""
+        return {**self.results.stats(), "coalesced": self.coalesced, "inflight": len(self._inflight)}
@@ -5,13 +5,25 @@ This module provides functionality to test the prediction endpoint
 of the matching service by sending sample requests and validating responses.
 """
 
+import asyncio
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Dict
 
 import requests
 from fastapi.testclient import TestClient
 
-from src.service.app import app  # type: ignore
+from src.platform.cascade_predictor import CascadePredictor, LexicalPredictor
+from src.platform.dummy_predictor import DummyPredictor
+from src.service import app as service_app
+from src.service.admission import AdmissionControl
+from src.service.app import app, create_predictor  # type: ignore
+from src.service.model_catalog import ModelCatalog
+from src.service.models import PredictorParameters
+from src.service.registry import PredictorRegistry
 
 client = TestClient(app)
 
@@ -108,6 +120,343 @@ def test_invalid_predictor():
     assert "Unsupported predictor type" in response.json()["detail"]
 
 
+def test_calculate_match_is_cached():
+    payload = {
+        "vacancy_description": "Cached vacancy: Python developer",
+        "candidate_description": "Cached candidate: 5 years of Python",
+        "hr_comment": "",
+        "predictor_type": "dummy",
+    }
+    first = client.post("/match", json=payload)
+    second = client.post("/match", json=payload)
+    bypassed = client.post("/match", json=payload, headers={"Cache-Control": "no-cache"})
+
+    assert first.headers["X-Cache"] == "miss"
+    assert second.headers["X-Cache"] == "hit"
+    assert second.json() == first.json()
+    assert bypassed.headers["X-Cache"] == "bypass"
+
+
+def test_calculate_match_batch():
+    item = {
+        "vacancy_description": "Python developer with 3+ years of experience",
+        "candidate_description": "5 years of Python development experience",
+        "hr_comment": "",
+    }
+    response = client.post("/match/batch", json={"items": [item] * 3, "predictor_type": "dummy"})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 3
+    for result in results:
+        assert 0 <= result["score"] <= 5
+        assert result["error"] is None
+
+    response = client.post("/match/batch", json={"items": [], "predictor_type": "dummy"})
+    assert response.status_code == 422
+
+
+def test_calculate_match_batch_reports_unscored_items_as_errors(monkeypatch):
+    class UnscoredPredictor(DummyPredictor):
+        async def predict_batch_async(self, pairs):
+            return [(None, "garbage")] + [(4.0, "Fine")] * (len(pairs) - 1)
+
+    registry = PredictorRegistry(factory=lambda *_: UnscoredPredictor(), preload=[])
+    monkeypatch.setattr(service_app, "registry", registry)
+    item = {
+        "vacancy_description": "Python developer with 3+ years of experience",
+        "candidate_description": "5 years of Python development experience",
+        "hr_comment": "",
+    }
+
+    response = client.post("/match/batch", json={"items": [item] * 2, "predictor_type": "dummy"})
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"score": None, "description": None, "error": "No score in prediction: garbage"},
+        {"score": 4.0, "description": "Fine", "error": None},
+    ]
+
+
+def test_rank_candidates():
+    candidates = [{"candidate_description": f"Python developer number {i}", "id": f"c{i}"} for i in range(7)]
+    response = client.post(
+        "/rank",
+        json={
+            "vacancy_description": "Python developer with 3+ years of experience",
+            "candidates": candidates,
+            "top_k": 3,
+            "predictor_type": "dummy",
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 7
+    assert len(data["results"]) == 3
+    scores = [result["score"] for result in data["results"]]
+    assert scores == sorted(scores, reverse=True)
+    assert all(result["id"] == f"c{result['index']}" for result in data["results"])
+
+
+def test_registry_reuses_predictors():
+    registry = PredictorRegistry(factory=create_predictor, preload=["dummy"])
+    assert not registry.is_ready
+
+    registry.warm_up()
+    assert registry.is_ready
+    assert registry.status == {"dummy": "ready"}
+    assert registry.get("dummy") is registry.get("dummy")
+    assert registry.get("test") is None
+
+
+def test_registry_builds_outside_its_lock():
+    started, finish = threading.Event(), threading.Event()
+    builds = []
+
+    def factory(predictor_type, _):
+        builds.append(predictor_type)
+        if predictor_type == "slow":
+            started.set()
+            finish.wait(5)
+        return DummyPredictor()
+
+    registry = PredictorRegistry(factory=factory, preload=[])
+    with ThreadPoolExecutor(4) as pool:
+        slow = [pool.submit(registry.get, "slow") for _ in range(3)]
+        assert started.wait(5)
+        # Other predictors are served while the slow one is being built
+        assert registry.get("dummy") is not None
+        finish.set()
+        assert len({id(future.result()) for future in slow}) == 1
+    assert builds.count("slow") == 1
+
+
+def test_registry_closes_cached_predictors_outside_its_lock():
+    closed = []
+
+    class ClosingPredictor(DummyPredictor):
+        def close(self):
+            closed.append((self, registry._lock.locked()))
+
+    registry = PredictorRegistry(factory=lambda *_: ClosingPredictor(), preload=[], max_instances=1)
+    evicted = registry.get("first")
+    cached = registry.get("second")
+    assert closed == []  # An evicted predictor may still serve requests
+
+    registry.close()
+    assert closed == [(cached, False)] and evicted not in [predictor for predictor, _ in closed]
+
+
+def test_readyz(monkeypatch):
+    registry = PredictorRegistry(factory=create_predictor, preload=["dummy"])
+    monkeypatch.setattr(service_app, "registry", registry)
+
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+    registry.warm_up()
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json() == {"ready": True, "predictors": {"dummy": "ready"}}
+
+
+def test_metrics():
+    client.post(
+        "/match",
+        json={
+            "vacancy_description": "Metrics vacancy",
+            "candidate_description": "Metrics candidate",
+            "hr_comment": "",
+            "predictor_type": "dummy",
+        },
+    )
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'matcher_request_duration_seconds_count{predictor="dummy"}' in response.text
+    assert 'matcher_stage_duration_seconds_count{predictor="dummy",stage="validation"}' in response.text
+    assert 'matcher_inflight_requests{predictor="dummy"} 0' in response.text
+    assert 'matcher_cache_hit_ratio{cache="match_result"}' in response.text
+
+
+def test_overloaded_predictor_is_rejected(monkeypatch):
+    monkeypatch.setattr(service_app, "admission", AdmissionControl(max_concurrency=0, max_queue=0))
+    response = client.post(
+        "/match",
+        json={
+            "vacancy_description": "Overloaded vacancy",
+            "candidate_description": "Overloaded candidate",
+            "hr_comment": "",
+            "predictor_type": "dummy",
+        },
+    )
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_jobs(monkeypatch):
+    monkeypatch.setattr(service_app, "registry", PredictorRegistry(factory=create_predictor, preload=[]))
+    payload = {
+        "vacancy_description": "Job vacancy: Python developer",
+        "candidate_description": "Job candidate: 5 years of Python",
+        "hr_comment": "",
+        "predictor_type": "dummy",
+    }
+    with TestClient(app) as lifespan_client:
+        submitted = lifespan_client.post("/jobs", json=payload)
+        assert submitted.status_code == 202
+        job_id = submitted.json()["job_id"]
+
+        job = lifespan_client.get(f"/jobs/{job_id}", params={"wait": 5}).json()
+        assert job["status"] == "succeeded"
+        assert 0 <= job["result"]["score"] <= 5
+        assert job["finished_at"] >= job["created_at"]
+
+        assert lifespan_client.get("/jobs/unknown").status_code == 404
+
+
+def test_match_deadline(monkeypatch):
+    class SlowPredictor(DummyPredictor):
+        async def predict_async(self, candidate_description, vacancy_description, hr_comment):
+            await asyncio.sleep(1)
+            return 5.0, "Too late"
+
+    monkeypatch.setattr(service_app, "registry", PredictorRegistry(factory=lambda *_: SlowPredictor(), preload=[]))
+    payload = {
+        "vacancy_description": "Deadline vacancy: Python developer",
+        "candidate_description": "Deadline candidate: 5 years of Python",
+        "hr_comment": "",
+        "predictor_type": "dummy",
+    }
+    response = client.post("/match", json=payload, headers={"X-Deadline-Ms": "100"})
+
+    assert response.status_code == 504
+
+
+def test_admission_wait_counts_against_the_deadline(monkeypatch):
+    # No free slot: requests wait in the queue until their deadline
+    monkeypatch.setattr(service_app, "admission", AdmissionControl(max_concurrency=0, max_queue=10))
+    headers = {"X-Deadline-Ms": "100"}
+    pair = {"vacancy_description": "Queued vacancy", "candidate_description": "Queued candidate"}
+
+    response = client.post("/match/batch", json={"items": [pair], "predictor_type": "dummy"}, headers=headers)
+    assert response.status_code == 504
+
+    rank = {"vacancy_description": "Queued vacancy", "candidates": [{"candidate_description": "Queued candidate"}]}
+    response = client.post("/rank", json={**rank, "predictor_type": "dummy"}, headers=headers)
+    assert response.status_code == 504
+
+
+def test_match_stream(monkeypatch):
+    class StreamingPredictor(DummyPredictor):
+        async def predict_stream(self, candidate_description, vacancy_description, hr_comment):
+            for text in ("Knows ", "Python."):
+                yield "thought", text
+            yield "score", 4.0
+            yield "result", (4.0, "Knows Python.")
+
+    monkeypatch.setattr(service_app, "registry", PredictorRegistry(factory=lambda *_: StreamingPredictor(), preload=[]))
+    payload = {
+        "vacancy_description": "Streaming vacancy: Python developer",
+        "candidate_description": "Streaming candidate: 5 years of Python",
+        "hr_comment": "",
+        "predictor_type": "dummy",
+    }
+
+    def events(response):
+        blocks = [block.split("\n") for block in response.text.strip().split("\n\n")]
+        return [(event[len("event: ") :], json.loads(data[len("data: ") :])) for event, data in blocks]
+
+    response = client.post("/match/stream", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["X-Cache"] == "miss"
+    assert events(response) == [
+        ("thought", {"text": "Knows "}),
+        ("thought", {"text": "Python."}),
+        ("score", {"score": 4.0}),
+        ("done", {"score": 4.0, "description": "Knows Python."}),
+    ]
+
+    cached = client.post("/match/stream", json=payload)
+    assert cached.headers["X-Cache"] == "hit"
+    assert events(cached) == [("score", {"score": 4.0}), ("done", {"score": 4.0, "description": "Knows Python."})]
+
+
+def test_rank_with_cascade(monkeypatch):
+    monkeypatch.setattr(
+        service_app,
+        "registry",
+        PredictorRegistry(factory=lambda *_: CascadePredictor(LexicalPredictor(), DummyPredictor()), preload=[]),
+    )
+    candidates = [{"candidate_description": f"Python developer number {i}"} for i in range(5)]
+    candidates.append({"candidate_description": "Graphic designer"})
+    response = client.post(
+        "/rank",
+        json={
+            "vacancy_description": "Python developer with 3+ years of experience",
+            "candidates": candidates,
+            "top_k": 10,
+            "predictor_type": "cascade",
+            "rerank_top_k": 3,
+        },
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["stats"] == {"prefiltered": 6, "reranked": 3, "llm_calls_saved": 3}
+    assert len(data["results"]) == 3
+    assert all(result["index"] < 5 for result in data["results"])
+
+
+def test_cascade_reuses_the_registry_predictors(monkeypatch):
+    monkeypatch.delenv("CASCADE_PREFILTER", raising=False)
+
+    def factory(predictor_type, parameters):
+        return DummyPredictor() if predictor_type in ("ridge", "lm") else create_predictor(predictor_type, parameters)
+
+    registry = PredictorRegistry(factory=factory, preload=[])
+    monkeypatch.setattr(service_app, "registry", registry)
+    cascade = registry.get("cascade")
+    assert cascade.prefilter is registry.get("ridge")
+    assert cascade.reranker is registry.get("lm")
+
+
+def test_model_catalog_builds_predictors_off_the_event_loop(monkeypatch):
+    def factory(*_):
+        time.sleep(0.5)
+        return DummyPredictor()
+
+    monkeypatch.setattr(service_app, "registry", PredictorRegistry(factory=factory, preload=[]))
+    catalog = ModelCatalog({"dummy": partial(service_app.list_models, "dummy")}, ttl=60, timeout=0.1)
+
+    async def run():
+        start = time.perf_counter()
+        await catalog.refresh()
+        return time.perf_counter() - start
+
+    # The catalog timeout covers the build, which does not hold up the loop
+    assert asyncio.run(run()) < 0.3
+    assert catalog.entries["dummy"].error == "TimeoutError"
+
+
+def test_lm_parameters_keep_the_environment_configuration(monkeypatch):
+    monkeypatch.setenv("LM_MODEL", "env-model")
+    monkeypatch.setenv("LM_API_BASE_URLS", "http://llm-a:5001/v1,http://llm-b:5001/v1")
+    monkeypatch.setenv("LM_FAST_MODE", "1")
+
+    predictor = create_predictor("lm", PredictorParameters(fast=False))
+    assert predictor.model == "env-model"
+    assert not predictor.fast
+    assert len(predictor.backends.backends) == 2
+
+    predictor = create_predictor("lm", PredictorParameters(api_base_url="http://other:5001/v1"))
+    assert predictor.fast
+    assert [backend.url for backend in predictor.backends.backends] == ["http://other:5001/v1"]
+
+
 if __name__ == "__main__":
     print("Testing Candidate Scoring API...")
     test_prediction_endpoint()
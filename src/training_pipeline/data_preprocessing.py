@@ -1,36 +1,123 @@
+import json
+import os
+from typing import Optional
+
 import numpy as np
 import pandas as pd
 import torch
 from tqdm import tqdm
 from transformers import AutoModel, AutoTokenizer
 
+from src.platform.metrics import stage
+from src.training_pipeline.embedding_cache import EmbeddingCache, get_embedding_cache
+from src.training_pipeline.onnx_encoder import BACKENDS, ONNX_INT8, TORCH, OnnxEncoder, embedding_cache_name
+
+# Encoder of the training features; the trained artifact records it for serving
+DEFAULT_ENCODER = os.getenv("EMBEDDING_MODEL", "bert-base-uncased")
+ENCODER_PATH = "data/processed/encoder.json"
+
 
 class TextPreprocessor:
-    def __init__(self, model_name="bert-base-uncased"):
+    def __init__(self, model_name="bert-base-uncased", cache: Optional[EmbeddingCache] = None, backend=TORCH):
+        """
+        Load the tokenizer and the encoder.
+
+        Args:
+            model_name: Hugging Face identifier or local path of the encoder
+            cache: Embedding cache to read and fill (no caching if None)
+            backend: ``"torch"`` (eager PyTorch), ``"onnx"`` or ``"onnx-int8"`` (ONNX Runtime on
+                CPU, see :mod:`src.training_pipeline.onnx_encoder`)
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown encoder backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+        self.backend = backend
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModel.from_pretrained(model_name)
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model.to(self.device)
+        if backend == TORCH:
+            self.model = AutoModel.from_pretrained(model_name)
+            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            self.model.to(self.device)
+            self.onnx = None
+            self.hidden_size = self.model.config.hidden_size
+        else:
+            self.model = None
+            self.device = torch.device("cpu")
+            self.onnx = OnnxEncoder(model_name, quantize=backend == ONNX_INT8)
+            self.hidden_size = self.onnx.hidden_size
+        self.cache = cache
+
+    def cls_embeddings(self, texts, max_length=512) -> np.ndarray:
+        """Return the CLS embeddings of one padded batch of texts."""
+        with stage("tokenization"):
+            inputs = self.tokenizer(
+                texts,
+                return_tensors="np" if self.onnx is not None else "pt",
+                max_length=max_length,
+                truncation=True,
+                padding=True,
+            )
+
+        if self.onnx is not None:
+            with stage("bert_forward"):
+                return self.onnx(inputs)
+
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        with torch.no_grad(), stage("bert_forward"):
+            outputs = self.model(**inputs)
+            return outputs.last_hidden_state[:, 0, :].cpu().numpy()
 
     def get_bert_embedding(self, text):
         # Handle NaN values
         if pd.isna(text):
             text = ""
 
+        if self.cache is not None:
+            cached = self.cache.get(text)
+            if cached is not None:
+                return cached
+
         # Truncate text to avoid memory issues
-        max_length = 512
-        inputs = self.tokenizer(text, return_tensors="pt", max_length=max_length, truncation=True, padding=True)
+        embeddings = self.cls_embeddings(text, max_length=512)
 
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        if self.cache is not None:
+            self.cache.put(text, embeddings[0])
+        return embeddings[0]
 
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            embeddings = outputs.last_hidden_state[:, 0, :].cpu().numpy()
+    def get_bert_embeddings(self, texts, batch_size=32):
+        """Embed many texts with padded batches of up to ``batch_size`` texts."""
+        texts = ["" if pd.isna(text) else text for text in texts]
+        embeddings = np.empty((len(texts), self.hidden_size), dtype=np.float32)
 
-        return embeddings[0]
+        missing = []
+        for i, text in enumerate(texts):
+            cached = self.cache.get(text) if self.cache is not None else None
+            if cached is None:
+                missing.append(i)
+            else:
+                embeddings[i] = cached
+        if not missing:
+            return embeddings
 
+        # Batch texts of similar length together to keep padding small
+        order = np.array(missing)[np.argsort([len(texts[i]) for i in missing], kind="stable")]
 
-def preprocess_text(candidate_description: str, vacancy_description: str, hr_comment: str) -> np.ndarray:
+        max_length = 512
+        for start in range(0, len(order), batch_size):
+            batch_idx = order[start : start + batch_size]
+            embeddings[batch_idx] = self.cls_embeddings([texts[i] for i in batch_idx], max_length=max_length)
+
+            if self.cache is not None:
+                for i in batch_idx:
+                    self.cache.put(texts[i], embeddings[i].copy())
+
+        return embeddings
+
+
+def preprocess_text(
+    candidate_description: str,
+    vacancy_description: str,
+    hr_comment: str,
+    preprocessor: Optional[TextPreprocessor] = None,
+) -> np.ndarray:
     """
     Preprocess input texts using BERT embeddings.
 
@@ -38,11 +125,14 @@ def preprocess_text(candidate_description: str, vacancy_description: str, hr_com
         candidate_description (str): Description of the candidate's experience and skills
         vacancy_description (str): Description of the job vacancy requirements
         hr_comment (str): HR comments about candidate's experience (not used in current model)
+        preprocessor (TextPreprocessor, optional): Already loaded preprocessor to reuse.
+            A new one is loaded for this call if not given.
 
     Returns:
         np.ndarray: Feature vector combining embeddings of vacancy and candidate descriptions
     """
-    preprocessor = TextPreprocessor()
+    if preprocessor is None:
+        preprocessor = TextPreprocessor()
 
     # Get embeddings for each text
     vacancy_emb = preprocessor.get_bert_embedding(vacancy_description)
@@ -54,12 +144,32 @@ def preprocess_text(candidate_description: str, vacancy_description: str, hr_com
     return features
 
 
-def prepare_dataset(data_path):
-    """Prepare dataset for training."""
+def convert_rating(rating):
+    """Convert a ``"4/5"``-style project rating to a fraction (NaN if missing)."""
+    if pd.isna(rating):
+        return np.nan
+    try:
+        num, den = rating.split("/")
+        return float(num) / float(den)
+    except:
+        return float(rating) if not pd.isna(rating) else np.nan
+
+
+def prepare_dataset(data_path, model_name=DEFAULT_ENCODER, backend=TORCH):
+    """
+    Prepare dataset for training.
+
+    Args:
+        data_path: CSV file with job descriptions, resume texts and project ratings
+        model_name: Encoder computing the features (recorded in the trained artifact)
+        backend: Runtime of the encoder (see :class:`TextPreprocessor`)
+    """
     df = pd.read_csv(data_path)
 
-    # Initialize preprocessor
-    preprocessor = TextPreprocessor()
+    # Initialize preprocessor (repeated job descriptions are embedded only once)
+    preprocessor = TextPreprocessor(
+        model_name, cache=get_embedding_cache(embedding_cache_name(model_name, backend)), backend=backend
+    )
 
     # Get embeddings for job descriptions
     print("Processing job descriptions...")
@@ -75,6 +185,8 @@ def prepare_dataset(data_path):
         emb = preprocessor.get_bert_embedding(text)
         resume_embeddings.append(emb)
 
+    print(f"Embedding cache: {preprocessor.cache.stats()}")
+
     # Convert to numpy arrays
     X_job = np.array(job_embeddings)
     X_resume = np.array(resume_embeddings)
@@ -83,15 +195,6 @@ def prepare_dataset(data_path):
     X = np.concatenate([X_job, X_resume], axis=1)
 
     # Create target variable from project_rating
-    def convert_rating(rating):
-        if pd.isna(rating):
-            return np.nan
-        try:
-            num, den = rating.split("/")
-            return float(num) / float(den)
-        except:
-            return float(rating) if not pd.isna(rating) else np.nan
-
     y = df["project_rating"].apply(convert_rating)
 
     # Remove rows with NaN targets
@@ -103,6 +206,9 @@ def prepare_dataset(data_path):
 
 
 if __name__ == "__main__":
-    X, y = prepare_dataset("data/synthetic_dataset.csv")
+    X, y = prepare_dataset("data/synthetic_dataset.csv", backend=os.getenv("EMBEDDING_BACKEND", TORCH))
     np.save("data/processed/X.npy", X)
     np.save("data/processed/y.npy", y)
+    # Read by train.py to record the encoder in the model artifact
+    with open(ENCODER_PATH, "w") as f:
+        json.dump({"encoder": DEFAULT_ENCODER, "embedding_dim": X.shape[1] // 2}, f)
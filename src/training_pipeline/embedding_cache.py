@@ -0,0 +1,230 @@
+"""
+Content-addressed cache of text embeddings.
+
+Embeddings are keyed by (encoder name, hash of the whitespace-normalized text) and kept
+in two tiers:
+
+- an in-memory LRU tier bounded by the total size of the cached vectors;
+- an optional persistent tier on disk: an append-only file of float32 rows read through
+  ``np.memmap`` plus an append-only index of text hashes and their rows, safe to share
+  between processes.
+
+Serving (``EmbeddingEngine``) and training (``prepare_dataset``) share the same disk tier,
+so a vacancy embedded once is never embedded again.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.platform.cache import LRUCache
+
+
+def normalize_text(text) -> str:
+    """Collapse whitespace so formatting-only differences share one cache entry."""
+    if pd.isna(text):
+        return ""
+    return " ".join(str(text).split())
+
+
+class DiskEmbeddingStore:
+    """
+    Append-only memory-mapped store of embeddings for one encoder.
+
+    Several processes (uvicorn workers, training next to serving) may share a directory.
+    Appends are serialized by an ``fcntl`` lock on the directory's lock file. Each vector goes
+    at the row given by the size of the vectors file, and its index line records that row.
+    Keys missing from memory are looked up again in the lines other processes appended.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._index_path = os.path.join(directory, "index.txt")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._lock_path = os.path.join(directory, "lock")
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._index_offset = 0
+        self._index_lines = 0
+        self._mmap: Optional[np.memmap] = None
+        self.dim: Optional[int] = None
+
+        with self._lock:
+            self._load_meta()
+            self._read_index()
+
+    def _load_meta(self) -> None:
+        if self.dim is None and os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                self.dim = json.load(f)["dim"]
+
+    def _stored_rows(self) -> int:
+        return os.path.getsize(self._vectors_path) // (4 * self.dim) if os.path.exists(self._vectors_path) else 0
+
+    def _read_index(self) -> None:
+        """Read the index lines appended since the last read (the caller holds ``_lock``)."""
+        self._load_meta()
+        if self.dim is None or not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read()
+        # A line still being written by another process is read next time
+        complete = data[: data.rfind(b"\n") + 1]
+        self._index_offset += len(complete)
+        stored_rows = self._stored_rows()
+        for line in complete.decode("utf-8").splitlines():
+            fields = line.split()
+            # Lines of older stores hold the key only: their row is their line number
+            row = int(fields[1]) if len(fields) > 1 else self._index_lines
+            self._index_lines += 1
+            # A crash between the two appends can leave index lines without a vector
+            if fields and row < stored_rows:
+                self._rows.setdefault(fields[0], row)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                # Possibly appended by another process
+                self._read_index()
+                row = self._rows.get(key)
+                if row is None:
+                    return None
+            if self._mmap is None or self._mmap.shape[0] <= row:
+                # Remap to cover the rows appended since the last read
+                self._mmap = np.memmap(
+                    self._vectors_path, dtype=np.float32, mode="r", shape=(self._stored_rows(), self.dim)
+                )
+            return np.array(self._mmap[row])
+
+    def put(self, key: str, embedding: np.ndarray) -> None:
+        with self._lock:
+            if key in self._rows:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._lock_path, "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    self._write(key, embedding)
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _write(self, key: str, embedding: np.ndarray) -> None:
+        # Under the file lock: no other process appends until this returns
+        self._read_index()
+        if key in self._rows:
+            return
+        if self.dim is None:
+            self.dim = int(embedding.shape[-1])
+            with open(self._meta_path, "w") as f:
+                json.dump({"dim": self.dim}, f)
+        # Vector first, then index line, so the index never points past the vectors
+        row = self._stored_rows()
+        # At the row's offset, not appended: a vector cut short by a crash is overwritten
+        fd = os.open(self._vectors_path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            os.pwrite(fd, np.asarray(embedding, dtype=np.float32).tobytes(), row * 4 * self.dim)
+        finally:
+            os.close(fd)
+        with open(self._index_path, "a") as f:
+            f.write(f"{key} {row}\n")
+        self._rows[key] = row
+
+
+class EmbeddingCache:
+    """Two-tier (memory LRU + memory-mapped disk) embedding cache for one encoder."""
+
+    def __init__(self, model_name: str, max_bytes: int = 256 * 2**20, cache_dir: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            model_name: Name of the encoder producing the embeddings
+            max_bytes: Maximum total size of the vectors kept in memory
+            cache_dir: Root directory of the persistent tier (memory only if None)
+        """
+        self.model_name = model_name
+        self.memory: LRUCache[np.ndarray] = LRUCache(max_size=max_bytes, sizeof=lambda emb: emb.nbytes)
+        self.disk = (
+            DiskEmbeddingStore(os.path.join(cache_dir, re.sub(r"[^\w.-]", "_", model_name))) if cache_dir else None
+        )
+        self.disk_hits = 0
+
+    def key(self, text) -> str:
+        normalized = normalize_text(text)
+        return hashlib.sha256(f"{self.model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, text) -> Optional[np.ndarray]:
+        """Return the cached embedding of a text or None."""
+        key = self.key(text)
+        embedding = self.memory.get(key)
+        if embedding is None and self.disk is not None:
+            embedding = self.disk.get(key)
+            if embedding is not None:
+                self.disk_hits += 1
+                self.memory.put(key, embedding)
+        return embedding
+
+    def put(self, text, embedding: np.ndarray) -> None:
+        """Store the embedding of a text in both tiers."""
+        key = self.key(text)
+        self.memory.put(key, embedding)
+        if self.disk is not None:
+            self.disk.put(key, embedding)
+
+    def get_many(self, texts) -> List[Optional[np.ndarray]]:
+        return [self.get(text) for text in texts]
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and tier sizes."""
+        memory = self.memory.stats()
+        return {
+            "memory_hits": memory["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": memory["misses"] - self.disk_hits,
+            "memory_entries": memory["entries"],
+            "memory_bytes": memory["size"],
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+        }
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str) -> EmbeddingCache:
+    """
+    Return the process-wide cache of an encoder.
+
+    Configured with ``EMBEDDING_CACHE_MAX_MB`` (memory tier size, default 256) and
+    ``EMBEDDING_CACHE_DIR`` (disk tier root, default ``data/embedding_cache``; empty disables it).
+    """
+    with _caches_lock:
+        if model_name not in _caches:
+            _caches[model_name] = EmbeddingCache(
+                model_name,
+                max_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_MB", "256")) * 2**20,
+                cache_dir=os.getenv("EMBEDDING_CACHE_DIR", "data/embedding_cache") or None,
+            )
+        return _caches[model_name]
+
+
+def embedding_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Return the stats of every process-wide cache, keyed by encoder name."""
+    with _caches_lock:
+        return {model_name: cache.stats() for model_name, cache in _caches.items()}
@@ -0,0 +1,135 @@
+"""
+ONNX Runtime backend of the text encoder.
+
+The encoder is exported once to ONNX, with the CLS embedding as its only output, and run
+with ONNX Runtime, which is faster and lighter than eager PyTorch on CPU. The ``onnx-int8``
+backend also quantizes the weights of the exported graph to int8 (dynamic quantization:
+activations are quantized on the fly, no calibration data is needed). Its embeddings differ
+slightly from the fp32 ones, so they are cached under their own encoder name.
+
+Exported graphs are kept in ``ONNX_EXPORT_DIR`` (default ``models/onnx``) and reused.
+Needs ``onnxruntime``, and ``onnx`` for quantization (``poetry install --with onnx``).
+"""
+
+import os
+import re
+from typing import Dict, Sequence
+
+import numpy as np
+import torch
+from transformers import AutoConfig, AutoModel, AutoTokenizer
+
+TORCH = "torch"
+ONNX = "onnx"
+ONNX_INT8 = "onnx-int8"
+BACKENDS = (TORCH, ONNX, ONNX_INT8)
+
+# Inputs of BERT-like encoders, in the order of the exported graph
+INPUT_NAMES = ("input_ids", "attention_mask", "token_type_ids")
+
+
+def embedding_cache_name(model_name: str, backend: str) -> str:
+    """Return the name embeddings of an encoder are cached under (fp32 backends share one)."""
+    return f"{model_name}@int8" if backend == ONNX_INT8 else model_name
+
+
+def _import_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError("The ONNX encoder backends need onnxruntime: poetry install --with onnx") from e
+    return onnxruntime
+
+
+class _CLSEncoder(torch.nn.Module):
+    """Wraps an encoder so that the exported graph returns the CLS embedding only."""
+
+    def __init__(self, model: torch.nn.Module, input_names: Sequence[str]):
+        super().__init__()
+        self.model = model
+        self.input_names = list(input_names)
+
+    def forward(self, *inputs):
+        outputs = self.model(**dict(zip(self.input_names, inputs)))
+        return outputs.last_hidden_state[:, 0, :]
+
+
+def export_onnx(model_name: str, quantize: bool = False, export_dir: str = "") -> str:
+    """
+    Export an encoder to ONNX (and quantize it) unless it was exported already.
+
+    Args:
+        model_name: Hugging Face identifier or local path of the encoder
+        quantize: Also write the int8 dynamically quantized graph
+        export_dir: Root directory of exported graphs (``ONNX_EXPORT_DIR`` if empty)
+
+    Returns:
+        str: Path of the graph to run
+    """
+    export_dir = export_dir or os.getenv("ONNX_EXPORT_DIR", "models/onnx")
+    directory = os.path.join(export_dir, re.sub(r"[^\w.-]", "_", model_name))
+    path = os.path.join(directory, "model.onnx")
+    quantized_path = os.path.join(directory, "model.int8.onnx")
+
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        # Eager attention: the SDPA path traces the padding of the example into the graph
+        model = AutoModel.from_pretrained(model_name, attn_implementation="eager").eval()
+        example = tokenizer(["An example", "A slightly longer example text"], return_tensors="pt", padding=True)
+        names = [name for name in INPUT_NAMES if name in example]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in names}
+        with torch.no_grad():
+            torch.onnx.export(
+                _CLSEncoder(model, names),
+                tuple(example[name] for name in names),
+                path + ".tmp",
+                input_names=names,
+                output_names=["cls"],
+                dynamic_axes={**dynamic_axes, "cls": {0: "batch"}},
+                opset_version=17,
+                dynamo=False,
+            )
+        # Written under another name first, so an interrupted export is not reused
+        os.replace(path + ".tmp", path)
+        print(f"Exported {model_name} to {path}")
+
+    if not quantize:
+        return path
+    if not os.path.exists(quantized_path):
+        _import_onnxruntime()
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(path, quantized_path + ".tmp", weight_type=QuantType.QInt8)
+        os.replace(quantized_path + ".tmp", quantized_path)
+        print(f"Quantized {model_name} to {quantized_path}")
+    return quantized_path
+
+
+class OnnxEncoder:
+    """Computes CLS embeddings of tokenized texts with ONNX Runtime on CPU."""
+
+    def __init__(self, model_name: str, quantize: bool = False, export_dir: str = ""):
+        """
+        Export the encoder if needed and start an inference session.
+
+        Args:
+            model_name: Hugging Face identifier or local path of the encoder
+            quantize: Run the int8 dynamically quantized graph
+            export_dir: Root directory of exported graphs (``ONNX_EXPORT_DIR`` if empty)
+        """
+        onnxruntime = _import_onnxruntime()
+        self.path = export_onnx(model_name, quantize=quantize, export_dir=export_dir)
+        self.hidden_size = AutoConfig.from_pretrained(model_name).hidden_size
+        self.session = onnxruntime.InferenceSession(self.path, providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    def __call__(self, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+        """Return the CLS embeddings of a tokenized batch (``return_tensors="np"``)."""
+        feed = {name: np.asarray(inputs[name], dtype=np.int64) for name in self.input_names}
+        return self.session.run(None, feed)[0]
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Return the size of the graph's weights in bytes (the size of the graph file)."""
+        size = os.path.getsize(self.path)
+        return {"parameters": size, "buffers": 0, "total": size}
@@ -1,3 +1,4 @@
+import json
 import os
 
 import joblib
@@ -35,10 +36,20 @@ def evaluate_predictions(y_true, y_pred):
     return results
 
 
+def load_encoder(path="data/processed/encoder.json"):
+    """Return the encoder the processed features were computed with (see ``prepare_dataset``)."""
+    if not os.path.exists(path):
+        # Features prepared before the encoder was recorded
+        return "bert-base-uncased"
+    with open(path) as f:
+        return json.load(f)["encoder"]
+
+
 def train_model():
     # Load processed data
     X = np.load("data/processed/X.npy")
     y = np.load("data/processed/y.npy")
+    encoder = load_encoder()
 
     # Split the data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -80,12 +91,13 @@ def train_model():
     print(f"Predictions differing by >0.5 points: {test_results['pct_diff_more_than_0.5']:.2f}% (target: ≤20%)")
     print(f"Meets all requirements: {test_results['meets_all_requirements']}")
 
-    # Save the model
+    # Save the model with the encoder its features come from, which serving must use too
     os.makedirs("models", exist_ok=True)
-    joblib.dump(model, "models/vacancy_matcher.joblib")
+    joblib.dump({"model": model, "encoder": encoder, "embedding_dim": X.shape[1] // 2}, "models/vacancy_matcher.joblib")
 
     # Save evaluation results
     evaluation_results = {
+        "encoder": encoder,
         "train_metrics": train_results,
         "test_metrics": test_results,
         "standard_metrics": {"train_mse": train_mse, "test_mse": test_mse, "train_r2": train_r2, "test_r2": test_r2},
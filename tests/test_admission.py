@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from src.service.admission import AdmissionControl, AdmissionController, AdmissionRejected, parse_limits
+
+
+def test_queue_is_bounded_and_served_in_order():
+    controller = AdmissionController("lm", max_concurrency=1, max_queue=2)
+    order = []
+
+    async def request(name, hold):
+        async with controller.slot():
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def run():
+        tasks = [asyncio.create_task(request(name, 0.05)) for name in "abc"]
+        await asyncio.sleep(0.01)
+        assert (controller.active, controller.queued) == (1, 2)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        await asyncio.gather(*tasks)
+        return rejected.value
+
+    rejected = asyncio.run(run())
+    assert order == ["a", "b", "c"]
+    assert rejected.retry_after >= 1
+    assert controller.rejected == 1
+    assert (controller.active, controller.queued) == (0, 0)
+    assert controller.service_time == pytest.approx(0.05, abs=0.03)
+
+
+def test_retry_after_follows_service_rate():
+    controller = AdmissionController("lm", max_concurrency=2, max_queue=10)
+    controller.service_time = 4.0
+    assert controller.retry_after() == 2
+    controller._waiters.extend([None] * 3)  # type: ignore
+    assert controller.retry_after() == 8
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    controller = AdmissionController("lm", max_concurrency=1, max_queue=5)
+
+    async def run():
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.queued == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        controller.release()
+
+    asyncio.run(run())
+    assert (controller.active, controller.queued) == (0, 0)
+
+
+def test_waiter_cancelled_while_released_stays_cancelled():
+    controller = AdmissionController("lm", max_concurrency=1, max_queue=5)
+
+    async def run():
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        # The release pops the cancelled waiter before its task resumes
+        controller.release()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(run())
+    assert (controller.active, controller.queued) == (0, 0)
+
+
+def test_per_predictor_limits():
+    assert parse_limits("lm=4:16, ridge=8:128") == {"lm": (4, 16), "ridge": (8, 128)}
+    control = AdmissionControl(max_concurrency=16, max_queue=64, limits={"lm": (4, 16)})
+    assert (control.controller("lm").max_concurrency, control.controller("lm").max_queue) == (4, 16)
+    assert control.controller("ridge").max_concurrency == 16
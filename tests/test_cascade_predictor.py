@@ -0,0 +1,75 @@
+import asyncio
+
+from src.platform.cascade_predictor import CascadePredictor, LexicalPredictor
+from src.platform.dummy_predictor import DummyPredictor
+
+VACANCY = "Senior Python developer with Django and PostgreSQL experience"
+CANDIDATES = [
+    ("Senior Python developer, Django, PostgreSQL, 6 years", ""),
+    ("Java engineer, Spring", ""),
+    ("Django developer", ""),
+    ("Graphic designer", ""),
+    ("Python developer, PostgreSQL", ""),
+]
+
+
+class RecordingReranker(DummyPredictor):
+    """Reranker scoring by CV length and remembering what it was asked to score."""
+
+    def __init__(self):
+        self.seen = []
+
+    def predict(self, candidate_description, vacancy_description, hr_comment):
+        self.seen.append(candidate_description)
+        return len(candidate_description) / 10, "Reranked"
+
+
+def test_lexical_predictor_scores_vacancy_overlap():
+    score, description = LexicalPredictor().predict("Python and Django", "Python Django PostgreSQL Kubernetes", "")
+    assert score == 2.5
+    assert description == "Lexical match: 2 of 4 vacancy terms found in the CV."
+
+
+def test_rank_reranks_only_the_shortlist():
+    reranker = RecordingReranker()
+    cascade = CascadePredictor(LexicalPredictor(), reranker, rerank_top_k=2, rerank_threshold=None)
+
+    selection = asyncio.run(cascade.rank_async(VACANCY, CANDIDATES, top_k=10))
+
+    assert sorted(reranker.seen) == sorted([CANDIDATES[0][0], CANDIDATES[4][0]])
+    assert [ranked.index for ranked in selection.ranking()] == [0, 4]
+    assert all(ranked.description == "Reranked" for ranked in selection.ranking())
+    assert selection.stats == {"prefiltered": 5, "reranked": 2, "llm_calls_saved": 3}
+
+
+def test_per_call_cutoffs_override_defaults():
+    reranker = RecordingReranker()
+    cascade = CascadePredictor(LexicalPredictor(), reranker, rerank_top_k=1)
+
+    selection = asyncio.run(cascade.rank_async(VACANCY, CANDIDATES, rerank_top_k=10, rerank_threshold=1.0))
+
+    assert {ranked.index for ranked in selection.ranking()} == {0, 2, 4}
+    assert selection.stats["llm_calls_saved"] == 2
+
+
+def test_predict_skips_the_reranker_below_threshold():
+    reranker = RecordingReranker()
+    cascade = CascadePredictor(LexicalPredictor(), reranker, rerank_threshold=2.0)
+
+    assert cascade.predict("Graphic designer", VACANCY, "")[1].startswith("Lexical match")
+    assert asyncio.run(cascade.predict_async(CANDIDATES[0][0], VACANCY, ""))[1] == "Reranked"
+    assert reranker.seen == [CANDIDATES[0][0]]
+
+
+def test_sync_rank_works_inside_a_running_loop():
+    reranker = RecordingReranker()
+    cascade = CascadePredictor(LexicalPredictor(), reranker, rerank_top_k=2, rerank_threshold=None)
+
+    async def rank_in_loop():
+        return cascade.rank(VACANCY, CANDIDATES, top_k=10), cascade.predict_batch([(CANDIDATES[3][0], VACANCY, "")])
+
+    selection, batch = asyncio.run(rank_in_loop())
+
+    assert [ranked.index for ranked in selection.ranking()] == [0, 4]
+    assert selection.stats == {"prefiltered": 5, "reranked": 2, "llm_calls_saved": 3}
+    assert batch[0][1] == "Reranked"
@@ -0,0 +1,76 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from src.platform.deadline import deadline_scope, remaining
+from src.platform.http_pool import AsyncHTTPPool
+from src.platform.lm_predictor import LMPredictor
+from src.service.deadlines import run_with_deadline
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after: float):
+        self.disconnect_after = disconnect_after
+        self.loop_time = None
+
+    async def is_disconnected(self) -> bool:
+        now = asyncio.get_running_loop().time()
+        self.loop_time = self.loop_time or now
+        return now - self.loop_time >= self.disconnect_after
+
+
+def test_deadline_cancels_work_and_answers_504():
+    cancelled = []
+
+    async def work():
+        assert 0 < remaining() <= 0.1
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run_with_deadline(work, timeout=0.1))
+    assert error.value.status_code == 504
+    assert cancelled == [True]
+
+
+def test_client_disconnect_cancels_work(monkeypatch):
+    monkeypatch.setattr("src.service.deadlines.DISCONNECT_POLL_S", 0.01)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run_with_deadline(lambda: asyncio.sleep(1), timeout=5, request=FakeRequest(0.05)))
+    assert error.value.status_code == 499
+
+
+def test_nested_scopes_keep_the_earlier_deadline():
+    assert remaining() is None
+    assert remaining(180) == 180
+    with deadline_scope(1):
+        with deadline_scope(10):
+            assert remaining() <= 1
+
+
+def test_lm_call_is_aborted_at_the_deadline():
+    aborted = []
+
+    async def slow_completion(request: httpx.Request) -> httpx.Response:
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            aborted.append(request.url.host)
+            raise
+        return httpx.Response(200, json={"choices": [{"message": {"content": "<score> 4 </score>"}}]})
+
+    predictor = LMPredictor(
+        api_base_url="http://llm:5001/v1", pool=AsyncHTTPPool(transport=httpx.MockTransport(slow_completion))
+    )
+
+    with pytest.raises(HTTPException):
+        asyncio.run(
+            run_with_deadline(lambda: predictor.predict_async("5 years of Python", "Python developer", ""), 0.1)
+        )
+    assert aborted == ["llm"]
@@ -0,0 +1,41 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.platform.embedding_batcher import DynamicBatcher
+
+
+def test_concurrent_texts_share_forward_passes():
+    batch_sizes = []
+
+    def embed(texts):
+        batch_sizes.append(len(texts))
+        return np.array([[len(text)] for text in texts], dtype=np.float32)
+
+    batcher = DynamicBatcher(embed, max_batch_size=8, max_wait_ms=50)
+    texts = ["x" * i for i in range(1, 25)]
+    barrier = threading.Barrier(len(texts))
+
+    def submit(text):
+        barrier.wait()
+        return batcher.submit(text).result()
+
+    with ThreadPoolExecutor(len(texts)) as executor:
+        results = list(executor.map(submit, texts))
+    batcher.close()
+
+    assert [int(row[0]) for row in results] == [len(text) for text in texts]
+    assert sum(batch_sizes) == len(texts)
+    assert max(batch_sizes) <= 8
+    assert len(batch_sizes) < len(texts)
+
+
+def test_errors_reach_every_caller():
+    def embed(texts):
+        raise RuntimeError("encoder failed")
+
+    batcher = DynamicBatcher(embed, max_batch_size=4, max_wait_ms=1)
+    future = batcher.submit("text")
+    assert isinstance(future.exception(timeout=1), RuntimeError)
+    batcher.close()
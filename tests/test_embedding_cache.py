@@ -0,0 +1,50 @@
+import numpy as np
+
+from src.training_pipeline.embedding_cache import EmbeddingCache
+
+
+def test_memory_tier_evicts_by_size():
+    cache = EmbeddingCache("encoder", max_bytes=2 * 768 * 4)
+    for i in range(3):
+        cache.put(f"text {i}", np.full(768, i, dtype=np.float32))
+
+    assert cache.get("text 0") is None
+    assert cache.get("  text   2 ")[0] == 2  # whitespace-normalized key
+    assert cache.stats()["memory_entries"] == 2
+
+
+def test_disk_tier_persists_across_instances(tmp_path):
+    cache = EmbeddingCache("org/encoder", cache_dir=str(tmp_path))
+    embeddings = np.random.default_rng(0).normal(size=(3, 8)).astype(np.float32)
+    for i, embedding in enumerate(embeddings):
+        cache.put(f"document {i}", embedding)
+
+    reopened = EmbeddingCache("org/encoder", cache_dir=str(tmp_path))
+    assert np.array_equal(reopened.get("document 1"), embeddings[1])
+    assert reopened.get("unknown document") is None
+    reopened.put("document 3", embeddings[0])
+    assert np.array_equal(reopened.get("document 3"), embeddings[0])
+    assert reopened.stats() == {
+        "memory_hits": 1,
+        "disk_hits": 1,
+        "misses": 1,
+        "memory_entries": 2,
+        "memory_bytes": 64,
+        "disk_entries": 4,
+    }
+    assert EmbeddingCache("other/encoder", cache_dir=str(tmp_path)).get("document 1") is None
+
+
+def test_disk_tier_is_shared_between_processes(tmp_path):
+    # Two caches on one directory stand for two worker processes
+    first = EmbeddingCache("encoder", cache_dir=str(tmp_path))
+    second = EmbeddingCache("encoder", cache_dir=str(tmp_path))
+    x, y = np.zeros(8, dtype=np.float32), np.ones(8, dtype=np.float32)
+
+    first.put("x", x)
+    second.put("y", y)
+
+    assert np.array_equal(second.get("y"), y)
+    assert np.array_equal(second.get("x"), x)  # appended by the other process
+    assert np.array_equal(first.get("y"), y)
+    assert np.array_equal(EmbeddingCache("encoder", cache_dir=str(tmp_path)).get("x"), x)
@@ -0,0 +1,11 @@
+from src.platform.embedding_engine import close_embedding_engines, get_embedding_engine
+
+
+def test_engine_is_shared_and_lazy():
+    engine = get_embedding_engine("bert-base-uncased")
+    assert get_embedding_engine("bert-base-uncased") is engine
+    assert not engine.is_loaded
+    assert engine.memory_usage() == {"parameters": 0, "buffers": 0, "total": 0}
+
+    close_embedding_engines()
+    assert get_embedding_engine("bert-base-uncased") is not engine
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+
+from src.service.admission import AdmissionRejected
+from src.service.jobs import InMemoryJobStore, JobRunner, SqliteJobStore
+from src.service.models import JobStatus
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    store = InMemoryJobStore() if request.param == "memory" else SqliteJobStore(str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_store_roundtrip(store):
+    record = store.create({"candidate_description": "cv"})
+    assert store.get(record.id).status == JobStatus.PENDING
+    assert store.unfinished() == [record.id]
+
+    store.update(record.id, JobStatus.SUCCEEDED, result={"score": 4.0, "description": "Good"})
+    stored = store.get(record.id)
+    assert stored.status == JobStatus.SUCCEEDED
+    assert stored.result == {"score": 4.0, "description": "Good"}
+    assert stored.payload == {"candidate_description": "cv"}
+    assert stored.finished_at is not None
+    assert store.unfinished() == []
+    assert store.get("missing") is None
+
+
+def test_runner_executes_jobs_and_long_polls(store):
+    async def handler(payload):
+        await asyncio.sleep(0.05)
+        if payload.get("fail"):
+            raise RuntimeError("backend down")
+        return {"score": 3.0, "description": None}
+
+    async def run():
+        runner = JobRunner(store, handler, workers=2)
+        runner.start()
+        ok, failing = await runner.submit({}), await runner.submit({"fail": True})
+        immediate = await runner.wait(ok.id, timeout=0)
+        finished = await runner.wait(ok.id, timeout=5)
+        failed = await runner.wait(failing.id, timeout=5)
+        await runner.stop()
+        return immediate, finished, failed
+
+    immediate, finished, failed = asyncio.run(run())
+    assert immediate.status in (JobStatus.PENDING, JobStatus.RUNNING)
+    assert finished.status == JobStatus.SUCCEEDED and finished.result["score"] == 3.0
+    assert failed.status == JobStatus.FAILED and failed.error == "backend down"
+
+
+def test_sqlite_jobs_resume_after_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    SqliteJobStore(path).create({"n": 1})
+
+    async def handler(payload):
+        return {"score": payload["n"], "description": None}
+
+    async def run():
+        runner = JobRunner(SqliteJobStore(path), handler, workers=1)
+        runner.start()
+        (job_id,) = runner.store.unfinished()
+        record = await runner.wait(job_id, timeout=5)
+        await runner.stop()
+        return record
+
+    assert asyncio.run(run()).status == JobStatus.SUCCEEDED
+
+
+def test_jobs_rejected_by_admission_are_retried(store):
+    attempts = []
+
+    async def handler(payload):
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise AdmissionRejected("lm", retry_after=0.1)
+        return {"score": 2.0, "description": None}
+
+    async def run():
+        runner = JobRunner(store, handler, workers=1)
+        runner.start()
+        job = await runner.submit({})
+        pending = await runner.wait(job.id, timeout=0.05)
+        finished = await runner.wait(job.id, timeout=5)
+        await runner.stop()
+        return pending, finished
+
+    pending, finished = asyncio.run(run())
+    assert pending.status == JobStatus.PENDING
+    assert finished.status == JobStatus.SUCCEEDED and finished.result["score"] == 2.0
+    assert len(attempts) == 2 and attempts[1] - attempts[0] >= 0.1
@@ -0,0 +1,183 @@
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+import pytest
+
+from src.platform.http_pool import AsyncHTTPPool
+from src.platform.lm_backends import BackendPool, CircuitBreaker, NoBackendAvailable
+from src.platform.lm_predictor import LMPredictor
+
+COMPLETION = {"choices": [{"message": {"content": "<thought> Fine. </thought>\n<score> 3 </score>"}}]}
+URLS = ["http://llm-1:5001/v1", "http://llm-2:5001/v1"]
+
+
+def test_calls_go_to_the_least_loaded_backend():
+    calls = Counter()
+
+    async def completion(request: httpx.Request) -> httpx.Response:
+        calls[request.url.host] += 1
+        # llm-1 is slow, so it keeps more requests outstanding and gets fewer new ones
+        await asyncio.sleep(0.2 if request.url.host == "llm-1" else 0.02)
+        return httpx.Response(200, json=COMPLETION)
+
+    pool = AsyncHTTPPool(transport=httpx.MockTransport(completion))
+    predictor = LMPredictor(api_base_urls=URLS, pool=pool)
+
+    async def run():
+        async def worker():
+            for _ in range(5):
+                await predictor.predict_async("5 years of Python", "Python developer", "")
+
+        await asyncio.gather(*[worker() for _ in range(4)])
+        await predictor.backends.aclose()
+
+    asyncio.run(run())
+    assert sum(calls.values()) == 20
+    assert calls["llm-2"] > 2 * calls["llm-1"]
+    stats = {backend["url"]: backend for backend in predictor.backends.stats()}
+    assert stats[URLS[1]]["p95"] < stats[URLS[0]]["p50"]
+
+
+def test_failing_backend_is_ejected():
+    calls = Counter()
+
+    def completion(request: httpx.Request) -> httpx.Response:
+        calls[request.url.host] += 1
+        if request.url.host == "llm-1":
+            return httpx.Response(503, text="overloaded")
+        return httpx.Response(200, json=COMPLETION)
+
+    pool = AsyncHTTPPool(transport=httpx.MockTransport(completion))
+    predictor = LMPredictor(api_base_urls=URLS, pool=pool)
+    predictor.backends.health_interval = 0
+
+    async def run():
+        return [await predictor.predict_async("5 years of Python", "Python developer", "") for _ in range(10)]
+
+    results = asyncio.run(run())
+    assert calls["llm-1"] == 3  # ejected after the breaker threshold
+    assert sum(score == 3.0 for score, _ in results) == 7
+    assert [backend["state"] for backend in predictor.backends.stats()] == ["open", "closed"]
+
+
+def test_breaker_half_opens_after_cooldown():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=0.05)
+    breaker.record_failure()
+    assert breaker.allows()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allows()
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    breaker.record_failure()  # a failed trial opens it again right away
+    assert breaker.state == "open"
+
+
+def test_health_checks_eject_dead_backends():
+    def models(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "llm-1":
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(200, json={"data": [{"id": "llama"}]})
+
+    backends = BackendPool(URLS, pool=AsyncHTTPPool(transport=httpx.MockTransport(models)), failure_threshold=2)
+
+    async def run():
+        for _ in range(2):
+            await backends.check_health()
+
+    asyncio.run(run())
+    assert backends.choose().url == URLS[1]
+    with pytest.raises(NoBackendAvailable):
+        backends.choose(exclude=[backends.backends[1]])
+
+
+def test_half_open_breaker_lets_one_trial_through():
+    backends = BackendPool(URLS[:1], pool=AsyncHTTPPool(), failure_threshold=1, cooldown=0.05)
+    breaker = backends.backends[0].breaker
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert backends.choose() is backends.backends[0]  # the trial
+    with pytest.raises(NoBackendAvailable):
+        backends.choose()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert backends.choose() is backends.choose()
+
+
+def test_health_checks_are_authenticated_and_ignore_rejections():
+    authorizations = []
+
+    def models(request: httpx.Request) -> httpx.Response:
+        authorizations.append(request.headers.get("Authorization"))
+        return httpx.Response(401, json={"error": "invalid key"})
+
+    pool = AsyncHTTPPool(transport=httpx.MockTransport(models))
+    predictor = LMPredictor(api_base_urls=URLS, api_key="secret", pool=pool)
+    predictor.backends.backends[0].breaker.failure_threshold = 1
+
+    async def run():
+        for _ in range(3):
+            await predictor.backends.check_health()
+
+    asyncio.run(run())
+    assert set(authorizations) == {"Bearer secret"}
+    assert [backend["state"] for backend in predictor.backends.stats()] == ["closed", "closed"]
+
+
+def test_available_models_are_merged_across_backends():
+    def models(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "llm-1":
+            return httpx.Response(500, text="boom")
+        return httpx.Response(200, json={"data": [{"id": "llama"}, {"id": "qwen"}]})
+
+    predictor = LMPredictor(api_base_urls=URLS, pool=AsyncHTTPPool(transport=httpx.MockTransport(models)))
+    assert asyncio.run(predictor.get_available_models_async()) == ("llama", "qwen")
+
+
+def hedging_predictor(max_ratio: float):
+    cancelled = []
+
+    async def completion(request: httpx.Request) -> httpx.Response:
+        try:
+            await asyncio.sleep(1.0 if request.url.host == "llm-1" else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(request.url.host)
+            raise
+        return httpx.Response(200, json=COMPLETION)
+
+    pool = AsyncHTTPPool(transport=httpx.MockTransport(completion))
+    predictor = LMPredictor(api_base_urls=URLS, pool=pool, hedge_percentile=0.95)
+    predictor.backends.health_interval = 0
+    predictor.backends.hedge_budget.max_ratio = max_ratio
+    predictor.backends.hedge_budget.tokens = max_ratio * 10
+    for backend in predictor.backends.backends:
+        backend.latencies.extend([0.02] * 20)
+    return predictor, cancelled
+
+
+def test_slow_calls_are_hedged_and_the_loser_cancelled():
+    predictor, cancelled = hedging_predictor(max_ratio=1.0)
+
+    async def run():
+        start = time.perf_counter()
+        results = [await predictor.predict_async("5 years of Python", "Python developer", "") for _ in range(4)]
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run())
+    assert results == [(3.0, "Fine.")] * 4
+    assert elapsed < 0.5  # no call waited for the slow backend
+    assert cancelled == ["llm-1"] * 2
+
+
+def test_hedging_respects_the_budget():
+    predictor, cancelled = hedging_predictor(max_ratio=0.0)
+
+    async def run():
+        start = time.perf_counter()
+        await predictor.predict_async("5 years of Python", "Python developer", "")
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) >= 0.9  # the first call goes to llm-1 and is not hedged
+    assert cancelled == []
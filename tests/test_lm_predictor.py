@@ -0,0 +1,285 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+import requests
+
+from src.platform import lm_predictor
+from src.platform.deadline import deadline_scope
+from src.platform.http_pool import AsyncHTTPPool, HTTPPoolConfig
+from src.platform.lm_predictor import LMPredictor
+from src.platform.metrics import count_prompt_tokens
+
+COMPLETION = "<thought> Strong Python background. </thought>\n<score> 4 </score>"
+
+
+async def slow_completion(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(0.2)
+    return httpx.Response(200, json={"choices": [{"message": {"content": COMPLETION}}]})
+
+
+def test_predict_async_calls_overlap():
+    pool = AsyncHTTPPool(HTTPPoolConfig(max_connections_per_host=8), transport=httpx.MockTransport(slow_completion))
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1", pool=pool)
+
+    async def run():
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *[predictor.predict_async("5 years of Python", "Python developer", "") for _ in range(5)]
+        )
+        await pool.aclose()
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run())
+    assert results == [(4.0, "Strong Python background.")] * 5
+    assert elapsed < 0.6  # five 0.2 s calls ran concurrently
+
+
+def test_predict_async_reports_api_errors():
+    pool = AsyncHTTPPool(transport=httpx.MockTransport(lambda request: httpx.Response(500, text="boom")))
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1", pool=pool)
+
+    score, description = asyncio.run(predictor.predict_async("5 years of Python", "Python developer", ""))
+    assert score == 0.0
+    assert description.startswith("Error in prediction: API call failed")
+
+
+def test_call_api_stops_before_sending_once_the_deadline_passed(monkeypatch):
+    def post(*args, **kwargs):
+        raise AssertionError("no request expected")
+
+    monkeypatch.setattr(lm_predictor.requests, "post", post)
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1")
+
+    with deadline_scope(0), pytest.raises(TimeoutError):
+        predictor._call_api("prompt")
+
+
+def test_call_api_reports_malformed_responses(monkeypatch):
+    response = requests.Response()
+    response.status_code, response._content = 200, b'{"choices": []}'
+    monkeypatch.setattr(lm_predictor.requests, "post", lambda *args, **kwargs: response)
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1")
+
+    with pytest.raises(Exception, match="API call failed: list index out of range"):
+        predictor._call_api("prompt")
+
+
+def test_predict_batch_async_keeps_item_errors():
+    def completion(request: httpx.Request) -> httpx.Response:
+        if b"broken" in request.content:
+            return httpx.Response(500, text="boom")
+        return httpx.Response(200, json={"choices": [{"message": {"content": COMPLETION}}]})
+
+    pool = AsyncHTTPPool(transport=httpx.MockTransport(completion))
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1", pool=pool, batch_concurrency=2)
+
+    pairs = [("5 years of Python", "Python developer", ""), ("broken CV", "Python developer", "")] * 3
+    results = asyncio.run(predictor.predict_batch_async(pairs))
+
+    assert len(results) == 6
+    assert results[0::2] == [(4.0, "Strong Python background.")] * 3
+    assert all(isinstance(result, Exception) for result in results[1::2])
+
+
+class CompletionStream(httpx.AsyncByteStream):
+    """SSE body of a streamed completion that records how far it was read."""
+
+    def __init__(self, text: str, piece: int = 5):
+        self.pieces = [text[i : i + piece] for i in range(0, len(text), piece)]
+        self.sent = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        for content in self.pieces:
+            self.sent += 1
+            yield f"data: {json.dumps({'choices': [{'delta': {'content': content}}]})}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_predict_stream_stops_after_score():
+    body = CompletionStream(COMPLETION + "\nSome more text the client will never need." * 5)
+    requests = []
+
+    def completion(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, headers={"Content-Type": "text/event-stream"}, stream=body)
+
+    pool = AsyncHTTPPool(transport=httpx.MockTransport(completion))
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1", pool=pool)
+
+    async def run():
+        return [event async for event in predictor.predict_stream("5 years of Python", "Python developer", "")]
+
+    events = asyncio.run(run())
+    assert requests[0]["stream"] is True
+    assert "".join(value for event, value in events if event == "thought") == "Strong Python background. "
+    assert [event for event in events if event[0] != "thought"] == [
+        ("score", 4.0),
+        ("result", (4.0, "Strong Python background.")),
+    ]
+    assert body.closed and body.sent < len(body.pieces)
+
+
+def test_predict_stream_falls_back_to_full_parse():
+    body = CompletionStream("Good match overall, 3/5")
+    pool = AsyncHTTPPool(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, stream=body)),
+    )
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1", pool=pool)
+
+    async def run():
+        return [event async for event in predictor.predict_stream("5 years of Python", "Python developer", "")]
+
+    assert asyncio.run(run()) == [("score", 3.0), ("result", (3.0, "Good match overall,"))]
+
+
+def test_fast_mode_asks_for_json_score_only():
+    requests = []
+
+    def completion(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"choices": [{"message": {"content": '{"score": 4}'}}]})
+
+    pool = AsyncHTTPPool(transport=httpx.MockTransport(completion))
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1", pool=pool, fast=True, fast_max_tokens=8)
+
+    assert asyncio.run(predictor.predict_async("5 years of Python", "Python developer", "")) == (4.0, None)
+    payload = requests[0]
+    assert payload["max_tokens"] == 8
+    assert payload["response_format"]["type"] == "json_schema"
+    assert "<thought>" not in payload["messages"][0]["content"]
+    assert (
+        payload["messages"][1]["content"]
+        == "<job_description>\nPython developer\n</job_description>\n<CV>\n5 years of Python\n</CV>"
+    )
+
+
+def test_fast_mode_does_not_fall_back_to_free_text():
+    pool = AsyncHTTPPool(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"choices": [{"message": {"content": "I'd say 4/5"}}]})
+        )
+    )
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1", pool=pool, fast=True)
+
+    score, description = asyncio.run(predictor.predict_async("5 years of Python", "Python developer", ""))
+    assert score == 0.0
+    assert description.startswith("Error in prediction")
+
+
+def test_long_sections_are_truncated_and_counted():
+    requests = []
+
+    def completion(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"choices": [{"message": {"content": COMPLETION}}]})
+
+    pool = AsyncHTTPPool(transport=httpx.MockTransport(completion))
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1", pool=pool, candidate_token_budget=50)
+    huge_cv = " ".join(f"project{i}" for i in range(5000))
+
+    with count_prompt_tokens() as counts:
+        asyncio.run(predictor.predict_async(huge_cv, "Python developer", ""))
+
+    prompt = requests[0]["messages"][1]["content"]
+    assert "project0" in prompt and "project4999" not in prompt
+    assert counts["candidate"] <= 50
+    assert counts["system"] == predictor.prompt_budget.static_tokens["system"] > 0
+
+
+def test_prompts_of_a_vacancy_share_a_static_prefix():
+    requests = []
+
+    def completion(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"choices": [{"message": {"content": COMPLETION}}]})
+
+    pool = AsyncHTTPPool(transport=httpx.MockTransport(completion))
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1", pool=pool, cache_hints=True, batch_concurrency=1)
+    candidates = [("5 years of Python", ""), ("Java developer", ""), ("Data analyst", "")]
+    asyncio.run(predictor.rank_async("Python developer", candidates))
+
+    prompts = [payload["messages"][1]["content"] for payload in requests]
+    prefix = "<|im_start|>user\n<job_description>\nPython developer\n</job_description>\n"
+    assert all(prompt.startswith(prefix) for prompt in prompts)
+    assert {LMPredictor.static_prefix(prompt) for prompt in prompts} == {prefix + "Please evaluate this candidate:\n"}
+    assert len({payload["prompt_cache_key"] for payload in requests}) == 1
+    assert all(payload["cache_prompt"] is True for payload in requests)
+
+
+def test_parse_packed_response_keeps_well_formed_answers():
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1")
+    response = """
+    <candidate id="1"><thought> Strong fit. </thought><score> 5 </score></candidate>
+    <candidate id=2>
+    <thoughts>Some gaps</thoughts>
+    <score>3/5</score>
+    </candidate>
+    <candidate id="3"><thought>Unsure</thought><score>excellent</score></candidate>
+    <candidate id="9"><thought>Not asked for</thought><score>4</score></candidate>
+    <candidate id="1"><thought>Repeated</thought><score>1</score></candidate>
+    <candidate id="4"><thought>Cut short by the token limit
+    """
+    assert predictor.parse_packed_response(response, ["1", "2", "3", "4"]) == {
+        "1": (5.0, "Strong fit."),
+        "2": (3.0, "Some gaps"),
+    }
+
+
+def test_pack_respects_candidate_count_and_token_budget():
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1", pack_candidates=3, pack_token_budget=30)
+    short, long = "Python developer", " ".join(["experience"] * 20)
+
+    groups = predictor.pack(list(enumerate([short, short, short, short, long, short])))
+    assert [[index for index, _ in group] for group in groups] == [[0, 1, 2], [3], [4], [5]]
+
+
+def test_rank_async_packs_candidates_and_falls_back_on_malformed_answers():
+    payloads = []
+
+    def completion(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        payloads.append(payload)
+        prompt = payload["messages"][1]["content"]
+        if "<candidate id=" in prompt:
+            # The answer for the second candidate is missing
+            content = '<candidate id="1"><thought>Packed</thought><score>5</score></candidate>'
+            content += '<candidate id="3"><thought>Packed</thought><score>2</score></candidate>'
+        else:
+            content = "<thought>Single</thought><score>4</score>"
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    pool = AsyncHTTPPool(transport=httpx.MockTransport(completion))
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1", pool=pool, pack_candidates=3, max_tokens=100)
+    candidates = [("Python developer", ""), ("Java developer", ""), ("Data analyst", "")]
+
+    selection = asyncio.run(predictor.rank_async("Python developer", candidates, top_k=3))
+
+    assert [(r.index, r.score, r.description) for r in selection.ranking()] == [
+        (0, 5.0, "Packed"),
+        (1, 4.0, "Single"),
+        (2, 2.0, "Packed"),
+    ]
+    assert len(payloads) == 2
+    assert payloads[0]["max_tokens"] == 300
+    assert payloads[0]["messages"][0]["content"] != payloads[1]["messages"][0]["content"]
+
+
+def test_rank_async_reports_answers_without_a_score():
+    def completion(request: httpx.Request) -> httpx.Response:
+        content = "I cannot rate this" if b"Designer" in request.content else COMPLETION
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    predictor = LMPredictor(
+        api_base_url="http://llm:5001/v1", pool=AsyncHTTPPool(transport=httpx.MockTransport(completion))
+    )
+    selector = asyncio.run(predictor.rank_async("Python developer", [("Python, 5 years", ""), ("Designer", "")]))
+
+    assert [ranked.index for ranked in selector.ranking()] == [0]
+    assert selector.errors == {1: "No score in prediction: I cannot rate this"}
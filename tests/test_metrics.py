@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from src.platform.metrics import STAGE_DURATION, MetricsRegistry, QuantileSketch, registry, stage, track_request
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = random.Random(0)
+    values = [rng.lognormvariate(0, 1.5) for _ in range(20000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    values.sort()
+    for q in (0.5, 0.9, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+    assert sketch.count_below(1.0) == pytest.approx(sum(v <= 1.0 for v in values), rel=0.01)
+    assert len(sketch.buckets) < 2000
+
+
+def test_render_prometheus_text():
+    metrics = MetricsRegistry()
+    metrics.describe("demo_seconds", "histogram", "Demo latency")
+    metrics.describe("demo_total", "counter", "Demo counter")
+    for value in (0.002, 0.2, 3.0):
+        metrics.observe("demo_seconds", value, predictor="lm")
+    metrics.inc("demo_total", 5, kind="prompt")
+    metrics.register_collector("demo_ratio", "gauge", "Demo ratio", lambda: [("", {"cache": "x"}, 0.5)])
+
+    text = metrics.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{predictor="lm",le="0.25"} 2' in text
+    assert 'demo_seconds_bucket{predictor="lm",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{predictor="lm"} 3' in text
+    assert 'demo_quantile_seconds{predictor="lm",quantile="0.5"}' in text
+    assert 'demo_total{kind="prompt"} 5' in text
+    assert 'demo_ratio{cache="x"} 0.5' in text
+
+
+def test_stages_are_labelled_with_the_request_predictor():
+    with track_request("test-predictor"):
+        with stage("parse_response"):
+            pass
+    sketch = registry.sketch(STAGE_DURATION, predictor="test-predictor", stage="parse_response")
+    assert sketch is not None and sketch.count == 1
@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+from src.service.model_catalog import ModelCatalog
+
+
+def test_lookups_run_concurrently_and_slow_backends_time_out():
+    async def fast():
+        return ("ridge-model-v1",)
+
+    async def slow():
+        await asyncio.sleep(0.5)
+        return ("llama",)
+
+    catalog = ModelCatalog({"ridge": fast, "lm": slow, "lm2": slow}, ttl=60, timeout=0.1)
+
+    async def run():
+        start = time.perf_counter()
+        result = await catalog.get()
+        elapsed = time.perf_counter() - start
+        await catalog.stop()
+        return result, elapsed
+
+    result, elapsed = asyncio.run(run())
+    assert elapsed < 0.3
+    assert result["ridge"] == (["ridge-model-v1"], False)
+    assert result["lm"] == ([], True)
+
+
+def test_failed_refresh_serves_stale_models():
+    responses = [("llama",), RuntimeError("backend down")]
+    calls = []
+
+    async def lm():
+        calls.append(1)
+        response = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    catalog = ModelCatalog({"lm": lm}, ttl=0, timeout=1)
+
+    async def run():
+        first = await catalog.get()
+        await catalog.refresh()
+        second = await catalog.get()
+        await catalog.stop()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["lm"][0] == ["llama"]
+    assert second["lm"] == (["llama"], True)
+    assert catalog.entries["lm"].error == "backend down"
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import Ridge
+from transformers import BertConfig, BertModel, BertTokenizerFast
+
+from src.benchmark.onnx_encoder import check_parity
+from src.training_pipeline.data_preprocessing import TextPreprocessor
+from src.training_pipeline.onnx_encoder import embedding_cache_name
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+
+TEXTS = ["Senior Python developer", "Django and PostgreSQL, six years", "", "Graphic designer " * 40]
+
+
+@pytest.fixture(scope="module")
+def tiny_encoder(tmp_path_factory):
+    """A randomly initialized two-layer BERT with a small vocabulary, saved like a hub model."""
+    path = tmp_path_factory.mktemp("tiny-bert")
+    words = sorted({word for text in TEXTS for word in text.lower().split()})
+    vocab = path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", ",", *words]))
+    BertTokenizerFast(vocab_file=str(vocab)).save_pretrained(path)
+    config = BertConfig(
+        vocab_size=len(words) + 6,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+    )
+    BertModel(config).save_pretrained(path)
+    return str(path)
+
+
+def test_onnx_backends_match_torch_embeddings(tiny_encoder, tmp_path, monkeypatch):
+    monkeypatch.setenv("ONNX_EXPORT_DIR", str(tmp_path))
+    reference = TextPreprocessor(tiny_encoder).get_bert_embeddings(TEXTS, batch_size=3)
+    onnx = TextPreprocessor(tiny_encoder, backend="onnx").get_bert_embeddings(TEXTS, batch_size=3)
+    int8 = TextPreprocessor(tiny_encoder, backend="onnx-int8").get_bert_embeddings(TEXTS, batch_size=3)
+
+    # Padded batches and single texts go through the same graph
+    single = TextPreprocessor(tiny_encoder, backend="onnx").get_bert_embedding(TEXTS[1])
+    assert np.allclose(single, reference[1], atol=1e-5)
+
+    rng = np.random.default_rng(0)
+    model = Ridge().fit(rng.normal(size=(20, 64)), rng.uniform(size=20))
+    pairs = [(0, 1), (0, 2), (0, 3), (1, 3)]
+    assert np.allclose(onnx, reference, atol=1e-5)
+    assert check_parity(reference, onnx, model, pairs, tolerance=1e-4)["passed"]
+    assert check_parity(reference, int8, model, pairs, tolerance=0.1)["min_cosine"] > 0.95
+
+
+def test_int8_embeddings_are_cached_apart():
+    assert embedding_cache_name("bert-base-uncased", "onnx") == "bert-base-uncased"
+    assert embedding_cache_name("bert-base-uncased", "onnx-int8") != "bert-base-uncased"
+    with pytest.raises(ValueError):
+        TextPreprocessor("bert-base-uncased", backend="tensorrt")
@@ -0,0 +1,45 @@
+from src.platform.prompt_budget import TRUNCATION_MARKER, PromptBudget, TokenCounter, compress
+
+
+class CountingTokenCounter(TokenCounter):
+    def __init__(self):
+        self.calls = 0
+
+    def spans(self, text):
+        self.calls += 1
+        return super().spans(text)
+
+
+def test_counts_are_cached_by_content():
+    counter = CountingTokenCounter()
+    budget = PromptBudget(counter, budgets={}, static={"system": "You rate CVs."})
+    assert budget.static_tokens == {"system": 4}
+
+    calls = counter.calls
+    assert budget.count("Python developer") == budget.count("Python developer") == 5
+    assert counter.calls == calls + 1
+
+
+def test_compress_drops_repeated_lines_and_whitespace():
+    page = "John Doe - CV\n\n   Python    developer\n\nJohn Doe - CV\nAWS"
+    assert compress(page) == "John Doe - CV\nPython developer\nAWS"
+
+
+def test_fit_compresses_before_truncating():
+    budget = PromptBudget(TokenCounter(), budgets={"candidate": 12})
+
+    padded = "Python   developer\n\n\n" * 10
+    text, tokens = budget.fit("candidate", padded)
+    assert text == "Python developer"
+    assert tokens == 5
+
+    long_cv = " ".join(f"skill{i}" for i in range(100))
+    text, tokens = budget.fit("candidate", long_cv)
+    assert text.startswith("skill0 skill1") and text.endswith(TRUNCATION_MARKER)
+    assert tokens <= 12
+    assert budget.fit("candidate", long_cv) == (text, tokens)
+
+
+def test_unlimited_section_is_unchanged():
+    budget = PromptBudget(TokenCounter(), budgets={"candidate": 0})
+    assert budget.fit("candidate", "a  b") == ("a  b", 2)
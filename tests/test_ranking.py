@@ -0,0 +1,25 @@
+from src.platform.ranking import TopKSelector, iter_chunks
+
+
+def test_top_k_selector_keeps_best_scores():
+    scores = [3.0, 4.5, 1.0, 4.5, 2.0, 5.0]
+    selector = TopKSelector(top_k=3)
+    selector.extend(enumerate((score, f"candidate {i}") for i, score in enumerate(scores)))
+    selector.add(len(scores), ValueError("failed"))
+
+    assert [(ranked.index, ranked.score) for ranked in selector.ranking()] == [(5, 5.0), (1, 4.5), (3, 4.5)]
+    assert selector.errors == {6: "failed"}
+    assert selector.scored == 6
+
+
+def test_missing_score_is_an_error_of_that_candidate():
+    selector = TopKSelector(top_k=2)
+    selector.extend([(0, (3.0, "ok")), (1, (None, "I cannot rate this"))])
+
+    assert [ranked.index for ranked in selector.ranking()] == [0]
+    assert selector.errors == {1: "No score in prediction: I cannot rate this"}
+    assert selector.scored == 1
+
+
+def test_iter_chunks():
+    assert list(iter_chunks(list(range(5)), 2)) == [(0, [0, 1]), (2, [2, 3]), (4, [4])]
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from src.service.result_cache import MatchResultCache
+
+
+def test_identical_requests_share_one_call():
+    cache = MatchResultCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 4.0, "Good match"
+
+    async def run():
+        key = cache.key("lm", "model", 0.7, ("cv", "vacancy", ""))
+        first = await asyncio.gather(*[cache.get_or_compute(key, compute) for _ in range(5)])
+        second = await cache.get_or_compute(key, compute)
+        bypassed = await cache.get_or_compute(key, compute, bypass=True)
+        return first, second, bypassed
+
+    first, second, bypassed = asyncio.run(run())
+    assert [status for _, status in first] == ["miss"] + ["coalesced"] * 4
+    assert all(result == (4.0, "Good match") for result, _ in first)
+    assert second[1] == "hit"
+    assert bypassed[1] == "bypass"
+    assert len(calls) == 2
+
+
+def test_errors_are_not_cached():
+    cache = MatchResultCache()
+
+    async def failing():
+        raise RuntimeError("backend down")
+
+    async def run():
+        key = cache.key("lm", "model", 0.7, ("cv", "vacancy", ""))
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute(key, failing)
+        result = await cache.get_or_compute(
+            key, lambda: asyncio.sleep(0, result=(0.0, "Error in prediction")), cacheable=lambda result: result[0] > 0
+        )
+        return result, cache.stats()
+
+    result, stats = asyncio.run(run())
+    assert result[1] == "miss"
+    assert stats["entries"] == 0
@@ -0,0 +1,86 @@
+import zlib
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import Ridge
+
+from src.platform.ridge_predictor import RidgePredictor
+
+
+class FakeEngine:
+    """Deterministic stand-in for the BERT embedding engine."""
+
+    def embed(self, text):
+        return np.random.default_rng(zlib.crc32(text.encode())).normal(size=768).astype(np.float32)
+
+    def embed_batch(self, texts, batch_size=32):
+        return np.stack([self.embed(text) for text in texts])
+
+    def features(self, candidate_description, vacancy_description, hr_comment):
+        return np.concatenate([self.embed(vacancy_description), self.embed(candidate_description)])
+
+
+def test_predict_batch_matches_predict():
+    predictor = RidgePredictor(engine=FakeEngine())
+    pairs = [
+        ("5 years of Python development", "Senior Python developer", ""),
+        ("Java developer with Spring", "Senior Python developer", ""),
+        ("Data scientist, PhD", "ML engineer", "strong candidate"),
+    ]
+
+    results = predictor.predict_batch(pairs)
+    assert results == [predictor.predict(*pair) for pair in pairs]
+
+
+def test_rank_returns_top_k_in_score_order():
+    predictor = RidgePredictor(engine=FakeEngine())
+    vacancy = "Senior Python developer"
+    candidates = [(f"Candidate number {i} with Python", "") for i in range(20)]
+
+    selection = predictor.rank(vacancy, candidates, top_k=5, chunk_size=6)
+    expected = sorted(
+        ((predictor.predict(candidate, vacancy, "")[0], -i) for i, (candidate, _) in enumerate(candidates)),
+        reverse=True,
+    )[:5]
+    assert [(ranked.score, -ranked.index) for ranked in selection.ranking()] == expected
+
+
+def test_partial_scores_match_model_and_are_cached():
+    engine = FakeEngine()
+    predictor = RidgePredictor(engine=engine)
+    vacancies = ["Senior Python developer", "ML engineer"]
+    candidates = ["5 years of Python development", "Java developer with Spring", "Data scientist, PhD"]
+
+    matrix = predictor.score_matrix(vacancies, candidates)
+    for i, vacancy in enumerate(vacancies):
+        for j, candidate in enumerate(candidates):
+            features = engine.features(candidate, vacancy, "").reshape(1, -1)
+            expected = np.clip(predictor.model.predict(features)[0] * 5, 0, 5)
+            assert matrix[i, j] == pytest.approx(expected, abs=0.01)
+
+    assert predictor.partial_cache.stats() == {"entries": 5, "size": 5, "hits": 0, "misses": 5}
+    predictor.predict(candidates[0], vacancies[0], "")
+    assert predictor.partial_cache.hits == 2
+
+
+def test_artifact_records_its_encoder(tmp_path):
+    engine = FakeEngine()
+    X = np.stack([engine.features(f"CV {i}", f"Vacancy {i % 3}", "") for i in range(12)])
+    model = Ridge().fit(X, np.linspace(0, 1, 12))
+    path = tmp_path / "matcher.joblib"
+    joblib.dump({"model": model, "encoder": "fake-encoder", "embedding_dim": 768}, path)
+
+    engine.model_name = "fake-encoder"
+    predictor = RidgePredictor(engine=engine, model_path=str(path))
+    assert predictor.encoder == "fake-encoder"
+    assert predictor.predict("CV 1", "Vacancy 1", "")[0] == pytest.approx(
+        np.clip(model.predict(X[1:2])[0] * 5, 0, 5), abs=0.01
+    )
+
+    engine.model_name = "bert-base-uncased"
+    with pytest.raises(ValueError, match="fake-encoder"):
+        RidgePredictor(engine=engine, model_path=str(path))
+
+    # Artifacts saved before the encoder was recorded were trained on bert-base-uncased
+    assert RidgePredictor(engine=FakeEngine()).encoder == "bert-base-uncased"
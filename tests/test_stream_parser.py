@@ -0,0 +1,32 @@
+from src.platform.stream_parser import StreamingTagParser, parse_score
+
+COMPLETION = "<thought> Strong Python a < b background. </thought>\n<score> 4/5 </score> trailing text"
+
+
+def feed_in_pieces(text: str, size: int):
+    parser = StreamingTagParser()
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start : start + size]))
+    return parser, events
+
+
+def test_tags_split_across_chunks():
+    for size in (1, 2, 3, 7, len(COMPLETION)):
+        parser, events = feed_in_pieces(COMPLETION, size)
+        assert "".join(value for event, value in events if event == "thought") == "Strong Python a < b background. "
+        assert [event for event in events if event[0] == "score"] == [("score", 4.0)]
+        assert parser.score == 4.0
+
+
+def test_thoughts_tag_and_missing_score():
+    parser, events = feed_in_pieces("<thoughts>Fine</thoughts><score>n/a</score>", 4)
+    assert {event for event, _ in events} == {"thought"}
+    assert parser.thought == "Fine"
+    assert parser.score is None
+
+
+def test_parse_score():
+    assert parse_score(" 3 ") == 3.0
+    assert parse_score("4.5/5") == 4.5
+    assert parse_score("high") is None
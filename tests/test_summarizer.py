@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+import httpx
+
+from src.platform.http_pool import AsyncHTTPPool
+from src.platform.lm_predictor import LMPredictor
+from src.platform.prompts.summary_prompt import CV_SUMMARY_SYSTEM_MESSAGE, JOB_SUMMARY_SYSTEM_MESSAGE
+from src.platform.summarizer import CV, DocumentSummarizer, SummaryStore
+
+COMPLETION = "<thought> Strong Python background. </thought>\n<score> 4 </score>"
+VACANCY = "Senior Python developer. " * 50
+CVS = [f"Candidate {i}: Python developer with {i} years of Django experience. " * 20 for i in range(3)]
+
+
+class FakeLM:
+    """Answers summary calls with a short summary and scoring calls with a fixed completion."""
+
+    def __init__(self, fail_summaries: bool = False):
+        self.fail_summaries = fail_summaries
+        self.summary_calls = []
+        self.score_prompts = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        messages = json.loads(request.content)["messages"]
+        system, prompt = messages[0]["content"], messages[1]["content"]
+        if system in (CV_SUMMARY_SYSTEM_MESSAGE, JOB_SUMMARY_SYSTEM_MESSAGE):
+            self.summary_calls.append(prompt)
+            if self.fail_summaries:
+                return httpx.Response(500, text="boom")
+            kind = "cv" if system == CV_SUMMARY_SYSTEM_MESSAGE else "vacancy"
+            content = f"Summary of {kind}"
+        else:
+            self.score_prompts.append(prompt)
+            content = COMPLETION
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+def make_predictor(lm: FakeLM, path) -> LMPredictor:
+    pool = AsyncHTTPPool(transport=httpx.MockTransport(lm))
+    predictor = LMPredictor(api_base_url="http://llm:5001/v1", pool=pool, summarize=True, summary_cache_path=str(path))
+    predictor.summarizer.min_tokens = 50
+    return predictor
+
+
+def test_rank_summarizes_the_vacancy_once(tmp_path):
+    lm = FakeLM()
+    predictor = make_predictor(lm, tmp_path / "summaries.sqlite3")
+
+    selector = asyncio.run(predictor.rank_async(VACANCY, [(cv, "") for cv in CVS], top_k=3))
+
+    assert selector.scored == 3
+    assert len(lm.summary_calls) == 4  # one vacancy and three CVs
+    assert sum("<job_description>" in call for call in lm.summary_calls) == 1
+    assert len(lm.score_prompts) == 3
+    for prompt in lm.score_prompts:
+        assert "Summary of vacancy" in prompt and "Summary of cv" in prompt
+        assert "Senior Python developer" not in prompt
+
+
+def test_summaries_persist_across_predictors(tmp_path):
+    path = tmp_path / "summaries.sqlite3"
+    asyncio.run(make_predictor(FakeLM(), path).predict_async(CVS[0], VACANCY, ""))
+
+    lm = FakeLM()
+    predictor = make_predictor(lm, path)
+    predictor.summarizer.store = SummaryStore(str(path))  # a fresh connection, as after a restart
+
+    assert asyncio.run(predictor.predict_async(CVS[0], VACANCY, "")) == (4.0, "Strong Python background.")
+    assert lm.summary_calls == []
+    assert "Summary of cv" in lm.score_prompts[0]
+
+
+def test_failed_summary_falls_back_to_the_full_text(tmp_path):
+    lm = FakeLM(fail_summaries=True)
+    predictor = make_predictor(lm, tmp_path / "summaries.sqlite3")
+
+    assert asyncio.run(predictor.predict_async(CVS[1], VACANCY, "")) == (4.0, "Strong Python background.")
+    assert CVS[1].strip() in lm.score_prompts[0]
+    assert len(predictor.summarizer.store) == 0
+
+
+def test_concurrent_summaries_share_one_call(tmp_path):
+    calls = []
+
+    async def complete(payload: dict):
+        calls.append(payload)
+        await asyncio.sleep(0.05)
+        return "Short summary", "stop"
+
+    summarizer = DocumentSummarizer(
+        complete, "local-model", SummaryStore(str(tmp_path / "s.sqlite3")), lambda text: len(text.split())
+    )
+    summarizer.min_tokens = 3
+
+    async def run():
+        return await asyncio.gather(
+            *[summarizer.summarize(CVS[0], CV) for _ in range(5)], summarizer.summarize("Two words", CV)
+        )
+
+    results = asyncio.run(run())
+    assert results == ["Short summary"] * 5 + ["Two words"]
+    assert len(calls) == 1
+    assert calls[0]["temperature"] == 0.0
+
+
+def test_truncated_summary_is_not_stored(tmp_path):
+    async def complete(payload: dict):
+        return "Cut off in the mid", "length"
+
+    store = SummaryStore(str(tmp_path / "s.sqlite3"))
+    summarizer = DocumentSummarizer(complete, "local-model", store, lambda text: len(text.split()))
+    summarizer.min_tokens = 3
+
+    assert asyncio.run(summarizer.summarize(CVS[0], CV)) == CVS[0]
+    assert len(store) == 0
+
+
+def test_sync_predict_uses_stored_summaries_only(tmp_path):
+    path = tmp_path / "summaries.sqlite3"
+    asyncio.run(make_predictor(FakeLM(), path).predict_async(CVS[0], VACANCY, ""))
+
+    lm = FakeLM()
+    predictor = make_predictor(lm, path)
+    prompts = []
+    predictor._call_api = lambda prompt: prompts.append(prompt) or COMPLETION
+
+    async def predict_in_a_running_loop():
+        return [predictor.predict(cv, VACANCY, "") for cv in CVS[:2]]
+
+    assert asyncio.run(predict_in_a_running_loop()) == [(4.0, "Strong Python background.")] * 2
+    assert lm.summary_calls == []
+    assert "Summary of cv" in prompts[0] and "Summary of vacancy" in prompts[0]
+    assert CVS[1].strip() in prompts[1]